@@ -1,22 +1,47 @@
+import base64
+import binascii
+import functools
+import gc
+import hashlib
+import itertools
+import json
 import math
 import os
+import threading
 import time
-from collections import deque
-from typing import Any, Dict, Iterable, List, Optional, Tuple
-import statistics
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Set, Tuple, Union
 
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, request
 from flask_cors import CORS
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy import or_
+import numpy as np
 import sqlalchemy as sa
 
+from compact_records import BOOL, FLOAT, INT, LIST, STR
+from catalog import CatalogSnapshot, CatalogStore, ChangedRow, PriceRange
+from facets import FacetCounts
+from compression import ResponseCompressor, available_encodings, etag_variants
+from json_fragments import Projection, RenderedPage, encode_value, project
+from json_provider import FastJSONProvider, dumps_compact, fast_json_available, set_fast_json
+from metrics import StageMetrics, StageTimer, prometheus_text
+from migrations import catalog_change_trigger_statements, dress_value_trigger_statements
+from parallel_scoring import ParallelScorer
+from postgres_backend import INDEX_STATEMENTS as POSTGRES_INDEX_STATEMENTS
+from postgres_backend import TEXT_ARRAY, array_filter, is_postgres, normalize_database_url
+from postgres_backend import engine_options as postgres_engine_options
+from single_flight import SingleFlight
+from sql_scoring import SqlScorer
+from sqlite_tuning import DEFAULT_PROFILE, apply_pragmas, create_read_engine, engine_options, pragma_statements, sqlite_file_path
+from result_cache import ResultCache, canonical_key
+from scoring_engine import RankedResult, ScoringPlan, SectionMemo, round_scores
+
 # App setup
 app = Flask(__name__, instance_relative_config=True)
 basedir = os.path.abspath(os.path.dirname(__file__))
 db_path = os.path.join(basedir, "instance", "dresses.db")
 
-app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{db_path}"
+app.config["SQLALCHEMY_DATABASE_URI"] = normalize_database_url(os.getenv("DATABASE_URL") or f"sqlite:///{db_path}")
 app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
 
 ENABLE_DYNAMIC_SCORING = str(os.getenv("ENABLE_DYNAMIC_SCORING", "true")).lower() in {
@@ -29,9 +54,73 @@ DEFAULT_LIMIT = int(os.getenv("DYNAMIC_SCORING_DEFAULT_LIMIT", 24))
 MAX_LIMIT = int(os.getenv("DYNAMIC_SCORING_MAX_LIMIT", 48))
 SECTION_DOMINANCE_BASE = float(os.getenv("DYNAMIC_SCORING_SECTION_BASE", 5.0))
 VALUE_DECAY = float(os.getenv("DYNAMIC_SCORING_VALUE_DECAY", 0.65))
+SCORING_BACKEND = os.getenv("DYNAMIC_SCORING_BACKEND", "memory").strip().lower()
+CATALOG_REFRESH_SECONDS = float(os.getenv("CATALOG_REFRESH_SECONDS", 30.0))
+CATALOG_ADMIN_TOKEN = os.getenv("CATALOG_ADMIN_TOKEN")
+CATALOG_DELTA_MAX_CHANGES = int(os.getenv("CATALOG_DELTA_MAX_CHANGES", 5000))
+CATALOG_CHANGE_LOOKBACK = int(os.getenv("CATALOG_CHANGE_LOOKBACK", 64))
+CATALOG_CHANGE_LOG_RETENTION = int(os.getenv("CATALOG_CHANGE_LOG_RETENTION", 100_000))
+ANALYZE_DRIFT = float(os.getenv("ANALYZE_DRIFT", 0.2))
+RESULT_CACHE_SIZE = int(os.getenv("RESULT_CACHE_SIZE", 256))
+RESULT_CACHE_TTL_SECONDS = float(os.getenv("RESULT_CACHE_TTL_SECONDS", 300.0))
+RESULT_CACHE_MAX_BYTES = int(os.getenv("RESULT_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+REQUEST_COALESCING = str(os.getenv("REQUEST_COALESCING", "true")).lower() in {"1", "true", "yes", "on"}
+REQUEST_COALESCING_WAIT_SECONDS = float(os.getenv("REQUEST_COALESCING_WAIT_SECONDS", 30.0))
+JSON_ENCODER = os.getenv("JSON_ENCODER", "auto").strip().lower()
+RESPONSE_COMPRESSION = str(os.getenv("RESPONSE_COMPRESSION", "true")).lower() in {"1", "true", "yes", "on"}
+RESPONSE_COMPRESSION_MIN_BYTES = int(os.getenv("RESPONSE_COMPRESSION_MIN_BYTES", 1024))
+RESPONSE_GZIP_LEVEL = int(os.getenv("RESPONSE_GZIP_LEVEL", 6))
+RESPONSE_BROTLI_QUALITY = int(os.getenv("RESPONSE_BROTLI_QUALITY", 4))
+HTTP_CACHE_MAX_AGE = int(os.getenv("HTTP_CACHE_MAX_AGE", 60))
+BATCH_MAX_REQUESTS = int(os.getenv("BATCH_MAX_REQUESTS", 500))
+EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", 1000))
+PLAN_CACHE_SIZE = int(os.getenv("PLAN_CACHE_SIZE", 512))
+SCORING_WORKERS = int(os.getenv("SCORING_WORKERS", 0))
+PARALLEL_SCORING_MIN_SIZE = int(os.getenv("PARALLEL_SCORING_MIN_SIZE", 200_000))
+PARALLEL_SCORING_START_METHOD = os.getenv("PARALLEL_SCORING_START_METHOD", "spawn").strip().lower()
+SQLITE_TUNING = str(os.getenv("SQLITE_TUNING", "true")).lower() in {"1", "true", "yes", "on"}
+# journal_mode is stored in the database file, so the checked-in demo database keeps
+# its rollback journal unless SQLITE_JOURNAL_MODE asks for WAL explicitly.
+_using_demo_db = app.config["SQLALCHEMY_DATABASE_URI"] == f"sqlite:///{db_path}"
+_default_journal_mode = "" if _using_demo_db else DEFAULT_PROFILE["journal_mode"]
+SQLITE_PROFILE = {
+    "journal_mode": os.getenv("SQLITE_JOURNAL_MODE", _default_journal_mode).strip().upper(),
+    "synchronous": os.getenv("SQLITE_SYNCHRONOUS", DEFAULT_PROFILE["synchronous"]).strip().upper(),
+    "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", DEFAULT_PROFILE["mmap_size"])),
+    "cache_size_kb": int(os.getenv("SQLITE_CACHE_SIZE_KB", DEFAULT_PROFILE["cache_size_kb"])),
+    "temp_store": os.getenv("SQLITE_TEMP_STORE", DEFAULT_PROFILE["temp_store"]).strip().upper(),
+    "busy_timeout_ms": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", DEFAULT_PROFILE["busy_timeout_ms"])),
+}
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 8))
+DB_POOL_MAX_OVERFLOW = int(os.getenv("DB_POOL_MAX_OVERFLOW", 8))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 10.0))
+SQLITE_READ_POOL_SIZE = int(os.getenv("SQLITE_READ_POOL_SIZE", 16))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))
+
+# DATABASE_URL selects the backend: SQLite (default) or PostgreSQL on the seed.sql schema.
+USING_POSTGRES = is_postgres(app.config["SQLALCHEMY_DATABASE_URI"])
+
+_sqlite_tuned = SQLITE_TUNING and sqlite_file_path(app.config["SQLALCHEMY_DATABASE_URI"]) is not None
+if _sqlite_tuned:
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = engine_options(DB_POOL_SIZE, DB_POOL_MAX_OVERFLOW, DB_POOL_TIMEOUT)
+elif USING_POSTGRES:
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = postgres_engine_options(
+        DB_POOL_SIZE, DB_POOL_MAX_OVERFLOW, DB_POOL_TIMEOUT, DB_POOL_RECYCLE
+    )
+
+set_fast_json(JSON_ENCODER != "stdlib")
+app.json = FastJSONProvider(app)
 
 db = SQLAlchemy(app)
 
+READ_ENGINE: Optional[sa.engine.Engine] = None
+if _sqlite_tuned:
+    with app.app_context():
+        apply_pragmas(db.engine, pragma_statements(SQLITE_PROFILE))
+    READ_ENGINE = create_read_engine(
+        app.config["SQLALCHEMY_DATABASE_URI"], SQLITE_PROFILE, SQLITE_READ_POOL_SIZE, DB_POOL_MAX_OVERFLOW, DB_POOL_TIMEOUT
+    )
+
 _allowed_origins_env = os.getenv(
     "CORS_ALLOWED_ORIGINS",
     "https://best-dressed.vercel.app,http://localhost:5173,http://127.0.0.1:5173",
@@ -40,6 +129,10 @@ _allowed_origins = [origin.strip() for origin in _allowed_origins_env.split(",")
 if not _allowed_origins:
     _allowed_origins = ["*"]
 
+COMPRESSOR = ResponseCompressor(RESPONSE_COMPRESSION_MIN_BYTES, RESPONSE_GZIP_LEVEL, RESPONSE_BROTLI_QUALITY)
+if RESPONSE_COMPRESSION:
+    COMPRESSOR.init_app(app)
+
 CORS(
     app,
     resources={r"/api/*": {"origins": _allowed_origins}},
@@ -51,8 +144,12 @@ CORS(
 
 
 # Model
+ARRAY_COLUMN_TYPE = TEXT_ARRAY if USING_POSTGRES else db.JSON
+
+
 class WeddingDress(db.Model):
-    __tablename__ = "wedding_dresses"
+    __tablename__ = "dresses" if USING_POSTGRES else "wedding_dresses"
+    __table_args__ = {"schema": "public"} if USING_POSTGRES else {}
 
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
@@ -68,11 +165,11 @@ class WeddingDress(db.Model):
     backstyle = db.Column(db.String(50))
     price = db.Column(db.Float)
     size_range = db.Column(db.String(20))
-    tags = db.Column(db.PickleType)
-    weddingvenue = db.Column(db.PickleType)
+    tags = db.Column(ARRAY_COLUMN_TYPE)
+    weddingvenue = db.Column(ARRAY_COLUMN_TYPE)
     season = db.Column(db.String(20))
-    embellishments = db.Column(db.PickleType)
-    features = db.Column(db.PickleType)
+    embellishments = db.Column(ARRAY_COLUMN_TYPE)
+    features = db.Column(ARRAY_COLUMN_TYPE)
     has_pockets = db.Column(db.Boolean)
     corset_back = db.Column(db.Boolean)
 
@@ -102,6 +199,74 @@ class WeddingDress(db.Model):
         }
 
 
+class DressValue(db.Model):
+    __tablename__ = "dress_values"
+    __table_args__ = (
+        db.Index("idx_dress_values_section_value", "section", "value", "dress_id"),
+        db.Index("idx_dress_values_dress", "dress_id", "section"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    dress_id = db.Column(db.Integer, db.ForeignKey(WeddingDress.id), nullable=False)
+    section = db.Column(db.String(32), nullable=False)
+    value = db.Column(db.String(100), nullable=False)
+
+
+# dress_values is maintained by SQLite triggers so every writer keeps it in sync.
+# PostgreSQL filters and scores the native text[] columns and leaves it empty.
+for _statement in dress_value_trigger_statements():
+    sa.event.listen(DressValue.__table__, "after_create", sa.DDL(_statement).execute_if(dialect="sqlite"))
+
+
+class CatalogChange(db.Model):
+    __tablename__ = "catalog_changes"
+    # AUTOINCREMENT so pruned sequence numbers are never handed out again.
+    __table_args__ = {"sqlite_autoincrement": True}
+
+    seq = db.Column(db.Integer, primary_key=True)
+    dress_id = db.Column(db.Integer, nullable=False)
+    op = db.Column(db.String(8), nullable=False)
+
+
+# SQLite triggers log every writer to catalog_changes. On PostgreSQL the ORM hooks
+# below append the log in the writer's transaction. Either way a commit through
+# this process's session refreshes its catalog on the next request.
+CatalogChange.__table__.add_is_dependent_on(WeddingDress.__table__)
+for _statement in catalog_change_trigger_statements():
+    sa.event.listen(CatalogChange.__table__, "after_create", sa.DDL(_statement).execute_if(dialect="sqlite"))
+
+
+def _log_dress_change(op: str) -> Any:
+    def listener(mapper: Any, connection: sa.engine.Connection, target: WeddingDress) -> None:
+        session = sa.orm.object_session(target)
+        if session is not None:
+            session.info["catalog_changed"] = True
+        if connection.dialect.name != "sqlite":
+            connection.execute(sa.insert(CatalogChange.__table__).values(dress_id=target.id, op=op))
+
+    return listener
+
+
+for _op in ("insert", "update", "delete"):
+    sa.event.listen(WeddingDress, f"after_{_op}", _log_dress_change(_op))
+
+
+class SchemaState(db.Model):
+    # Small key/value record of database maintenance: the applied schema version and
+    # the row count at the last ANALYZE.
+    __tablename__ = "schema_state"
+
+    key = db.Column(db.String(64), primary_key=True)
+    value = db.Column(db.String(128), nullable=False)
+
+
+@sa.event.listens_for(sa.orm.Session, "after_commit")
+@sa.event.listens_for(sa.orm.Session, "after_rollback")
+def _refresh_catalog_after_write(session: sa.orm.Session) -> None:
+    if session.info.pop("catalog_changed", False):
+        CATALOG.mark_stale()
+
+
 SECTION_META: Dict[str, Dict[str, Any]] = {
     "color": {"type": "scalar", "column": WeddingDress.color, "attr": "color"},
     "silhouette": {"type": "scalar", "column": WeddingDress.silhouette, "attr": "silhouette"},
@@ -121,6 +286,26 @@ SECTION_META: Dict[str, Dict[str, Any]] = {
     "price": {"type": "price_bucket", "column": WeddingDress.price, "attr": "price"},
 }
 VALID_SECTION_KEYS = set(SECTION_META.keys())
+PRICE_BUCKETS: Tuple[Tuple[float, str], ...] = (
+    (500, "0-500"),
+    (1000, "500-1000"),
+    (1500, "1000-1500"),
+    (2000, "1500-2000"),
+)
+TOP_PRICE_BUCKET = "2000+"
+SECTION_TYPES: Dict[str, str] = {key: meta["type"] for key, meta in SECTION_META.items()}
+ITEM_FIELDS: Tuple[str, ...] = tuple(column.name for column in WeddingDress.__table__.columns) + ("score",)
+
+
+def _record_kind(column_type: Any) -> str:
+    for types, kind in ((sa.Boolean, BOOL), (sa.Integer, INT), (sa.Float, FLOAT), (sa.String, STR)):
+        if isinstance(column_type, types):
+            return kind
+    return LIST
+
+
+# Column layout of the in-memory catalog records, in serialize() order.
+RECORD_FIELDS: Dict[str, str] = {column.name: _record_kind(column.type) for column in WeddingDress.__table__.columns}
 
 _INDEX_STATEMENTS: Tuple[str, ...] = (
     "CREATE INDEX IF NOT EXISTS idx_wedding_dresses_color ON wedding_dresses (color)",
@@ -138,42 +323,155 @@ _INDEX_STATEMENTS: Tuple[str, ...] = (
 )
 
 
-class LatencyTracker:
-    def __init__(self, window: int = 200) -> None:
-        self.samples: deque[float] = deque(maxlen=window)
-        self.count = 0
+LATENCY_TRACKER = StageMetrics()
 
-    def record(self, duration_ms: float) -> Dict[str, float]:
-        self.samples.append(duration_ms)
-        self.count += 1
-        payload: Dict[str, float] = {"samples": float(len(self.samples)), "duration_ms": duration_ms}
-        if len(self.samples) >= 10:
-            sorted_samples = sorted(self.samples)
-            index = max(0, math.ceil(0.95 * len(sorted_samples)) - 1)
-            payload["p95_ms"] = sorted_samples[index]
-        return payload
 
+_SCHEMA_STATEMENTS: Tuple[str, ...] = (
+    POSTGRES_INDEX_STATEMENTS if USING_POSTGRES else _INDEX_STATEMENTS + catalog_change_trigger_statements()
+)
+# Digest of the DDL ensure_indexes applies; any added index or trigger changes it.
+SCHEMA_VERSION = hashlib.sha256(
+    "\n".join(_SCHEMA_STATEMENTS + (CatalogChange.__tablename__,)).encode("utf-8")
+).hexdigest()[:16]
+_ANALYZE_LOCK = threading.Lock()
 
-LATENCY_TRACKER = LatencyTracker()
 
+def _read_state(connection: sa.engine.Connection, key: str) -> Optional[str]:
+    table = SchemaState.__table__
+    return connection.execute(sa.select(table.c.value).where(table.c.key == key)).scalar()
 
-def ensure_indexes() -> None:
+
+def _write_state(connection: sa.engine.Connection, key: str, value: str) -> None:
+    table = SchemaState.__table__
+    connection.execute(sa.delete(table).where(table.c.key == key))
+    connection.execute(sa.insert(table).values(key=key, value=value))
+
+
+def ensure_indexes(force: bool = False) -> bool:
+    # Creates the indexes, change-log table and triggers once per SCHEMA_VERSION, so a
+    # worker booting against a current database runs a single SELECT. Returns True
+    # when the DDL ran.
     try:
         engine = db.engine
     except sa.exc.SQLAlchemyError as exc:  # pragma: no cover - defensive
         app.logger.warning("Unable to acquire engine for index creation: %s", exc)
-        return
+        return False
 
     with engine.begin() as connection:
-        for statement in _INDEX_STATEMENTS:
+        inspector = sa.inspect(connection)
+        if not inspector.has_table(WeddingDress.__tablename__, schema=WeddingDress.__table__.schema):
+            # Fresh database: create_all (seed.py, benchmark.py) builds everything.
+            return False
+        if inspector.has_table(SchemaState.__tablename__):
+            if not force and _read_state(connection, "schema_version") == SCHEMA_VERSION:
+                return False
+        else:
+            SchemaState.__table__.create(connection)
+        if connection.dialect.name == "sqlite" and not inspector.has_table(DressValue.__tablename__):
+            app.logger.warning("dress_values table missing; run `python migrate_arrays.py` to upgrade array columns")
+        CatalogChange.__table__.create(connection, checkfirst=True)
+        for statement in _SCHEMA_STATEMENTS:
             try:
-                connection.execute(sa.text(statement))
+                # A savepoint keeps one failed statement from aborting the PostgreSQL transaction.
+                with connection.begin_nested():
+                    connection.execute(sa.text(statement))
             except sa.exc.DBAPIError as exc:  # pragma: no cover - missing table / sqlite quirks
-                app.logger.info("Skipping index creation for statement %s: %s", statement, exc)
-        try:
-            connection.execute(sa.text("ANALYZE wedding_dresses"))
-        except sa.exc.DBAPIError as exc:  # pragma: no cover - sqlite ANALYZE may be disabled
-            app.logger.info("ANALYZE wedding_dresses skipped: %s", exc)
+                app.logger.info("Skipping maintenance statement %s: %s", statement, exc)
+        _write_state(connection, "schema_version", SCHEMA_VERSION)
+    return True
+
+
+def analyze_catalog() -> Dict[str, int]:
+    # Refreshes planner statistics and prunes the change log down to
+    # CATALOG_CHANGE_LOG_RETENTION entries. Run by maintenance.py, and in the
+    # background when the catalog size drifts from the last analyzed count.
+    changes = CatalogChange.__table__
+    with db.engine.begin() as connection:
+        rows = connection.execute(sa.select(sa.func.count()).select_from(WeddingDress.__table__)).scalar() or 0
+        head = connection.execute(sa.select(sa.func.max(changes.c.seq))).scalar() or 0
+        pruned = connection.execute(sa.delete(changes).where(changes.c.seq <= head - CATALOG_CHANGE_LOG_RETENTION)).rowcount
+        connection.execute(sa.text(f"ANALYZE {WeddingDress.__table__.fullname}"))
+        _write_state(connection, "analyzed_rows", str(rows))
+    return {"rows": int(rows), "pruned_changes": int(pruned)}
+
+
+def _analysis_due(rows: int, analyzed: Optional[str]) -> bool:
+    if ANALYZE_DRIFT <= 0:
+        return False
+    if analyzed is None:
+        return True
+    return abs(rows - int(analyzed)) > ANALYZE_DRIFT * max(int(analyzed), 1)
+
+
+def _background_analyze() -> None:
+    try:
+        with app.app_context():
+            stats = analyze_catalog()
+        app.logger.info("ANALYZE after catalog drift: %s", stats)
+    except sa.exc.SQLAlchemyError as exc:  # pragma: no cover - locked database, permissions
+        app.logger.warning("Background ANALYZE failed: %s", exc)
+    finally:
+        _ANALYZE_LOCK.release()
+
+
+def _analyze_on_drift(rows: int) -> None:
+    # At most one background ANALYZE per process at a time.
+    if not _ANALYZE_LOCK.acquire(blocking=False):
+        return
+    analyzed = db.session.query(SchemaState.value).filter(SchemaState.key == "analyzed_rows").scalar()
+    if not _analysis_due(rows, analyzed):
+        _ANALYZE_LOCK.release()
+        return
+    threading.Thread(target=_background_analyze, name="catalog-analyze", daemon=True).start()
+
+
+CatalogFingerprint = Tuple[int, Optional[int], int, int]
+
+
+def _catalog_fingerprint() -> CatalogFingerprint:
+    count, max_id = db.session.query(sa.func.count(WeddingDress.id), sa.func.max(WeddingDress.id)).one()
+    # Head of the change log, plus how many of its recent sequence numbers are
+    # visible: a transaction committing after a later one grows that count.
+    head = int(db.session.query(sa.func.max(CatalogChange.seq)).scalar() or 0)
+    recent = db.session.query(sa.func.count(CatalogChange.seq)).filter(CatalogChange.seq > head - CATALOG_CHANGE_LOOKBACK)
+    return int(count or 0), max_id, head, int(recent.scalar() or 0)
+
+
+def _load_catalog() -> Tuple[CatalogFingerprint, Iterable[Mapping[str, Any]], Iterable[Dict[str, List[str]]]]:
+    fingerprint = _catalog_fingerprint()
+    _analyze_on_drift(fingerprint[0])
+    # Plain rows streamed in batches: the snapshot packs them into columns as they
+    # arrive, so no ORM instance or per-dress dict outlives the load.
+    table = WeddingDress.__table__
+    result = db.session.execute(sa.select(table).order_by(table.c.id).execution_options(yield_per=2000))
+    record_rows, token_rows = itertools.tee(result)
+    return fingerprint, (row._mapping for row in record_rows), (_section_tokens(row) for row in token_rows)
+
+
+def _load_catalog_changes(snapshot: CatalogSnapshot) -> Optional[Tuple[CatalogFingerprint, Dict[int, ChangedRow], int]]:
+    fingerprint = _catalog_fingerprint()
+    _analyze_on_drift(fingerprint[0])
+    applied = snapshot.fingerprint[2]
+    oldest = db.session.query(sa.func.min(CatalogChange.seq)).scalar()
+    if oldest is None or (applied and oldest > applied + 1):
+        # Nothing logged, or pruned past this snapshot: the log cannot say what changed.
+        # (An empty log at load time means every entry is newer; sequences may skip numbers.)
+        return None
+    # Re-reading a few already applied entries covers transactions that committed out of sequence order.
+    dress_ids = [
+        dress_id
+        for (dress_id,) in db.session.query(CatalogChange.dress_id)
+        .filter(CatalogChange.seq > applied - CATALOG_CHANGE_LOOKBACK)
+        .distinct()
+    ]
+    if len(dress_ids) > CATALOG_DELTA_MAX_CHANGES:
+        return None
+    changes: Dict[int, ChangedRow] = dict.fromkeys(dress_ids)
+    table = WeddingDress.__table__
+    for start in range(0, len(dress_ids), 500):
+        for row in db.session.execute(sa.select(table).where(table.c.id.in_(dress_ids[start : start + 500]))):
+            changes[row.id] = (dict(row._mapping), _section_tokens(row))
+    return fingerprint, changes, fingerprint[0]
 
 
 def _normalize_section_key(raw: Any) -> Optional[str]:
@@ -211,15 +509,10 @@ def price_bucket(value: Optional[float]) -> Optional[str]:
         price = float(value)
     except (TypeError, ValueError):
         return None
-    if price < 500:
-        return "0-500"
-    if price < 1000:
-        return "500-1000"
-    if price < 1500:
-        return "1000-1500"
-    if price < 2000:
-        return "1500-2000"
-    return "2000+"
+    for upper_bound, bucket in PRICE_BUCKETS:
+        if price < upper_bound:
+            return bucket
+    return TOP_PRICE_BUCKET
 
 
 def canonical_section_weight(total_sections: int, index: int) -> float:
@@ -290,7 +583,7 @@ def _resolve_priority_weights(payload: Dict[str, Any]) -> Tuple[Dict[str, Dict[s
     return resolved, source
 
 
-def _extract_section_tokens(dress: WeddingDress, section_key: str) -> List[str]:
+def _extract_section_tokens(dress: Any, section_key: str) -> List[str]:
     meta = SECTION_META.get(section_key, {})
     attribute = meta.get("attr")
     section_type = meta.get("type")
@@ -322,7 +615,21 @@ def _extract_section_tokens(dress: WeddingDress, section_key: str) -> List[str]:
     return []
 
 
+def _section_tokens(dress: Any) -> Dict[str, List[str]]:
+    return {section_key: _extract_section_tokens(dress, section_key) for section_key in SECTION_META}
+
+
 def _score_dress(dress: WeddingDress, weights: Dict[str, Dict[str, Any]], debug: bool = False) -> Dict[str, Any]:
+    tokens = {section_key: _extract_section_tokens(dress, section_key) for section_key in weights if section_key in SECTION_META}
+    return _score_record(dress.serialize(), tokens, weights, debug=debug)
+
+
+def _score_record(
+    record: Dict[str, Any],
+    section_tokens: Dict[str, List[str]],
+    weights: Dict[str, Dict[str, Any]],
+    debug: bool = False,
+) -> Dict[str, Any]:
     total_score = 0.0
     debug_details: Dict[str, Any] = {}
 
@@ -333,7 +640,7 @@ def _score_dress(dress: WeddingDress, weights: Dict[str, Dict[str, Any]], debug:
 
         section_weight = float(spec.get("section", 0.0))
         value_weights = spec.get("values") or {}
-        tokens = _extract_section_tokens(dress, section_key)
+        tokens = section_tokens.get(section_key) or []
 
         if not tokens or (section_weight <= 0 and not value_weights):
             continue
@@ -375,13 +682,41 @@ def _score_dress(dress: WeddingDress, weights: Dict[str, Dict[str, Any]], debug:
                 "section_score": section_score,
             }
 
-    serialized = dress.serialize()
+    serialized = dict(record)
     serialized["score"] = round(total_score, 6)
     if debug and debug_details:
         serialized["_debug"] = debug_details
     return serialized
 
 
+_SPELLINGS: Tuple[Optional[int], Dict[str, Dict[str, Set[str]]]] = (None, {})
+
+
+def _array_spellings(section_key: str, normalized_values: List[str], raw_values: Iterable[Any]) -> List[str]:
+    # GIN matches array elements exactly, so a normalized filter value expands to every
+    # stored spelling the current catalog snapshot has seen, plus the request's own text.
+    global _SPELLINGS
+    snapshot = CATALOG.get()
+    version, spellings = _SPELLINGS
+    if version != snapshot.version:
+        spellings = {}
+        for key, meta in SECTION_META.items():
+            if meta["type"] != "array":
+                continue
+            # Spellings since replaced may linger in the vocabulary; matching them is harmless.
+            for raw in snapshot.records.distinct(meta["attr"]):
+                normalized = _normalize_value(raw)
+                if normalized:
+                    spellings.setdefault(key, {}).setdefault(normalized, set()).add(raw)
+        _SPELLINGS = (snapshot.version, spellings)
+    section = spellings.get(section_key, {})
+    result = set(normalized_values)
+    result.update(value.strip() for value in raw_values if isinstance(value, str) and value.strip())
+    for value in normalized_values:
+        result.update(section.get(value, ()))
+    return sorted(result)
+
+
 def _build_filter_conditions(filters: Dict[str, Any]) -> List[Any]:
     or_conditions: List[Any] = []
 
@@ -414,14 +749,25 @@ def _build_filter_conditions(filters: Dict[str, Any]) -> List[Any]:
             continue
 
         if section_type == "array":
-            for value in values:
-                if isinstance(value, str) and value.strip():
-                    or_conditions.append(column.contains([value]))
+            normalized_values = [_normalize_value(value) for value in values if isinstance(value, str)]
+            normalized_values = [value for value in normalized_values if value]
+            if normalized_values and USING_POSTGRES:
+                or_conditions.append(array_filter(column, _array_spellings(key, normalized_values, values)))
+            elif normalized_values:
+                or_conditions.append(
+                    sa.exists().where(
+                        DressValue.dress_id == WeddingDress.id,
+                        DressValue.section == key,
+                        DressValue.value.in_(normalized_values),
+                    )
+                )
             continue
 
-        sanitized = [value for value in values if isinstance(value, str) and value.strip()]
-        for value in sanitized:
-            or_conditions.append(column == value)
+        # Case- and whitespace-insensitive, like the snapshot's normalized tokens.
+        normalized_values = [_normalize_value(value) for value in values if isinstance(value, str)]
+        normalized_values = [value for value in normalized_values if value]
+        if normalized_values:
+            or_conditions.append(sa.func.lower(sa.func.trim(column)).in_(normalized_values))
 
     price_ranges = filters.get("price")
     if price_ranges:
@@ -455,20 +801,120 @@ def _build_filter_conditions(filters: Dict[str, Any]) -> List[Any]:
     return or_conditions
 
 
-def _paginate(items: List[Dict[str, Any]], limit: int, offset: int) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
-    total = len(items)
-    limit = max(1, min(limit, MAX_LIMIT))
-    offset = max(0, offset)
-    page = items[offset : offset + limit]
-    page_info = {
+def _parse_filter_terms(filters: Dict[str, Any]) -> Tuple[Dict[str, List[str]], List[PriceRange]]:
+    # Same inputs as _build_filter_conditions, resolved to normalized tokens for the catalog snapshot.
+    terms: Dict[str, List[str]] = {}
+    price_ranges: List[PriceRange] = []
+
+    if not isinstance(filters, dict):
+        return terms, price_ranges
+
+    for key, meta in SECTION_META.items():
+        section_type = meta.get("type")
+        if section_type == "price_bucket":
+            continue
+
+        raw_value = filters.get(key)
+        if raw_value is None:
+            continue
+
+        values: Iterable[Any]
+        if isinstance(raw_value, (list, tuple, set)):
+            values = raw_value
+        else:
+            values = [raw_value]
+
+        normalized_values: List[str] = []
+        for value in values:
+            if section_type != "boolean" and not isinstance(value, str):
+                continue
+            normalized = _normalize_value(value)
+            if not normalized:
+                continue
+            if section_type == "boolean" and normalized not in {"true", "false"}:
+                continue
+            normalized_values.append(normalized)
+        if normalized_values:
+            terms[key] = normalized_values
+
+    price_values = filters.get("price")
+    if price_values:
+        if not isinstance(price_values, (list, tuple, set)):
+            price_values = [price_values]
+        for range_str in price_values:
+            if not isinstance(range_str, str):
+                continue
+            if "+" in range_str:
+                try:
+                    price_ranges.append((float(range_str.replace("+", "")), None))
+                except ValueError:
+                    continue
+            else:
+                try:
+                    min_str, max_str = range_str.split("-")
+                    price_ranges.append((float(min_str), float(max_str)))
+                except ValueError:
+                    continue
+
+    price_min = filters.get("priceMin")
+    price_max = filters.get("priceMax")
+    if isinstance(price_min, (int, float)):
+        price_ranges.append((float(price_min), None))
+    if isinstance(price_max, (int, float)):
+        price_ranges.append((None, float(price_max)))
+
+    return terms, price_ranges
+
+
+def _clamp_pagination(limit: int, offset: int) -> Tuple[int, int]:
+    return max(1, min(limit, MAX_LIMIT)), max(0, offset)
+
+
+def _page_info(
+    total: int, limit: int, offset: int, returned: int, next_cursor: Optional[str] = None
+) -> Dict[str, Any]:
+    has_next = offset + returned < total
+    return {
         "limit": limit,
         "offset": offset,
-        "returned": len(page),
+        "returned": returned,
         "total": total,
-        "hasNextPage": offset + len(page) < total,
+        "hasNextPage": has_next,
         "hasPrevPage": offset > 0,
+        "nextCursor": next_cursor if has_next else None,
     }
-    return page, page_info
+
+
+CursorKey = Tuple[float, float, str, int]
+
+
+def _encode_cursor(item: Dict[str, Any], generation: Optional[str]) -> str:
+    # `generation` ties the cursor to the catalog state it was ranked against; SQL
+    # ranking reads the live table and leaves it out.
+    key = [float(item.get("score") or 0.0), float(item.get("price") or 0), item.get("name") or "", int(item["id"])]
+    raw = json.dumps({"g": generation, "k": key}, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(token: Any) -> Optional[Tuple[Optional[str], CursorKey]]:
+    if not isinstance(token, str) or not token:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        payload = json.loads(raw.decode("utf-8"))
+        score, price, name, dress_id = payload["k"]
+        generation = payload.get("g")
+        if not isinstance(name, str) or (generation is not None and not isinstance(generation, str)):
+            return None
+        return generation, (float(score), float(price), name, int(dress_id))
+    except (ValueError, TypeError, KeyError, AttributeError, binascii.Error):
+        return None
+
+
+def _paginate(items: List[Any], limit: int, offset: int) -> Tuple[List[Any], Dict[str, Any]]:
+    limit, offset = _clamp_pagination(limit, offset)
+    page = items[offset : offset + limit]
+    return page, _page_info(len(items), limit, offset, len(page))
 
 
 def _parse_pagination(payload: Dict[str, Any]) -> Tuple[int, int]:
@@ -487,65 +933,53 @@ def _parse_pagination(payload: Dict[str, Any]) -> Tuple[int, int]:
     return limit, offset
 
 
-def _legacy_get_dresses() -> List[Dict[str, Any]]:
-    or_conditions: List[Any] = []
+def _parse_fields(raw: Any) -> Projection:
+    # Sparse fieldset: a list or comma-separated string of item keys. None means every field.
+    if isinstance(raw, str):
+        raw = raw.split(",")
+    if not isinstance(raw, (list, tuple)):
+        return None
+    fields: List[str] = []
+    for value in raw:
+        field = value.strip() if isinstance(value, str) else None
+        if field in ITEM_FIELDS and field not in fields:
+            fields.append(field)
+    return tuple(fields) or None
+
+
+def _legacy_get_dresses() -> RenderedPage:
+    terms: Dict[str, List[str]] = {}
+
+    list_filters = (
+        "color",
+        "silhouette",
+        "neckline",
+        "length",
+        "fabric",
+        "backstyle",
+        "collection",
+        "season",
+        "tags",
+        "embellishments",
+        "features",
+    )
+    for key in list_filters:
+        values = [_normalize_value(value) for value in request.args.getlist(key) if value]
+        values = [value for value in values if value]
+        if values:
+            terms[key] = values
 
-    multi_filters = {
-        "color": WeddingDress.color,
-        "silhouette": WeddingDress.silhouette,
-        "neckline": WeddingDress.neckline,
-        "length": WeddingDress.length,
-        "fabric": WeddingDress.fabric,
-        "backstyle": WeddingDress.backstyle,
-        "collection": WeddingDress.collection,
-        "season": WeddingDress.season,
-    }
-    for key, column in multi_filters.items():
-        values = request.args.getlist(key)
-        for value in values:
-            if value:
-                or_conditions.append(column == value)
-
-    if request.args.get("shipin48hrs") == "true":
-        or_conditions.append(WeddingDress.shipin48hrs.is_(True))
-    if request.args.get("has_pockets") == "true":
-        or_conditions.append(WeddingDress.has_pockets.is_(True))
-    if request.args.get("corset_back") == "true":
-        or_conditions.append(WeddingDress.corset_back.is_(True))
-
-    list_fields = {
-        "tags": WeddingDress.tags,
-        "embellishments": WeddingDress.embellishments,
-        "features": WeddingDress.features,
-    }
-    for key, column in list_fields.items():
-        values = request.args.getlist(key)
-        for value in values:
-            if value:
-                or_conditions.append(column.contains([value]))
+    for key in ("shipin48hrs", "has_pockets", "corset_back"):
+        if request.args.get(key) == "true":
+            terms[key] = ["true"]
 
-    price_ranges = request.args.getlist("price")
-    for range_str in price_ranges:
-        if "+" in range_str:
-            try:
-                min_price = float(range_str.replace("+", ""))
-                or_conditions.append(WeddingDress.price >= min_price)
-            except ValueError:
-                continue
-        else:
-            try:
-                min_str, max_str = range_str.split("-")
-                min_price = float(min_str)
-                max_price = float(max_str)
-                or_conditions.append(WeddingDress.price.between(min_price, max_price))
-            except ValueError:
-                continue
+    _, price_ranges = _parse_filter_terms({"price": request.args.getlist("price")})
 
-    query = db.session.query(WeddingDress)
-    if or_conditions:
-        query = query.filter(or_(*or_conditions))
-    results = query.all()
-    return [dress.serialize() for dress in results]
+    snapshot = CATALOG.get()
+    candidates = snapshot.filter_candidates(terms, price_ranges)
+    positions = range(snapshot.size) if candidates is None else candidates.tolist()
+    fields = _parse_fields(request.args.get("fields"))
+    return RenderedPage(snapshot.fragments.render(positions, fields), len(positions), None)
 
 
 def _filters_from_query_params() -> Dict[str, Any]:
@@ -589,90 +1023,437 @@ def _pagination_from_query_params() -> Dict[str, Any]:
         pagination["limit"] = args.get("limit")
     if "offset" in args:
         pagination["offset"] = args.get("offset")
+    if "cursor" in args:
+        pagination["cursor"] = args.get("cursor")
     return pagination
 
 
-@app.route("/api/dresses", methods=["GET", "POST"])
-def dresses() -> Any:
-    if request.method == "GET" and not ENABLE_DYNAMIC_SCORING:
-        dresses_payload = _legacy_get_dresses()
-        return jsonify(dresses_payload)
+def _json_body(page_items: Union[List[Dict[str, Any]], RenderedPage], envelope: Dict[str, Any]) -> str:
+    # Splices pre-encoded items into the envelope; envelope keys follow "items".
+    if not isinstance(page_items, RenderedPage):
+        return encode_value(dict(items=page_items, **envelope))
+    body = '{"items":' + page_items.items_json
+    for key, value in envelope.items():
+        body += "," + encode_value(key) + ":" + encode_value(value)
+    return body + "}"
 
-    payload = request.get_json(silent=True) or {}
-    filters = payload.get("filters") or {}
-    pagination = payload.get("page") or payload.get("pagination") or {}
-    debug = _as_bool(payload.get("debug"))
-    if not debug:
-        debug = _as_bool(request.args.get("debug"))
-
-    if request.method == "GET":
-        query_filters = _filters_from_query_params()
-        if query_filters:
-            if not filters:
-                filters = query_filters
-            else:
-                merged = dict(query_filters)
-                merged.update(filters)
-                filters = merged
-        if not pagination:
-            pagination = _pagination_from_query_params()
 
-    weights, source = _resolve_priority_weights(payload)
-    if not weights:
-        weights = {}
+def _next_cursor(page_items: Union[List[Dict[str, Any]], RenderedPage], generation: Optional[str]) -> Optional[str]:
+    last_item = page_items.last if isinstance(page_items, RenderedPage) else (page_items[-1] if page_items else None)
+    return _encode_cursor(last_item, generation) if last_item else None
 
-    or_conditions = _build_filter_conditions(filters)
 
-    query = db.session.query(WeddingDress)
-    if or_conditions:
-        query = query.filter(or_(*or_conditions))
-    dresses = query.all()
+def _cursor_expired(snapshot: CatalogSnapshot) -> Dict[str, Any]:
+    # Keyset positions from another catalog state could skip or repeat dresses.
+    return {"error": "cursor expired: the catalog changed, restart from the first page", "catalog_version": snapshot.version}
 
-    start = time.perf_counter()
-    scored = [_score_dress(dress, weights, debug=bool(debug)) for dress in dresses]
-    scored.sort(key=lambda item: (-item.get("score", 0), item.get("price", 0) or 0, item.get("name") or ""))
-    duration_ms = (time.perf_counter() - start) * 1000.0
 
-    score_values = [item.get("score", 0.0) for item in scored if isinstance(item.get("score"), (int, float))]
+CATALOG = CatalogStore(
+    _load_catalog,
+    _catalog_fingerprint,
+    SECTION_TYPES,
+    RECORD_FIELDS,
+    refresh_interval=CATALOG_REFRESH_SECONDS,
+    delta_loader=_load_catalog_changes,
+)
+RESULT_CACHE: "ResultCache[RankedResult]" = ResultCache(
+    RESULT_CACHE_SIZE, RESULT_CACHE_TTL_SECONDS, RESULT_CACHE_MAX_BYTES
+)
+# Identical rankings requested concurrently are computed once and shared.
+RANKING_FLIGHTS: "SingleFlight[RankedResult]" = SingleFlight(REQUEST_COALESCING, REQUEST_COALESCING_WAIT_SECONDS)
+# Plans do not depend on the catalog version (they recompile lazily), so no TTL.
+PLAN_CACHE: "ResultCache[ScoringPlan]" = ResultCache(PLAN_CACHE_SIZE, math.inf)
+# Multi-core scoring for large catalogs; off unless SCORING_WORKERS > 1.
+SCORING_POOL: Optional[ParallelScorer] = (
+    ParallelScorer(SCORING_WORKERS, PARALLEL_SCORING_MIN_SIZE, PARALLEL_SCORING_START_METHOD)
+    if SCORING_WORKERS > 1
+    else None
+)
+SQL_SCORER = SqlScorer(
+    WeddingDress.__table__,
+    SECTION_TYPES,
+    PRICE_BUCKETS,
+    TOP_PRICE_BUCKET,
+    values_table=DressValue.__table__,
+)
+
+# (page items, total, offset, score stats, snapshot ranked against or None for SQL, facets)
+RankResult = Tuple[
+    Union[List[Dict[str, Any]], RenderedPage],
+    int,
+    int,
+    Optional[Dict[str, float]],
+    Optional[CatalogSnapshot],
+    Optional[FacetCounts],
+]
+
+
+def _filter_parts(terms: Dict[str, List[str]], price_ranges: List[PriceRange]) -> List[Any]:
+    # Filters are OR-ed, so their order is irrelevant.
+    return [
+        sorted((section, sorted(set(values))) for section, values in terms.items()),
+        sorted({(-math.inf if low is None else low, math.inf if high is None else high) for low, high in price_ranges}),
+    ]
+
+
+def _ranking_cache_key(terms: Dict[str, List[str]], price_ranges: List[PriceRange], plan: ScoringPlan) -> str:
+    return canonical_key(*_filter_parts(terms, price_ranges), plan.key)
+
+
+def _scoring_plan(payload: Dict[str, Any]) -> ScoringPlan:
+    # Plans are keyed by a hash of the raw weights/priority payload, so a repeat payload
+    # skips normalization and weight math entirely; compiled tables live on the plan.
+    # Keys keep payload order: section order fixes the order scores are summed in.
+    raw = dumps_compact([payload.get("weights"), payload.get("priority")])
+    key = hashlib.sha256(raw.encode("utf-8")).hexdigest()
+    plan = PLAN_CACHE.get(key)
+    if plan is None:
+        weights, source = _resolve_priority_weights(payload)
+        plan = ScoringPlan(weights or {}, source)
+        PLAN_CACHE.put(key, plan)
+    return plan
+
+
+def _rank_in_memory(
+    filters: Dict[str, Any],
+    plan: ScoringPlan,
+    limit: int,
+    offset: int,
+    debug: bool,
+    cursor: Optional[CursorKey] = None,
+    timer: Optional[StageTimer] = None,
+    fields: Projection = None,
+    facets: bool = False,
+    snapshot: Optional[CatalogSnapshot] = None,
+) -> RankResult:
+    timer = timer or StageTimer()
+    with timer.stage("fetch"):
+        snapshot = snapshot or CATALOG.get()
+
+    with timer.stage("filter"):
+        terms, price_ranges = _parse_filter_terms(filters)
+        cache_key = _ranking_cache_key(terms, price_ranges, plan)
+        ranked = RESULT_CACHE.get(cache_key, snapshot.version)
+
+    def compute() -> RankedResult:
+        with timer.stage("filter"):
+            candidates = snapshot.filter_candidates(terms, price_ranges)
+            if candidates is None:
+                candidates = np.arange(snapshot.size)
+        with timer.stage("score"):
+            # Parallel shards pre-rank only the first page; cursor pages rank lazily.
+            depth = 0 if cursor is not None else offset + limit
+            ranked = _rank_candidates(snapshot, candidates, plan, depth=depth)
+        RESULT_CACHE.put(cache_key, ranked, snapshot.version)
+        return ranked
+
+    if ranked is None:
+        # Concurrent identical requests wait for one ranking, then page through it separately.
+        started = time.perf_counter()
+        ranked, shared = RANKING_FLIGHTS.run((cache_key, snapshot.version), compute)
+        if shared:
+            timer.add("score", (time.perf_counter() - started) * 1000.0)
+
+    with timer.stage("sort"):
+        positions, offset = _page_positions(snapshot, ranked, limit, offset, cursor)
+
+    facet_counts = None
+    if facets:
+        with timer.stage("facets"):
+            facet_counts = _ranked_facets(snapshot, ranked)
+
+    with timer.stage("serialize"):
+        page_items = _render_page(snapshot, ranked, positions, plan.weights, debug, fields)
+    return page_items, ranked.total, offset, ranked.score_stats(), snapshot, facet_counts
+
+
+def _ranked_facets(snapshot: CatalogSnapshot, ranked: RankedResult) -> FacetCounts:
+    # Memoized on the cached ranking, so later pages of the same query reuse the counts.
+    if ranked.facets is None:
+        unfiltered = ranked.total == snapshot.size
+        ranked.facets = snapshot.facet_counter.counts(None if unfiltered else ranked.candidates)
+    return ranked.facets
+
+
+def _ranked_result(
+    snapshot: CatalogSnapshot,
+    filters: Dict[str, Any],
+    plan: ScoringPlan,
+    candidate_sets: Optional[Dict[str, np.ndarray]] = None,
+    memo: Optional[SectionMemo] = None,
+) -> RankedResult:
+    # Cached ranking for one (filters, plan) pair; candidate_sets shares filter
+    # results between the entries of a batch.
+    terms, price_ranges = _parse_filter_terms(filters)
+    cache_key = _ranking_cache_key(terms, price_ranges, plan)
+    ranked = RESULT_CACHE.get(cache_key, snapshot.version)
+    if ranked is not None:
+        return ranked
+
+    def compute() -> RankedResult:
+        filter_key = canonical_key(*_filter_parts(terms, price_ranges))
+        candidates = candidate_sets.get(filter_key) if candidate_sets is not None else None
+        if candidates is None:
+            candidates = snapshot.filter_candidates(terms, price_ranges)
+            if candidates is None:
+                candidates = np.arange(snapshot.size)
+            if candidate_sets is not None:
+                candidate_sets[filter_key] = candidates
+        ranked = _rank_candidates(snapshot, candidates, plan, memo)
+        RESULT_CACHE.put(cache_key, ranked, snapshot.version)
+        return ranked
+
+    return RANKING_FLIGHTS.run((cache_key, snapshot.version), compute)[0]
+
+
+def _rank_candidates(
+    snapshot: CatalogSnapshot,
+    candidates: np.ndarray,
+    plan: ScoringPlan,
+    memo: Optional[SectionMemo] = None,
+    depth: int = 0,
+) -> RankedResult:
+    # Batches keep the serial path so their SectionMemo can share section vectors.
+    if SCORING_POOL is not None and memo is None and SCORING_POOL.engages(snapshot.size):
+        return SCORING_POOL.rank(snapshot, candidates, plan, depth)
+    return RankedResult(
+        candidates,
+        round_scores(plan.score(snapshot.encoded, memo)[candidates]),
+        snapshot.prices[candidates],
+        snapshot.name_ranks[candidates],
+        snapshot.ids[candidates],
+        catalog_version=snapshot.version,
+    )
+
+
+def _page_positions(
+    snapshot: CatalogSnapshot, ranked: RankedResult, limit: int, offset: int, cursor: Optional[CursorKey]
+) -> Tuple[np.ndarray, int]:
+    if cursor is None:
+        return ranked.page(offset, limit), offset
+    score, price, name, dress_id = cursor
+    return ranked.page_after((score, price, snapshot.name_rank_of(name), dress_id), limit)
+
+
+def _render_page(
+    snapshot: CatalogSnapshot,
+    ranked: RankedResult,
+    positions: np.ndarray,
+    weights: Dict[str, Dict[str, Any]],
+    debug: bool,
+    fields: Projection,
+) -> Union[List[Dict[str, Any]], RenderedPage]:
+    # Only the page is serialized: debug traces need per-dress scoring, everything
+    # else is spliced together from the snapshot's cached JSON fragments.
+    if debug:
+        return [
+            project(_score_record(snapshot.records[index], snapshot.tokens[index], weights, debug=True), fields)
+            for index in positions.tolist()
+        ]
+    scores = ranked.scores_of(positions)
+    last = None
+    if positions.size:
+        record = snapshot.records[int(positions[-1])]
+        last = {"id": record["id"], "name": record["name"], "price": record["price"], "score": float(scores[-1])}
+    items_json = snapshot.fragments.render(positions.tolist(), fields, scores.tolist())
+    return RenderedPage(items_json, int(positions.size), last)
+
+
+@contextmanager
+def _read_session() -> Iterator[Any]:
+    # Request-path queries use the read-only pool when one is configured. Catalog
+    # snapshot loads stay on db.session so they see the caller's own transaction.
+    if READ_ENGINE is None:
+        yield db.session
+        return
+    with sa.orm.Session(READ_ENGINE) as session:
+        yield session
+
+
+def _count_filtered(conditions: List[Any]) -> int:
+    count_query = sa.select(sa.func.count()).select_from(WeddingDress)
+    if conditions:
+        count_query = count_query.where(sa.or_(*conditions))
+    with _read_session() as session:
+        return int(session.execute(count_query).scalar() or 0)
+
+
+def _rank_with_sql(
+    filters: Dict[str, Any],
+    plan: ScoringPlan,
+    limit: int,
+    offset: int,
+    debug: bool,
+    cursor: Optional[CursorKey] = None,
+    timer: Optional[StageTimer] = None,
+    fields: Projection = None,
+    facets: bool = False,
+) -> RankResult:
+    timer = timer or StageTimer()
+    weights = plan.weights
+    with timer.stage("filter"):
+        conditions = _build_filter_conditions(filters)
+    dialect_name = db.engine.dialect.name
+    if cursor is not None:
+        offset = 0
+    statement = SQL_SCORER.ranked_select(WeddingDress, weights, conditions, limit, offset, dialect_name, after=cursor)
+    # Filtering, scoring and sorting all happen inside this one query.
+    page_items: List[Dict[str, Any]] = []
+    with _read_session() as session:
+        with timer.stage("fetch"):
+            rows = session.execute(statement).all()
+
+        with timer.stage("serialize"):
+            for row in rows:
+                dress = row[0]
+                if debug:
+                    item = _score_dress(dress, weights, debug=True)
+                else:
+                    item = dress.serialize()
+                item["score"] = round(float(row.score or 0.0), 6)
+                page_items.append(project(item, fields))
+
     score_stats: Optional[Dict[str, float]] = None
-    if score_values:
+    if cursor is not None:
+        # The window count only sees rows after the cursor; the full total needs its own count.
+        with timer.stage("fetch"):
+            total_count = _count_filtered(conditions)
+        offset = total_count - (int(rows[0].total_count) if rows else 0)
+    elif rows:
+        total_count = int(rows[0].total_count)
         score_stats = {
-            "count": float(len(score_values)),
-            "min": min(score_values),
-            "median": statistics.median(score_values),
-            "max": max(score_values),
+            "count": float(total_count),
+            "min": float(rows[0].min_score or 0.0),
+            "max": float(rows[0].max_score or 0.0),
         }
+    else:
+        with timer.stage("fetch"):
+            total_count = _count_filtered(conditions)
+
+    facet_counts = None
+    if facets:
+        # Counts come from the in-memory inverted index rather than one GROUP BY per section.
+        with timer.stage("facets"):
+            snapshot = CATALOG.get()
+            candidates = snapshot.filter_candidates(*_parse_filter_terms(filters))
+            facet_counts = snapshot.facet_counter.counts(candidates)
+    return page_items, total_count, offset, score_stats, None, facet_counts
+
+
+HTTP_COUNTERS: Dict[str, int] = {"not_modified": 0, "batch_requests": 0, "batch_profiles": 0}
+
+
+def _conditional_etag() -> Optional[str]:
+    # Strong validator for cacheable GETs: catalog generation plus a canonical hash of the
+    # query. Repeated filter values are order-insensitive; `fields` order shapes the body.
+    # The generation, unlike the per-process version, is the same in every worker.
+    if request.method != "GET":
+        return None
+    body = request.get_json(silent=True)
+    if _as_bool(request.args.get("debug")) or (isinstance(body, dict) and _as_bool(body.get("debug"))):
+        return None
+    generation = CATALOG.get().generation
+    args = sorted((key, values if key == "fields" else sorted(values)) for key, values in request.args.lists())
+    digest = canonical_key(request.path, args, body, ENABLE_DYNAMIC_SCORING, SCORING_BACKEND)
+    return f"g{generation}-{digest[:32]}"
+
+
+def _not_modified(etag: str) -> Optional[str]:
+    # The variant the client holds, so a 304 confirms the tag of the bytes it cached.
+    return next((tag for tag in etag_variants(etag) if request.if_none_match.contains_weak(tag)), None)
+
+
+def _cacheable(response: Response, etag: str) -> Response:
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = f"public, max-age={HTTP_CACHE_MAX_AGE}"
+    response.vary.add("Accept-Encoding")
+    return response
+
+
+@app.route("/api/dresses", methods=["GET", "POST"])
+def dresses() -> Any:
+    etag = _conditional_etag()
+    matched = _not_modified(etag) if etag else None
+    if matched:
+        HTTP_COUNTERS["not_modified"] += 1
+        return _cacheable(Response(status=304), matched)
+
+    if request.method == "GET" and not ENABLE_DYNAMIC_SCORING:
+        page = _legacy_get_dresses()
+        response = Response(page.items_json, mimetype="application/json")
+        return _cacheable(response, etag) if etag else response
+
+    timer = StageTimer()
+    with timer.stage("parse"):
+        payload = request.get_json(silent=True) or {}
+        filters = payload.get("filters") or {}
+        pagination = payload.get("page") or payload.get("pagination") or {}
+        debug = _as_bool(payload.get("debug"))
+        if not debug:
+            debug = _as_bool(request.args.get("debug"))
+
+        if request.method == "GET":
+            query_filters = _filters_from_query_params()
+            if query_filters:
+                if not filters:
+                    filters = query_filters
+                else:
+                    merged = dict(query_filters)
+                    merged.update(filters)
+                    filters = merged
+            if not pagination:
+                pagination = _pagination_from_query_params()
+
+        limit, offset = _clamp_pagination(*_parse_pagination(pagination))
+        fields = _parse_fields(payload.get("fields") or request.args.get("fields"))
+        want_facets = _as_bool(payload.get("facets")) or _as_bool(request.args.get("facets"))
+        cursor: Optional[CursorKey] = None
+        cursor_generation: Optional[str] = None
+        cursor_token = pagination.get("cursor") if isinstance(pagination, dict) else None
+        if cursor_token:
+            decoded = _decode_cursor(cursor_token)
+            if decoded is None:
+                return jsonify({"error": "invalid cursor"}), 400
+            cursor_generation, cursor = decoded
+
+    with timer.stage("weights"):
+        plan = _scoring_plan(payload)
+        weights, source = plan.weights, plan.source
+
+    if SCORING_BACKEND == "sql":
+        rank = _rank_with_sql
+    else:
+        # Checked up front so a stale cursor never costs a scoring pass.
+        with timer.stage("fetch"):
+            current = CATALOG.get()
+        if cursor_generation is not None and cursor_generation != current.generation:
+            return jsonify(_cursor_expired(current)), 410
+        rank = functools.partial(_rank_in_memory, snapshot=current)
+
+    start = time.perf_counter()
+    page_items, total_count, offset, score_stats, snapshot, facet_counts = rank(
+        filters, plan, limit, offset, bool(debug), cursor=cursor, timer=timer, fields=fields, facets=want_facets
+    )
+    duration_ms = (time.perf_counter() - start) * 1000.0
+    catalog_version = snapshot.version if snapshot is not None else None
+    generation = snapshot.generation if snapshot is not None else None
+
+    if score_stats:
         app.logger.debug(
-            "dynamic_scoring_scores count=%d min=%.3f median=%.3f max=%.3f",
+            "dynamic_scoring_scores count=%d min=%.3f max=%.3f",
             int(score_stats["count"]),
             score_stats["min"],
-            score_stats["median"],
             score_stats["max"],
         )
 
-    limit, offset = _parse_pagination(pagination)
-    page_items, page_info = _paginate(scored, limit, offset)
-
-    telemetry = LATENCY_TRACKER.record(duration_ms)
-    if "p95_ms" in telemetry:
-        app.logger.info(
-            "dynamic_scoring_request duration_ms=%.2f p95_ms=%.2f samples=%d",
-            telemetry["duration_ms"],
-            telemetry["p95_ms"],
-            int(telemetry["samples"]),
-        )
-    else:
-        app.logger.info(
-            "dynamic_scoring_request duration_ms=%.2f samples=%d",
-            telemetry["duration_ms"],
-            int(telemetry["samples"]),
-        )
+    page_info = _page_info(total_count, limit, offset, len(page_items), _next_cursor(page_items, generation))
 
     response: Dict[str, Any] = {
-        "items": page_items,
-        "total_count": len(scored),
+        "total_count": total_count,
         "pageInfo": page_info,
     }
+    if facet_counts is not None:
+        response["facets"] = facet_counts
 
     if debug:
         response["debug"] = {
@@ -680,11 +1461,275 @@ def dresses() -> Any:
             "weights": weights,
             "filters": filters,
             "duration_ms": round(duration_ms, 3),
+            "timings_ms": {stage: round(value, 3) for stage, value in timer.durations.items()},
+            "scoring_backend": SCORING_BACKEND,
+            "catalog_version": catalog_version,
         }
         if score_stats:
             response["debug"]["score_stats"] = score_stats
 
-    return jsonify(response)
+    with timer.stage("serialize"):
+        if isinstance(page_items, RenderedPage):
+            encoded_response = Response(_json_body(page_items, response), mimetype="application/json")
+        else:
+            encoded_response = jsonify(dict(response, items=page_items))
+        if etag:
+            _cacheable(encoded_response, etag)
+
+    LATENCY_TRACKER.record_request(timer.finish())
+    total_p95 = LATENCY_TRACKER.quantile("total", 0.95)
+    app.logger.info(
+        "dynamic_scoring_request duration_ms=%.2f total_ms=%.2f p95_ms=%.2f",
+        duration_ms,
+        timer.durations["total"],
+        total_p95 or 0.0,
+    )
+    return encoded_response
+
+
+def _rank_batch_entry(
+    snapshot: CatalogSnapshot,
+    entry: Dict[str, Any],
+    candidate_sets: Dict[str, np.ndarray],
+    memo: SectionMemo,
+) -> str:
+    filters = entry.get("filters") or {}
+    pagination = entry.get("page") or entry.get("pagination") or {}
+    debug = _as_bool(entry.get("debug"))
+    limit, offset = _clamp_pagination(*_parse_pagination(pagination))
+    fields = _parse_fields(entry.get("fields"))
+    cursor: Optional[CursorKey] = None
+    cursor_token = pagination.get("cursor") if isinstance(pagination, dict) else None
+    if cursor_token:
+        decoded = _decode_cursor(cursor_token)
+        if decoded is None:
+            return encode_value({"error": "invalid cursor"})
+        generation, cursor = decoded
+        if generation is not None and generation != snapshot.generation:
+            return encode_value(_cursor_expired(snapshot))
+    plan = _scoring_plan(entry)
+    weights, source = plan.weights, plan.source
+
+    ranked = _ranked_result(snapshot, filters, plan, candidate_sets, memo)
+    positions, offset = _page_positions(snapshot, ranked, limit, offset, cursor)
+    page_items = _render_page(snapshot, ranked, positions, weights, debug, fields)
+    envelope: Dict[str, Any] = {
+        "total_count": ranked.total,
+        "pageInfo": _page_info(ranked.total, limit, offset, len(page_items), _next_cursor(page_items, snapshot.generation)),
+    }
+    if _as_bool(entry.get("facets")):
+        envelope["facets"] = _ranked_facets(snapshot, ranked)
+    if debug:
+        envelope["debug"] = {"weights_source": source, "weights": weights, "filters": filters}
+    return _json_body(page_items, envelope)
+
+
+@app.route("/api/dresses/batch", methods=["POST"])
+def dresses_batch() -> Any:
+    # Many ranking requests against one catalog snapshot. Requests sharing filters share
+    # candidate sets, and identical section weights are scored once per batch.
+    payload = request.get_json(silent=True)
+    entries = payload.get("requests") if isinstance(payload, dict) else payload
+    if not isinstance(entries, list) or not all(isinstance(entry, dict) for entry in entries):
+        return jsonify({"error": "expected a list of ranking requests"}), 400
+    if len(entries) > BATCH_MAX_REQUESTS:
+        return jsonify({"error": f"at most {BATCH_MAX_REQUESTS} requests per batch"}), 400
+
+    start = time.perf_counter()
+    snapshot = CATALOG.get()
+    candidate_sets: Dict[str, np.ndarray] = {}
+    memo = SectionMemo(snapshot.size)
+    results = [_rank_batch_entry(snapshot, entry, candidate_sets, memo) for entry in entries]
+    duration_ms = (time.perf_counter() - start) * 1000.0
+
+    HTTP_COUNTERS["batch_requests"] += 1
+    HTTP_COUNTERS["batch_profiles"] += len(entries)
+    app.logger.info(
+        "dynamic_scoring_batch requests=%d filter_sets=%d memo_hits=%d duration_ms=%.2f",
+        len(entries),
+        len(candidate_sets),
+        memo.hits,
+        duration_ms,
+    )
+    body = '{"results":[' + ",".join(results) + "]," + f'"count":{len(results)},"catalog_version":{snapshot.version}}}'
+    return Response(body, mimetype="application/json")
+
+
+def iter_export_lines(
+    snapshot: CatalogSnapshot,
+    ranked: RankedResult,
+    weights: Dict[str, Dict[str, Any]],
+    debug: bool = False,
+    fields: Projection = None,
+    chunk_size: int = 1000,
+) -> Iterator[str]:
+    # NDJSON, best match first. Rendering works one chunk at a time and bypasses the
+    # fragment cache, so memory stays flat beyond the ranking itself.
+    order = ranked.top(ranked.total)
+    for start in range(0, order.shape[0], chunk_size):
+        positions = order[start : start + chunk_size]
+        if debug:
+            lines = [
+                encode_value(project(_score_record(snapshot.records[index], snapshot.tokens[index], weights, debug=True), fields))
+                for index in positions.tolist()
+            ]
+        else:
+            lines = snapshot.fragments.items(positions.tolist(), fields, ranked.scores_of(positions).tolist(), cache=False)
+        yield "\n".join(lines) + "\n"
+
+
+@app.route("/api/dresses/export", methods=["GET", "POST"])
+def export_dresses() -> Any:
+    payload = request.get_json(silent=True) or {}
+    filters = payload.get("filters") or {}
+    if request.method == "GET" and not filters:
+        filters = _filters_from_query_params()
+    debug = _as_bool(payload.get("debug")) or _as_bool(request.args.get("debug"))
+    fields = _parse_fields(payload.get("fields") or request.args.get("fields"))
+    plan = _scoring_plan(payload)
+
+    snapshot = CATALOG.get()
+    ranked = _ranked_result(snapshot, filters, plan)
+    lines = iter_export_lines(snapshot, ranked, plan.weights, debug, fields, EXPORT_CHUNK_SIZE)
+    response = Response(lines, mimetype="application/x-ndjson")
+    response.headers["X-Total-Count"] = str(ranked.total)
+    response.headers["X-Catalog-Version"] = str(snapshot.version)
+    return response
+
+
+@app.route("/api/catalog/reload", methods=["POST"])
+def reload_catalog() -> Any:
+    if CATALOG_ADMIN_TOKEN and request.headers.get("X-Admin-Token") != CATALOG_ADMIN_TOKEN:
+        return jsonify({"error": "forbidden"}), 403
+    snapshot = CATALOG.reload()
+    return jsonify({"version": snapshot.version, "size": snapshot.size, "fingerprint": list(snapshot.fingerprint)})
+
+
+@app.route("/api/metrics", methods=["GET"])
+def metrics() -> Any:
+    cache = RESULT_CACHE.stats()
+    flights = RANKING_FLIGHTS.stats()
+    snapshot = CATALOG.current
+    counters = {
+        "best_dressed_result_cache_hits_total": ("Ranked-result cache hits.", cache["hits"]),
+        "best_dressed_result_cache_misses_total": ("Ranked-result cache misses.", cache["misses"]),
+        "best_dressed_result_cache_evictions_total": ("Ranked-result cache LRU evictions.", cache["evictions"]),
+        "best_dressed_result_cache_entries": ("Ranked results currently cached.", cache["entries"]),
+        "best_dressed_result_cache_bytes": ("Bytes held by cached ranked results.", cache["bytes"]),
+        "best_dressed_ranking_computations_total": ("Rankings computed after a cache miss.", flights["leaders"]),
+        "best_dressed_coalesced_requests_total": (
+            "Requests that shared a concurrent identical ranking instead of computing their own.",
+            flights["coalesced"],
+        ),
+        "best_dressed_coalesce_wait_timeouts_total": (
+            "Coalesced requests that gave up waiting and ranked on their own.",
+            flights["wait_timeouts"],
+        ),
+        "best_dressed_rankings_in_flight": ("Rankings being computed right now.", flights["in_flight"]),
+        "best_dressed_catalog_version": ("Version of the in-memory catalog snapshot.", snapshot.version if snapshot else 0),
+        "best_dressed_catalog_size": ("Dresses in the in-memory catalog snapshot.", snapshot.size if snapshot else 0),
+        "best_dressed_catalog_full_builds_total": ("Catalog snapshots built from a full table load.", CATALOG.counters["full_builds"]),
+        "best_dressed_catalog_delta_applies_total": (
+            "Catalog snapshots derived from the change log.",
+            CATALOG.counters["delta_applies"],
+        ),
+        "best_dressed_not_modified_responses_total": ("Conditional GETs answered with 304.", HTTP_COUNTERS["not_modified"]),
+        "best_dressed_batch_requests_total": ("Calls to /api/dresses/batch.", HTTP_COUNTERS["batch_requests"]),
+        "best_dressed_batch_profiles_total": ("Ranking requests served through /api/dresses/batch.", HTTP_COUNTERS["batch_profiles"]),
+        "best_dressed_compressed_responses_total": ("Responses compressed.", COMPRESSOR.counters["compressed"]),
+        "best_dressed_compression_input_bytes_total": ("Bytes before compression.", COMPRESSOR.counters["bytes_in"]),
+        "best_dressed_compression_output_bytes_total": ("Bytes after compression.", COMPRESSOR.counters["bytes_out"]),
+        "best_dressed_parallel_scoring_requests_total": (
+            "Rankings scored by the shared-memory worker pool.",
+            SCORING_POOL.requests if SCORING_POOL is not None else 0,
+        ),
+    }
+    body = prometheus_text(LATENCY_TRACKER.snapshot(), counters)
+    return Response(body, mimetype="text/plain; version=0.0.4")
+
+
+@app.route("/api/cache/stats", methods=["GET"])
+def cache_stats() -> Any:
+    return jsonify({"results": RESULT_CACHE.stats(), "coalescing": RANKING_FLIGHTS.stats()})
+
+
+# Warm-up state reported by /api/ready: "cold", "warming", "ready" or "failed".
+WARM_UP: Dict[str, Any] = {"state": "cold", "seconds": None, "error": None}
+_WARM_UP_LOCK = threading.Lock()
+
+
+def warm_start(freeze: bool = True) -> CatalogSnapshot:
+    # Builds the catalog snapshot (tokens, encoded columns, postings, price order,
+    # facet codes) and the default scoring plan ahead of traffic. Called from the
+    # pre-forking server's master (see gunicorn.conf.py) so every worker inherits it.
+    # The snapshot's bulk lives in numpy buffers; freezing moves the Python objects
+    # out of the collector's reach, so collections in the workers do not write to
+    # their headers and the pages stay shared copy-on-write.
+    WARM_UP.update(state="warming", error=None)
+    start = time.perf_counter()
+    try:
+        # Holding the ANALYZE lock waits out a running drift ANALYZE and keeps the
+        # load from starting one, so no thread or held lock is inherited across fork.
+        with _ANALYZE_LOCK:
+            with app.app_context():
+                snapshot = CATALOG.get()
+                snapshot.facet_counter.counts()
+                _scoring_plan({}).steps(snapshot.encoded)
+                db.session.remove()
+            if freeze:
+                # Pre-fork: the master keeps no connections for workers to inherit.
+                _dispose_engines(close=True)
+                gc.collect()
+                gc.freeze()
+    except Exception as exc:
+        # /api/ready reports the failure and retries on the next probe.
+        WARM_UP.update(state="failed", seconds=None, error=f"{type(exc).__name__}: {exc}")
+        app.logger.exception("Catalog warm-up failed")
+        raise
+    WARM_UP.update(state="ready", seconds=round(time.perf_counter() - start, 3))
+    return snapshot
+
+
+def _background_warm_start() -> None:
+    try:
+        warm_start(freeze=False)
+    except Exception:  # logged and recorded in WARM_UP by warm_start
+        pass
+
+
+def _dispose_engines(close: bool) -> None:
+    with app.app_context():
+        db.engine.dispose(close=close)
+    if READ_ENGINE is not None:
+        READ_ENGINE.dispose(close=close)
+
+
+def after_fork() -> None:
+    # In a forked worker: drop the pooled connections inherited from the master
+    # without closing them, so the master's sockets/file handles are left alone.
+    _dispose_engines(close=False)
+
+
+@app.route("/api/ready", methods=["GET"])
+def ready() -> Any:
+    if WARM_UP["state"] != "ready":
+        # A worker started without the preload hook (or whose warm-up failed) warms
+        # up in the background; a failure is reported once, then retried.
+        with _WARM_UP_LOCK:
+            state, error = WARM_UP["state"], WARM_UP["error"]
+            start = state in ("cold", "failed")
+            if start:
+                WARM_UP["state"] = "warming"
+        if start:
+            threading.Thread(target=_background_warm_start, name="catalog-warm-up", daemon=True).start()
+        body: Dict[str, Any] = {"ready": False, "state": "failed" if state == "failed" else "warming"}
+        if state == "failed":
+            body["error"] = error
+        return jsonify(body), 503
+    snapshot = CATALOG.get()
+    return jsonify(
+        {"ready": True, "version": snapshot.version, "size": snapshot.size, "warm_up_seconds": WARM_UP["seconds"]}
+    )
 
 
 with app.app_context():
@@ -694,4 +1739,5 @@ with app.app_context():
 if __name__ == "__main__":
     print(f"🌐 Using DB at {db_path}")
     print(f"ENABLE_DYNAMIC_SCORING={ENABLE_DYNAMIC_SCORING}")
+    print(f"JSON encoder={'orjson' if app.json.use_fast and fast_json_available() else 'stdlib'} compression={','.join(available_encodings()) if RESPONSE_COMPRESSION else 'off'}")
     app.run(debug=True, host="0.0.0.0", port=5050)
@@ -0,0 +1,213 @@
+# benchmark.py
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+from synthetic_catalog import ARRAY_VOCABULARY, SCALAR_VOCABULARY, populate
+
+# Drives /api/dresses through the Flask test client against synthetic catalogs
+# and prints one JSON report: throughput, per-stage latency percentiles (from the
+# app's own LATENCY_TRACKER) and peak RSS per catalog size. The app is imported
+# only after DATABASE_URL points at a scratch database, so the real
+# instance/dresses.db is never touched.
+
+DEFAULT_SIZES = (1000, 10000, 100000, 1000000)
+PRIORITY_SECTIONS = tuple(SCALAR_VOCABULARY) + tuple(ARRAY_VOCABULARY) + ("price", "has_pockets", "shipin48hrs")
+FILTER_SECTIONS = ("color", "silhouette", "fabric", "neckline", "tags", "weddingvenue")
+PRICE_FILTERS = ("0-500", "500-1000", "1000-1500", "1500-2000", "2000+")
+PAYLOAD_KINDS = ("priority", "filters", "priority+filters", "weights", "deep-page", "cursor")
+
+
+def _values_for(section: str) -> Sequence[str]:
+    if section == "price":
+        return PRICE_FILTERS
+    if section in ("has_pockets", "shipin48hrs"):
+        return ("true",)
+    return SCALAR_VOCABULARY.get(section) or ARRAY_VOCABULARY[section]
+
+
+def _priority(rng: random.Random) -> Dict[str, Any]:
+    sections = rng.sample(PRIORITY_SECTIONS, rng.randint(2, 5))
+    values = {}
+    for section in sections:
+        vocabulary = _values_for(section)
+        values[section] = rng.sample(vocabulary, min(len(vocabulary), rng.randint(1, 3)))
+    return {"sections": sections, "values": values}
+
+
+def _filters(rng: random.Random) -> Dict[str, Any]:
+    filters: Dict[str, Any] = {}
+    for section in rng.sample(FILTER_SECTIONS, rng.randint(1, 2)):
+        vocabulary = _values_for(section)
+        filters[section] = rng.sample(vocabulary, rng.randint(1, 3))
+    if rng.random() < 0.3:
+        filters["price"] = rng.sample(PRICE_FILTERS, 2)
+    return filters
+
+
+def benchmark_payloads(count: int, seed: int = 0) -> List[Dict[str, Any]]:
+    # A fixed request mix; roughly a third repeat an earlier payload so the
+    # result cache sees realistic reuse.
+    rng = random.Random(seed)
+    payloads: List[Dict[str, Any]] = []
+    for index in range(count):
+        if payloads and rng.random() < 0.3:
+            payloads.append(dict(rng.choice(payloads)))
+            continue
+        kind = PAYLOAD_KINDS[index % len(PAYLOAD_KINDS)]
+        payload: Dict[str, Any] = {"kind": kind, "page": {"limit": 24}}
+        if kind in ("priority", "priority+filters", "deep-page", "cursor"):
+            payload["priority"] = _priority(rng)
+        if kind in ("filters", "priority+filters"):
+            payload["filters"] = _filters(rng)
+        if kind == "weights":
+            payload["weights"] = {
+                section: {"section": rng.uniform(0.5, 10.0), "values": {value: rng.uniform(0.1, 3.0) for value in rng.sample(_values_for(section), 1)}}
+                for section in rng.sample(PRIORITY_SECTIONS, 3)
+            }
+        if kind == "deep-page":
+            payload["page"] = {"limit": 24, "offset": rng.choice((240, 960, 4800))}
+        payloads.append(payload)
+    return payloads
+
+
+def _peak_rss_bytes() -> Optional[int]:
+    try:
+        import resource
+    except ImportError:  # pragma: no cover - Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes.
+    return int(peak if sys.platform == "darwin" else peak * 1024)
+
+
+def _request_body(payload: Dict[str, Any], **overrides: Any) -> Dict[str, Any]:
+    body = {key: value for key, value in payload.items() if key != "kind"}
+    body.update(overrides)
+    return body
+
+
+def run_size(app_module: Any, size: int, payloads: List[Dict[str, Any]], seed: int, warmup: int) -> Dict[str, Any]:
+    app, db = app_module.app, app_module.db
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        start = time.perf_counter()
+        with db.engine.begin() as connection:
+            populate(connection, app_module.WeddingDress.__table__, size, seed=seed)
+        generate_seconds = time.perf_counter() - start
+        app_module.ensure_indexes()
+        app_module.analyze_catalog()
+
+        start = time.perf_counter()
+        snapshot = app_module.CATALOG.reload()
+        snapshot_seconds = time.perf_counter() - start
+
+        client = app.test_client()
+        for payload in payloads[:warmup]:
+            client.post("/api/dresses", json=_request_body(payload))
+        app_module.RESULT_CACHE.clear()
+        app_module.LATENCY_TRACKER.reset()
+
+        errors = 0
+        kinds: Dict[str, int] = {}
+        start = time.perf_counter()
+        for payload in payloads:
+            kinds[payload["kind"]] = kinds.get(payload["kind"], 0) + 1
+            response = client.post("/api/dresses", json=_request_body(payload))
+            if response.status_code != 200:
+                errors += 1
+                continue
+            if payload["kind"] == "cursor":
+                cursor = response.get_json()["pageInfo"].get("nextCursor")
+                if cursor:
+                    follow = client.post("/api/dresses", json=_request_body(payload, page={"limit": 24, "cursor": cursor}))
+                    errors += follow.status_code != 200
+        elapsed = time.perf_counter() - start
+        requests_sent = len(payloads) + kinds.get("cursor", 0)
+
+        return {
+            "size": size,
+            "catalog_size": snapshot.size,
+            "generate_seconds": round(generate_seconds, 3),
+            "snapshot_build_seconds": round(snapshot_seconds, 3),
+            "catalog_bytes": snapshot.nbytes,
+            "catalog_bytes_per_dress": round(snapshot.nbytes / snapshot.size, 1) if snapshot.size else None,
+            "requests": requests_sent,
+            "payload_kinds": kinds,
+            "errors": errors,
+            "elapsed_seconds": round(elapsed, 3),
+            "throughput_rps": round(requests_sent / elapsed, 2) if elapsed else None,
+            "stages_ms": app_module.LATENCY_TRACKER.snapshot(),
+            "result_cache": app_module.RESULT_CACHE.stats(),
+            "peak_rss_bytes": _peak_rss_bytes(),
+        }
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark /api/dresses against synthetic catalogs.")
+    parser.add_argument("--sizes", default=",".join(str(size) for size in DEFAULT_SIZES), help="comma-separated catalog sizes")
+    parser.add_argument("--requests", type=int, default=200, help="measured requests per size")
+    parser.add_argument("--warmup", type=int, default=10, help="unmeasured requests per size")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--backend", choices=("memory", "sql"), default="memory")
+    parser.add_argument("--database", help="scratch SQLite file (default: a temporary file, deleted afterwards)")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    args = parser.parse_args(argv)
+
+    if "app" in sys.modules:
+        parser.error("run benchmark.py in its own process; the app is already bound to a database")
+
+    sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+    workdir = None
+    database = args.database
+    if not database:
+        workdir = tempfile.TemporaryDirectory(prefix="best-dressed-bench-")
+        database = os.path.join(workdir.name, "bench.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.abspath(database)}"
+    os.environ.setdefault("ENABLE_DYNAMIC_SCORING", "true")
+
+    import app as app_module  # noqa: E402  (import after DATABASE_URL is set)
+
+    app_module.SCORING_BACKEND = args.backend
+    app_module.app.logger.setLevel("WARNING")
+    payloads = benchmark_payloads(args.requests, seed=args.seed)
+
+    results = []
+    for size in sizes:
+        results.append(run_size(app_module, size, payloads, seed=args.seed, warmup=args.warmup))
+        print(f"📊 {size} dresses: {results[-1]['throughput_rps']} req/s", file=sys.stderr)
+
+    report = {
+        "generated_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {
+            "sizes": sizes,
+            "requests": args.requests,
+            "warmup": args.warmup,
+            "seed": args.seed,
+            "backend": args.backend,
+            "result_cache_size": app_module.RESULT_CACHE_SIZE,
+        },
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as handle:
+            handle.write(text + "\n")
+    else:
+        print(text)
+    if workdir is not None:
+        workdir.cleanup()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,307 @@
+import bisect
+import hashlib
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from compact_records import BOOL, MISSING, CompactRecords
+from facets import FacetCounter
+from filter_index import FilterIndex, NullMasks, PriceRange
+from json_fragments import FragmentCache
+from scoring_engine import CatalogEncoder, EncodedCatalog, name_ranks_for, update_encoded
+
+# Process-wide, read-only view of the wedding_dresses table. A snapshot is never
+# mutated after it is built; reloads build a new one and swap the reference.
+# Records live in a CompactRecords column store and tokens are decoded from the
+# encoded catalog on demand, so a snapshot holds no per-dress Python objects.
+# Small writes are applied as a delta: with_changes derives the next snapshot
+# from the current one, re-encoding only the changed rows.
+
+Fingerprint = Tuple[Any, ...]
+# (record, section tokens) of a changed dress, or None when it was deleted.
+ChangedRow = Optional[Tuple[Dict[str, Any], Dict[str, List[str]]]]
+# Returns (fingerprint, {dress id: ChangedRow}, expected size) for the writes made
+# since the given snapshot, or None when only a full reload can catch up.
+DeltaLoader = Callable[["CatalogSnapshot"], Optional[Tuple[Fingerprint, Dict[int, ChangedRow], int]]]
+
+
+class TokenRows(Sequence):
+    # snapshot.tokens: each row's section tokens, read back from the encoded catalog.
+    def __init__(self, encoded: EncodedCatalog) -> None:
+        self._encoded = encoded
+
+    def __len__(self) -> int:
+        return self._encoded.size
+
+    def __getitem__(self, position: Any) -> Any:
+        if isinstance(position, slice):
+            return [self._encoded.row_tokens(index) for index in range(*position.indices(len(self)))]
+        position = int(position)
+        if position < 0:
+            position += len(self)
+        if not 0 <= position < len(self):
+            raise IndexError("token row out of range")
+        return self._encoded.row_tokens(position)
+
+
+class CatalogSnapshot:
+    def __init__(
+        self,
+        version: int,
+        fingerprint: Fingerprint,
+        records: Iterable[Mapping[str, Any]],
+        tokens: Iterable[Dict[str, List[str]]],
+        section_types: Dict[str, str],
+        record_fields: Dict[str, str],
+    ) -> None:
+        # Single pass over both iterables, so they can stream rows from the database.
+        store = CompactRecords(record_fields)
+        encoder = CatalogEncoder(section_types)
+        for record, row_tokens in zip(records, tokens):
+            store.append(record)
+            encoder.add(row_tokens)
+        store.freeze()
+        encoded = encoder.finish()
+        raw_prices = store.column("price")
+        names = [name or "" for name in store.strings("name")]
+        self._assign(
+            version,
+            fingerprint,
+            store,
+            raw_prices,
+            name_ranks_for(names),
+            sorted(set(names)),
+            encoded,
+            FilterIndex(encoded, raw_prices, _boolean_nulls(store, encoded)),
+        )
+
+    def _assign(
+        self,
+        version: int,
+        fingerprint: Fingerprint,
+        records: CompactRecords,
+        raw_prices: np.ndarray,
+        name_ranks: np.ndarray,
+        sorted_names: List[str],
+        encoded: EncodedCatalog,
+        filter_index: FilterIndex,
+    ) -> None:
+        self.version = version
+        self.fingerprint = fingerprint
+        self.loaded_at = time.time()
+        self.records = records
+        self.tokens = TokenRows(encoded)
+        self.size = len(records)
+        self.ids = records.column("id")
+        # Raw prices keep NULL as NaN for filters; sort prices treat NULL as 0 like the original sort key.
+        self.raw_prices = raw_prices
+        self.prices = np.nan_to_num(raw_prices, nan=0.0)
+        self.name_ranks = name_ranks
+        self.sorted_names = sorted_names
+        self.encoded = encoded
+        self.filter_index = filter_index
+        self.fragments = FragmentCache(records)
+        self._index_by_id: Optional[Dict[int, int]] = None
+        self._facet_counter: Optional[FacetCounter] = None
+
+    def with_changes(self, version: int, fingerprint: Fingerprint, changes: Dict[int, ChangedRow]) -> "CatalogSnapshot":
+        # The snapshot after inserting, updating and deleting the given dresses. Costs
+        # O(changed rows) Python work plus a few vectorized passes over the columns.
+        upserts = np.asarray(sorted(dress_id for dress_id, row in changes.items() if row is not None), dtype=np.int64)
+        deleted = np.asarray([dress_id for dress_id, row in changes.items() if row is None], dtype=np.int64)
+        kept = np.ones(self.size, dtype=bool)
+        kept[self._positions_of(deleted)] = False
+        kept_ids = self.ids[kept]
+        found = np.searchsorted(kept_ids, upserts)
+        exists = found < kept_ids.shape[0]
+        exists[exists] = kept_ids[found[exists]] == upserts[exists]
+        inserted = upserts[~exists]
+        ids = np.insert(kept_ids, np.searchsorted(kept_ids, inserted), inserted)
+        old_to_new = np.full(self.size, -1, dtype=np.int64)
+        old_to_new[kept] = np.searchsorted(ids, kept_ids)
+        positions = np.searchsorted(ids, upserts)
+        old_positions = self._positions_of(np.fromiter(changes, dtype=np.int64, count=len(changes)))
+
+        # Every (section, value) a changed dress carried before or after the write.
+        touched = set()
+        for index in old_positions.tolist():
+            for key, values in self.tokens[index].items():
+                touched.update((key, value) for value in values)
+        changed_records: Dict[int, Mapping[str, Any]] = {}
+        changed_tokens: Dict[int, Dict[str, List[str]]] = {}
+        for dress_id, position in zip(upserts.tolist(), positions.tolist()):
+            record, row_tokens = changes[dress_id]
+            changed_records[position] = record
+            changed_tokens[position] = row_tokens
+            for key, values in row_tokens.items():
+                touched.update((key, value) for value in values)
+
+        records = self.records.spliced(old_to_new, len(ids), changed_records)
+        raw_prices = records.column("price")
+
+        changed_names = [_name(changed_records[position]) for position in positions.tolist()]
+        # Names new to the catalog take dense ranks of their own and push later names up
+        # one rank each; names that vanished leave gaps, which keep the order intact.
+        new_names = sorted({name for name in changed_names if not self.name_rank_of(name).is_integer()})
+        slots = np.asarray([bisect.bisect_left(self.sorted_names, name) for name in new_names], dtype=np.int64)
+        sorted_names = list(self.sorted_names) if new_names else self.sorted_names
+        for offset, (slot, name) in enumerate(zip(slots.tolist(), new_names)):
+            sorted_names.insert(slot + offset, name)
+        name_ranks = np.empty(len(ids), dtype=self.name_ranks.dtype)
+        kept_ranks = self.name_ranks[kept]
+        name_ranks[old_to_new[kept]] = kept_ranks + np.searchsorted(slots, kept_ranks, side="right")
+        name_ranks[positions] = [bisect.bisect_left(sorted_names, name) for name in changed_names]
+
+        encoded = update_encoded(self.encoded, old_to_new, len(ids), changed_tokens)
+        nulls = _boolean_nulls(records, encoded)
+        filter_index = self.filter_index.updated(encoded, raw_prices, old_to_new, positions, touched, nulls)
+        snapshot = CatalogSnapshot.__new__(CatalogSnapshot)
+        snapshot._assign(version, fingerprint, records, raw_prices, name_ranks, sorted_names, encoded, filter_index)
+        return snapshot
+
+    def _positions_of(self, dress_ids: np.ndarray) -> np.ndarray:
+        # Positions of the given ids that are in this snapshot (ids are sorted).
+        found = np.searchsorted(self.ids, dress_ids)
+        inside = found < self.size
+        found = found[inside]
+        return found[self.ids[found] == dress_ids[inside]]
+
+    @property
+    def generation(self) -> str:
+        # Names the table state this snapshot reflects. Unlike `version`, which counts
+        # this process's reloads, every worker that loaded the same state agrees on it.
+        return hashlib.sha256(repr(tuple(self.fingerprint)).encode("utf-8")).hexdigest()[:16]
+
+    @property
+    def index_by_id(self) -> Dict[int, int]:
+        if self._index_by_id is None:
+            self._index_by_id = {int(dress_id): index for index, dress_id in enumerate(self.ids.tolist())}
+        return self._index_by_id
+
+    @property
+    def nbytes(self) -> int:
+        # Resident size of the columns and indexes; fragment and facet caches excluded.
+        columns = sum(int(array.nbytes) for array in (self.prices, self.raw_prices, self.name_ranks))
+        names = sum(sys.getsizeof(name) for name in self.sorted_names)
+        return self.records.nbytes + self.encoded.nbytes + self.filter_index.nbytes + columns + names
+
+    @property
+    def facet_counter(self) -> FacetCounter:
+        # Built on first use; most snapshots never serve a facet request.
+        if self._facet_counter is None:
+            self._facet_counter = FacetCounter(self.encoded)
+        return self._facet_counter
+
+    def name_rank_of(self, name: str) -> float:
+        # Dense rank matching name_ranks; names missing from this snapshot land between neighbours.
+        position = bisect.bisect_left(self.sorted_names, name)
+        if position < len(self.sorted_names) and self.sorted_names[position] == name:
+            return float(position)
+        return position - 0.5
+
+    def filter_candidates(self, terms: Dict[str, List[str]], price_ranges: Sequence[PriceRange]) -> Optional[np.ndarray]:
+        return self.filter_index.candidates(terms, price_ranges)
+
+
+def _boolean_nulls(records: CompactRecords, encoded: EncodedCatalog) -> NullMasks:
+    # Boolean sections read the column of the same name.
+    return {
+        key: records.column(key) == MISSING
+        for key, section in encoded.sections.items()
+        if section.section_type == "boolean" and records.fields.get(key) == BOOL
+    }
+
+
+def _name(record: Mapping[str, Any]) -> str:
+    return record.get("name") or ""
+
+
+class CatalogStore:
+    def __init__(
+        self,
+        loader: Callable[[], Tuple[Fingerprint, Iterable[Mapping[str, Any]], Iterable[Dict[str, List[str]]]]],
+        probe: Callable[[], Fingerprint],
+        section_types: Dict[str, str],
+        record_fields: Dict[str, str],
+        refresh_interval: float = 30.0,
+        delta_loader: Optional[DeltaLoader] = None,
+    ) -> None:
+        self._loader = loader
+        self._probe = probe
+        self._delta_loader = delta_loader
+        self._section_types = section_types
+        self._record_fields = record_fields
+        self.refresh_interval = refresh_interval
+        self.counters = {"full_builds": 0, "delta_applies": 0}
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._checked_at = 0.0
+        self._version = 0
+        self._lock = threading.Lock()
+
+    @property
+    def current(self) -> Optional[CatalogSnapshot]:
+        return self._snapshot
+
+    def get(self) -> CatalogSnapshot:
+        snapshot = self._snapshot
+        if snapshot is None:
+            return self.reload()
+        if self.refresh_interval >= 0 and time.monotonic() - self._checked_at >= self.refresh_interval:
+            return self._refresh_if_changed(snapshot)
+        return snapshot
+
+    def reload(self) -> CatalogSnapshot:
+        with self._lock:
+            return self._build()
+
+    def invalidate(self) -> None:
+        self._checked_at = 0.0
+        self._snapshot = None
+
+    def mark_stale(self) -> None:
+        # The next get() probes immediately instead of waiting out the refresh interval.
+        self._checked_at = 0.0
+
+    def _refresh_if_changed(self, snapshot: CatalogSnapshot) -> CatalogSnapshot:
+        # Only one thread probes; the rest keep serving the current snapshot.
+        if not self._lock.acquire(blocking=False):
+            return snapshot
+        try:
+            current = self._snapshot or snapshot
+            self._checked_at = time.monotonic()
+            if tuple(self._probe()) == current.fingerprint:
+                return current
+            return self._apply_delta(current) or self._build()
+        finally:
+            self._lock.release()
+
+    def _apply_delta(self, current: CatalogSnapshot) -> Optional[CatalogSnapshot]:
+        if self._delta_loader is None:
+            return None
+        delta = self._delta_loader(current)
+        if delta is None:
+            return None
+        fingerprint, changes, expected_size = delta
+        snapshot = current.with_changes(self._version + 1, tuple(fingerprint), changes)
+        if snapshot.size != expected_size:
+            # Writes the change log did not see (bulk loads, raw SQL on another backend).
+            return None
+        self._version += 1
+        self.counters["delta_applies"] += 1
+        self._snapshot = snapshot
+        self._checked_at = time.monotonic()
+        return snapshot
+
+    def _build(self) -> CatalogSnapshot:
+        fingerprint, records, tokens = self._loader()
+        self._version += 1
+        snapshot = CatalogSnapshot(
+            self._version, tuple(fingerprint), records, tokens, self._section_types, self._record_fields
+        )
+        self.counters["full_builds"] += 1
+        self._snapshot = snapshot
+        self._checked_at = time.monotonic()
+        return snapshot
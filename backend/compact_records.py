@@ -0,0 +1,214 @@
+import sys
+from array import array
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence
+
+import numpy as np
+
+# Column-oriented, read-only store for catalog records. Instead of one dict (and
+# four lists) per dress, every field is a column: ids and prices are numpy arrays,
+# booleans are int8 (-1 for NULL), strings are int32 codes into an interned
+# vocabulary, and list fields are CSR offsets plus codes. Records are decoded into
+# plain dicts only when a page is rendered.
+
+INT, FLOAT, BOOL, STR, LIST = "int", "float", "bool", "str", "list"
+MISSING = -1
+
+
+def _segment_positions(starts: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+    # Concatenated ranges [start, start + length) as one index array.
+    total = int(lengths.sum())
+    if not total:
+        return np.empty(0, dtype=np.int64)
+    return np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(total, dtype=np.int64)
+
+
+class CompactRecords:
+    def __init__(self, fields: Dict[str, str]) -> None:
+        self.fields = dict(fields)
+        self.size = 0
+        # Vocabularies are append-only and shared by the stores derived from this one,
+        # so existing codes stay valid in older snapshots.
+        self._vocab: Dict[str, Dict[str, int]] = {}
+        self._values: Dict[str, List[str]] = {}
+        self._columns: Dict[str, Any] = {}
+        self._offsets: Dict[str, Any] = {}
+        self._nulls: Dict[str, Any] = {}
+        for field, kind in self.fields.items():
+            if kind in (STR, LIST):
+                self._vocab[field] = {}
+                self._values[field] = []
+            if kind == INT:
+                self._columns[field] = array("q")
+            elif kind == FLOAT:
+                self._columns[field] = array("d")
+            elif kind == BOOL:
+                self._columns[field] = array("b")
+            elif kind == STR:
+                self._columns[field] = array("i")
+            else:
+                self._columns[field] = array("i")
+                self._offsets[field] = array("q", [0])
+                self._nulls[field] = array("b")
+
+    @classmethod
+    def from_records(cls, fields: Dict[str, str], records: Iterable[Mapping[str, Any]]) -> "CompactRecords":
+        store = cls(fields)
+        for record in records:
+            store.append(record)
+        return store.freeze()
+
+    def _code(self, field: str, value: str) -> int:
+        vocab = self._vocab[field]
+        code = vocab.get(value)
+        if code is None:
+            code = len(self._values[field])
+            self._values[field].append(sys.intern(value))
+            vocab[value] = code
+        return code
+
+    def _encode(self, field: str, kind: str, value: Any) -> Any:
+        if kind == INT:
+            return int(value)
+        if kind == FLOAT:
+            return np.nan if value is None else float(value)
+        if kind == BOOL:
+            return MISSING if value is None else int(bool(value))
+        return MISSING if value is None else self._code(field, str(value))
+
+    def append(self, record: Mapping[str, Any]) -> None:
+        for field, kind in self.fields.items():
+            value = record.get(field)
+            if kind == LIST:
+                codes = self._columns[field]
+                for item in value or ():
+                    codes.append(self._code(field, str(item)))
+                self._offsets[field].append(len(codes))
+                self._nulls[field].append(value is None)
+            else:
+                self._columns[field].append(self._encode(field, kind, value))
+        self.size += 1
+
+    def freeze(self) -> "CompactRecords":
+        dtypes = {INT: np.int64, FLOAT: np.float64, BOOL: np.int8, STR: np.int32, LIST: np.int32}
+        for field, kind in self.fields.items():
+            self._columns[field] = np.array(self._columns[field], dtype=dtypes[kind])
+            if kind == LIST:
+                self._offsets[field] = np.array(self._offsets[field], dtype=np.int64)
+                self._nulls[field] = np.array(self._nulls[field], dtype=bool)
+        return self
+
+    def column(self, field: str) -> np.ndarray:
+        return self._columns[field]
+
+    def strings(self, field: str) -> List[Optional[str]]:
+        # Every row's value of a string field, decoded.
+        values = self._values[field]
+        return [None if code < 0 else values[code] for code in self._columns[field].tolist()]
+
+    def distinct(self, field: str) -> List[str]:
+        # Every value a string or list field has held; may include values since replaced.
+        return list(self._values[field])
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __iter__(self) -> Any:
+        for start in range(0, self.size, 1024):
+            yield from self.rows(range(start, min(start + 1024, self.size)))
+
+    def __getitem__(self, position: Any) -> Any:
+        if isinstance(position, slice):
+            return self.rows(range(*position.indices(self.size)))
+        position = int(position)
+        if position < 0:
+            position += self.size
+        if not 0 <= position < self.size:
+            raise IndexError("record position out of range")
+        return self.rows([position])[0]
+
+    def rows(self, positions: Sequence[int]) -> List[Dict[str, Any]]:
+        # Decodes records column by column: one numpy gather per field for the whole batch.
+        index = np.asarray(positions, dtype=np.int64)
+        columns: List[List[Any]] = []
+        for field, kind in self.fields.items():
+            raw = self._columns[field]
+            if kind == INT:
+                columns.append(raw[index].tolist())
+            elif kind == FLOAT:
+                columns.append([None if value != value else value for value in raw[index].tolist()])
+            elif kind == BOOL:
+                columns.append([None if value < 0 else bool(value) for value in raw[index].tolist()])
+            elif kind == STR:
+                values = self._values[field]
+                columns.append([None if code < 0 else values[code] for code in raw[index].tolist()])
+            else:
+                values = self._values[field]
+                offsets = self._offsets[field]
+                starts, stops = offsets[index], offsets[index + 1]
+                codes = raw[_segment_positions(starts, stops - starts)].tolist()
+                bounds = np.concatenate(([0], np.cumsum(stops - starts))).tolist()
+                lists: List[Optional[List[str]]] = []
+                for row, null in enumerate(self._nulls[field][index].tolist()):
+                    lists.append(None if null else [values[code] for code in codes[bounds[row] : bounds[row + 1]]])
+                columns.append(lists)
+        names = list(self.fields)
+        return [dict(zip(names, values)) for values in zip(*columns)]
+
+    def spliced(self, old_to_new: np.ndarray, size: int, changed: Dict[int, Mapping[str, Any]]) -> "CompactRecords":
+        # A new store where kept row i moves to old_to_new[i] (-1 drops it) and the
+        # records in `changed` (keyed by new position) are written fresh. Kept rows
+        # keep their relative order, so each column is one mask plus one insert.
+        store = CompactRecords.__new__(CompactRecords)
+        store.fields = self.fields
+        store.size = size
+        store._vocab = self._vocab
+        store._values = self._values
+        store._columns, store._offsets, store._nulls = {}, {}, {}
+        positions = np.asarray(sorted(changed), dtype=np.int64)
+        fresh = np.zeros(size + 1, dtype=bool)
+        fresh[positions] = True
+        # old_to_new of -1 reads the spare last slot, which is never fresh.
+        kept = (old_to_new >= 0) & ~fresh[old_to_new]
+        # Index into the compacted kept rows at which each fresh row goes.
+        slots = positions - np.arange(positions.shape[0])
+        records = [changed[position] for position in positions.tolist()]
+
+        for field, kind in self.fields.items():
+            old = self._columns[field]
+            if kind != LIST:
+                added = [self._encode(field, kind, record.get(field)) for record in records]
+                store._columns[field] = np.insert(old[kept], slots, np.asarray(added, dtype=old.dtype))
+                continue
+
+            offsets = self._offsets[field]
+            lengths = np.diff(offsets)
+            values = [record.get(field) for record in records]
+            added_codes = [[self._code(field, str(item)) for item in value or ()] for value in values]
+            added_lengths = np.asarray([len(codes) for codes in added_codes], dtype=np.int64)
+            new_lengths = np.insert(lengths[kept], slots, added_lengths)
+            new_offsets = np.zeros(size + 1, dtype=np.int64)
+            np.cumsum(new_lengths, out=new_offsets[1:])
+            # Kept codes that precede each fresh row: its new offset minus earlier fresh codes.
+            code_slots = new_offsets[positions] - (np.cumsum(added_lengths) - added_lengths)
+            store._columns[field] = np.insert(
+                old[np.repeat(kept, lengths)],
+                np.repeat(code_slots, added_lengths),
+                np.asarray([code for codes in added_codes for code in codes], dtype=old.dtype),
+            )
+            store._offsets[field] = new_offsets
+            store._nulls[field] = np.insert(
+                self._nulls[field][kept], slots, np.asarray([value is None for value in values], dtype=bool)
+            )
+        return store
+
+    @property
+    def nbytes(self) -> int:
+        # Column buffers plus the interned vocabulary strings.
+        total = 0
+        for field in self.fields:
+            total += self._columns[field].nbytes
+            if field in self._offsets:
+                total += self._offsets[field].nbytes + self._nulls[field].nbytes
+            if field in self._values:
+                total += sum(sys.getsizeof(value) for value in self._values[field])
+        return total
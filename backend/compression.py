@@ -0,0 +1,81 @@
+import gzip
+from typing import Dict, Optional, Sequence
+
+from flask import Flask, Response, request
+
+try:  # optional: brotli is only offered when the module is installed
+    import brotli
+except ImportError:  # pragma: no cover - depends on the environment
+    brotli = None
+
+# Response compression negotiated from Accept-Encoding. Only buffered JSON/text
+# bodies at or above min_size are compressed; streamed responses, bodies that
+# already carry a Content-Encoding and non-200 responses pass through untouched.
+
+COMPRESSIBLE_MIMETYPES = ("application/json", "application/x-ndjson", "text/plain", "text/html", "text/csv")
+
+
+def available_encodings() -> Sequence[str]:
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def negotiate_encoding(accept_encodings, offered: Sequence[str]) -> Optional[str]:
+    # Highest client quality wins; ties go to the server's preference order.
+    best, best_quality = None, 0.0
+    for encoding in offered:
+        quality = accept_encodings.quality(encoding)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compress(body: bytes, encoding: str, gzip_level: int = 6, brotli_quality: int = 4) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=brotli_quality)
+    # mtime=0 keeps the output deterministic for identical bodies.
+    return gzip.compress(body, compresslevel=gzip_level, mtime=0)
+
+
+def etag_variants(tag: str) -> Sequence[str]:
+    # A strong ETag names exact bytes, so compressed bodies carry an encoding suffix.
+    return (tag,) + tuple(f"{tag}-{encoding}" for encoding in ("br", "gzip"))
+
+
+class ResponseCompressor:
+    def __init__(self, min_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4) -> None:
+        self.min_size = min_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.counters: Dict[str, int] = {"compressed": 0, "bytes_in": 0, "bytes_out": 0}
+
+    def init_app(self, app: Flask) -> None:
+        app.after_request(self.after_request)
+
+    def after_request(self, response: Response) -> Response:
+        if (
+            response.status_code != 200
+            or response.direct_passthrough
+            or response.is_streamed
+            or "Content-Encoding" in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES
+        ):
+            return response
+
+        response.vary.add("Accept-Encoding")
+        body = response.get_data()
+        if len(body) < self.min_size:
+            return response
+        encoding = negotiate_encoding(request.accept_encodings, available_encodings())
+        if encoding is None:
+            return response
+
+        compressed = compress(body, encoding, self.gzip_level, self.brotli_quality)
+        response.set_data(compressed)
+        response.headers["Content-Encoding"] = encoding
+        tag, weak = response.get_etag()
+        if tag and not weak:
+            response.set_etag(f"{tag}-{encoding}")
+        self.counters["compressed"] += 1
+        self.counters["bytes_in"] += len(body)
+        self.counters["bytes_out"] += len(compressed)
+        return response
@@ -0,0 +1,46 @@
+# export_ranked.py
+import argparse
+import json
+import sys
+
+from app import CATALOG, EXPORT_CHUNK_SIZE, _parse_fields, _ranked_result, _scoring_plan, app, iter_export_lines
+
+# Writes the full ranked catalog for one request body as NDJSON, e.g.
+#   python export_ranked.py --payload '{"priority": {"sections": ["color"], "values": {"color": ["Ivory"]}}}'
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Export every ranked dress for a request body as NDJSON.")
+    parser.add_argument("--payload", default="{}", help="request body as JSON, or @path/to/body.json")
+    parser.add_argument("--output", help="write here instead of stdout")
+    parser.add_argument("--fields", help="comma-separated item fields (default: all)")
+    parser.add_argument("--debug", action="store_true", help="include the _debug scoring breakdown")
+    args = parser.parse_args()
+
+    raw = args.payload
+    if raw.startswith("@"):
+        with open(raw[1:]) as handle:
+            raw = handle.read()
+    payload = json.loads(raw)
+    plan = _scoring_plan(payload)
+    fields = _parse_fields(args.fields or payload.get("fields"))
+    debug = args.debug or bool(payload.get("debug"))
+
+    with app.app_context():
+        snapshot = CATALOG.get()
+        ranked = _ranked_result(snapshot, payload.get("filters") or {}, plan)
+
+    out = open(args.output, "w") if args.output else sys.stdout
+    try:
+        for chunk in iter_export_lines(snapshot, ranked, plan.weights, debug, fields, EXPORT_CHUNK_SIZE):
+            out.write(chunk)
+    finally:
+        if args.output:
+            out.close()
+    if args.output:
+        print(f"📦 Exported {ranked.total} ranked dresses to {args.output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
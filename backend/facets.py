@@ -0,0 +1,76 @@
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from scoring_engine import EncodedCatalog
+
+# Facet counts (dresses per normalized section value) over a filtered candidate
+# set, straight from the encoded catalog. Every section's codes are shifted into
+# one shared code space: single-valued sections form an (n x sections) matrix and
+# array sections one deduplicated CSR, so a request costs one row gather, one
+# token gather and one bincount no matter how many sections are counted.
+
+FacetCounts = Dict[str, Dict[str, int]]
+
+
+class FacetCounter:
+    def __init__(self, encoded: EncodedCatalog) -> None:
+        self.size = encoded.size
+        self._layout: List[Tuple[str, List[str], int]] = []
+        offset = 0
+        for key, section in encoded.sections.items():
+            self._layout.append((key, section.values, offset))
+            offset += len(section.values)
+        self._width = offset + 1
+        dump = offset  # missing values land here and are dropped
+
+        offsets = {key: start for key, _, start in self._layout}
+        scalar_columns = []
+        array_rows, array_codes = [], []
+        for key, section in encoded.sections.items():
+            if section.is_array:
+                array_rows.append(section.rows)
+                array_codes.append(section.cols + offsets[key])
+            else:
+                scalar_columns.append(np.where(section.codes >= 0, section.codes + offsets[key], dump))
+        self._scalar_codes = np.stack(scalar_columns, axis=1).astype(np.int32) if scalar_columns else None
+
+        rows = np.concatenate(array_rows) if array_rows else np.empty(0, dtype=np.int64)
+        codes = np.concatenate(array_codes) if array_codes else np.empty(0, dtype=np.int64)
+        # Row-major and deduplicated, so each dress counts once per array value.
+        keys = np.unique(rows * self._width + codes)
+        self._array_starts = np.searchsorted(keys // self._width, np.arange(self.size + 1))
+        self._array_codes = (keys % self._width).astype(np.int32)
+        self._all: Optional[FacetCounts] = None
+
+    def _raw_counts(self, candidates: Optional[np.ndarray]) -> np.ndarray:
+        parts = []
+        if self._scalar_codes is not None:
+            scalar = self._scalar_codes if candidates is None else self._scalar_codes[candidates]
+            parts.append(scalar.ravel())
+        if candidates is None:
+            parts.append(self._array_codes)
+        else:
+            starts = self._array_starts[candidates]
+            lengths = self._array_starts[candidates + 1] - starts
+            total = int(lengths.sum())
+            if total:
+                # Flat indices of every candidate's token slice.
+                shifts = np.repeat(starts - (np.cumsum(lengths) - lengths), lengths)
+                parts.append(self._array_codes[shifts + np.arange(total)])
+        if not parts:
+            return np.zeros(self._width, dtype=np.int64)
+        return np.bincount(np.concatenate(parts), minlength=self._width)
+
+    def counts(self, candidates: Optional[np.ndarray] = None) -> FacetCounts:
+        if candidates is None and self._all is not None:
+            return self._all
+        raw = self._raw_counts(candidates)
+        facets: FacetCounts = {}
+        for key, values, start in self._layout:
+            counts = raw[start : start + len(values)]
+            order = sorted(np.flatnonzero(counts).tolist(), key=lambda code: (-counts[code], values[code]))
+            facets[key] = {values[code]: int(counts[code]) for code in order}
+        if candidates is None:
+            self._all = facets
+        return facets
@@ -0,0 +1,194 @@
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from scoring_engine import EncodedCatalog
+
+# Inverted index over the encoded catalog: every (section, normalized value)
+# maps to the positions of the dresses carrying it. Sparse postings are kept as
+# sorted position arrays and dense ones as packed bitsets (the same split a
+# Roaring bitmap makes), so a filter costs a union over the touched postings.
+
+PriceRange = Tuple[Optional[float], Optional[float]]
+
+# Postings denser than one in 32 dresses are cheaper to store and OR as bitsets.
+BITSET_DENSITY = 1.0 / 32
+PRICE_RANGE_CACHE_SIZE = 64
+# Boolean section key -> mask of dresses whose column is NULL.
+NullMasks = Dict[str, np.ndarray]
+
+
+def _stored_values(key: str, value: str, positions: np.ndarray, nulls: NullMasks) -> np.ndarray:
+    # NULL booleans score as "false", but a false filter only matches stored False
+    # (the SQL backend's `IS false`), so they stay out of that posting.
+    mask = nulls.get(key)
+    if mask is None or value != "false":
+        return positions
+    return positions[~mask[positions]]
+
+
+class Posting:
+    __slots__ = ("positions", "bits", "count")
+
+    def __init__(self, positions: np.ndarray, size: int) -> None:
+        self.count = int(positions.shape[0])
+        if size and self.count / size >= BITSET_DENSITY:
+            mask = np.zeros(size, dtype=bool)
+            mask[positions] = True
+            self.bits: Optional[np.ndarray] = np.packbits(mask)
+            self.positions: Optional[np.ndarray] = None
+        else:
+            self.bits = None
+            self.positions = positions.astype(np.int32)
+
+    def union_into(self, accumulator: np.ndarray) -> None:
+        if self.bits is not None:
+            np.bitwise_or(accumulator, self.bits, out=accumulator)
+        elif self.count:
+            np.bitwise_or.at(accumulator, self.positions >> 3, (128 >> (self.positions & 7)).astype(np.uint8))
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.bits.nbytes if self.bits is not None else self.positions.nbytes)
+
+    def all_positions(self, size: int) -> np.ndarray:
+        if self.bits is not None:
+            return np.flatnonzero(np.unpackbits(self.bits, count=size))
+        return self.positions.astype(np.int64)
+
+
+class FilterIndex:
+    def __init__(self, encoded: EncodedCatalog, raw_prices: np.ndarray, nulls: Optional[NullMasks] = None) -> None:
+        nulls = nulls or {}
+        self.size = encoded.size
+        self.postings: Dict[Tuple[str, str], Posting] = {}
+
+        for key, section in encoded.sections.items():
+            if section.is_array:
+                # Unique (code, row) pairs grouped by code; duplicates within one dress collapse.
+                pairs = np.unique(np.stack((section.cols, section.rows)), axis=1)
+                codes, rows = pairs[0], pairs[1]
+            else:
+                rows = np.flatnonzero(section.codes >= 0)
+                codes = section.codes[rows]
+                order = np.argsort(codes, kind="stable")
+                codes, rows = codes[order], rows[order]
+            boundaries = np.searchsorted(codes, np.arange(len(section.values) + 1))
+            for code, value in enumerate(section.values):
+                positions = rows[boundaries[code] : boundaries[code + 1]]
+                self.postings[(key, value)] = Posting(_stored_values(key, value, positions, nulls), self.size)
+
+        # Dresses with a price, ordered by price, so any range is two binary searches.
+        priced = np.flatnonzero(~np.isnan(raw_prices))
+        order = np.argsort(raw_prices[priced], kind="stable")
+        self._set_prices(priced[order], raw_prices)
+
+    def _set_prices(self, price_positions: np.ndarray, raw_prices: np.ndarray) -> None:
+        self._price_positions = price_positions
+        self._sorted_prices = raw_prices[price_positions]
+        self._price_ranges: "OrderedDict[PriceRange, Posting]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def updated(
+        self,
+        encoded: EncodedCatalog,
+        raw_prices: np.ndarray,
+        old_to_new: np.ndarray,
+        changed: np.ndarray,
+        touched: Set[Tuple[str, str]],
+        nulls: Optional[NullMasks] = None,
+    ) -> "FilterIndex":
+        # The index of a catalog derived by update_encoded. `changed` holds the new
+        # positions of inserted and updated rows and `touched` every (section, value)
+        # they carried before or after the change. Only touched postings are rebuilt;
+        # the rest are shared with this index, or shifted when rows were deleted or
+        # inserted in the middle.
+        nulls = nulls or {}
+        index = FilterIndex.__new__(FilterIndex)
+        index.size = size = encoded.size
+        index.postings = {}
+        in_place = old_to_new.shape[0] <= size and np.array_equal(old_to_new, np.arange(old_to_new.shape[0]))
+        same_bytes = (size + 7) // 8 == (self.size + 7) // 8
+
+        for key, section in encoded.sections.items():
+            for code, value in enumerate(section.values):
+                posting = self.postings.get((key, value))
+                if posting is not None and (key, value) not in touched:
+                    if in_place and (posting.bits is None or same_bytes):
+                        index.postings[(key, value)] = posting
+                        continue
+                    moved = old_to_new[posting.all_positions(self.size)]
+                    index.postings[(key, value)] = Posting(moved[moved >= 0], size)
+                elif section.is_array:
+                    # Rows are sorted, so dropping repeats of the previous row deduplicates.
+                    rows = section.rows[section.cols == code]
+                    rows = rows[np.concatenate(([True], rows[1:] != rows[:-1]))] if rows.shape[0] else rows
+                    index.postings[(key, value)] = Posting(rows, size)
+                else:
+                    rows = _stored_values(key, value, np.flatnonzero(section.codes == code), nulls)
+                    index.postings[(key, value)] = Posting(rows, size)
+
+        # Drop deleted and changed rows from the price order, then merge the changed rows back in.
+        moved = old_to_new[self._price_positions]
+        stay = moved >= 0
+        changed_mask = np.zeros(size, dtype=bool)
+        changed_mask[changed] = True
+        stay[stay] = ~changed_mask[moved[stay]]
+        base = moved[stay]
+        priced = changed[~np.isnan(raw_prices[changed])]
+        priced = priced[np.argsort(raw_prices[priced], kind="stable")]
+        slots = np.searchsorted(raw_prices[base], raw_prices[priced], side="right")
+        index._set_prices(np.insert(base, slots, priced), raw_prices)
+        return index
+
+    def posting(self, section_key: str, value: str) -> Optional[Posting]:
+        return self.postings.get((section_key, value))
+
+    def price_posting(self, low: Optional[float], high: Optional[float]) -> Posting:
+        key = (low, high)
+        with self._lock:
+            cached = self._price_ranges.get(key)
+            if cached is not None:
+                self._price_ranges.move_to_end(key)
+                return cached
+
+        start = 0 if low is None else int(np.searchsorted(self._sorted_prices, low, side="left"))
+        stop = self._sorted_prices.shape[0] if high is None else int(np.searchsorted(self._sorted_prices, high, side="right"))
+        posting = Posting(np.sort(self._price_positions[start:max(start, stop)]), self.size)
+
+        with self._lock:
+            self._price_ranges[key] = posting
+            while len(self._price_ranges) > PRICE_RANGE_CACHE_SIZE:
+                self._price_ranges.popitem(last=False)
+        return posting
+
+    def candidates(self, terms: Dict[str, List[str]], price_ranges: Sequence[PriceRange]) -> Optional[np.ndarray]:
+        # OR of every term and price range, as positions into the catalog. None means "no filter".
+        if not terms and not price_ranges:
+            return None
+
+        touched: List[Posting] = []
+        for section_key, values in terms.items():
+            for value in values:
+                posting = self.posting(section_key, value)
+                if posting is not None:
+                    touched.append(posting)
+        for low, high in price_ranges:
+            touched.append(self.price_posting(low, high))
+
+        if all(posting.bits is None for posting in touched):
+            arrays = [posting.positions for posting in touched if posting.count]
+            if not arrays:
+                return np.empty(0, dtype=np.int64)
+            return np.unique(np.concatenate(arrays)).astype(np.int64)
+
+        accumulator = np.zeros((self.size + 7) // 8, dtype=np.uint8)
+        for posting in touched:
+            posting.union_into(accumulator)
+        return np.flatnonzero(np.unpackbits(accumulator, count=self.size))
+
+    @property
+    def nbytes(self) -> int:
+        return sum(posting.nbytes for posting in self.postings.values())
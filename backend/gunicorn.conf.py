@@ -0,0 +1,27 @@
+# gunicorn.conf.py — `cd backend && gunicorn app:app` picks this up.
+import os
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:5050")
+workers = int(os.getenv("WEB_CONCURRENCY", 2))
+threads = int(os.getenv("GUNICORN_THREADS", 4))
+# Import the app once in the master and warm the catalog there, so forked workers
+# share its pages instead of each loading and encoding the catalog again.
+preload_app = True
+
+
+def on_starting(server):
+    from app import warm_start
+
+    try:
+        snapshot = warm_start()
+    except Exception as exc:
+        # Workers still start; each warms itself when /api/ready is first probed.
+        server.log.error("Catalog warm-up failed, workers will retry: %s", exc)
+        return
+    server.log.info("Catalog warm: version %s, %s dresses", snapshot.version, snapshot.size)
+
+
+def post_fork(server, worker):
+    from app import after_fork
+
+    after_fork()
@@ -0,0 +1,103 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from json_provider import dumps_compact
+
+# Pre-encoded JSON for catalog records. A snapshot's records never change, so
+# each (record, field projection) is encoded once per catalog version and page
+# responses are assembled by concatenating fragments with the per-request score.
+# Fragments are object bodies without braces ('"id":1,"name":"..."').
+
+Projection = Optional[Tuple[str, ...]]
+
+SCORE_FIELD = "score"
+
+
+def encode_value(value: Any) -> str:
+    return dumps_compact(value)
+
+
+def _object_body(record: Dict[str, Any], fields: Projection) -> str:
+    keys = record.keys() if fields is None else [field for field in fields if field in record]
+    return ",".join(f"{encode_value(key)}:{encode_value(record[key])}" for key in keys)
+
+
+class RenderedPage:
+    # A page whose items are already JSON text; `last` keeps the ranking key of the
+    # final item so cursors can be built without decoding.
+    def __init__(self, items_json: str, count: int, last: Optional[Dict[str, Any]]) -> None:
+        self.items_json = items_json
+        self.count = count
+        self.last = last
+
+    def __len__(self) -> int:
+        return self.count
+
+
+class FragmentCache:
+    def __init__(self, records: Sequence[Dict[str, Any]], max_projections: int = 8) -> None:
+        self._records = records
+        self._max_projections = max_projections
+        self._projections: "OrderedDict[Projection, List[Optional[str]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _slots(self, fields: Projection) -> List[Optional[str]]:
+        with self._lock:
+            slots = self._projections.get(fields)
+            if slots is None:
+                slots = self._projections[fields] = [None] * len(self._records)
+                while len(self._projections) > self._max_projections:
+                    self._projections.popitem(last=False)
+            else:
+                self._projections.move_to_end(fields)
+            return slots
+
+    def fragments(self, positions: Iterable[int], fields: Projection = None, cache: bool = True) -> List[str]:
+        # cache=False encodes missing fragments without keeping them (one-off full exports).
+        static_fields = None if fields is None else tuple(field for field in fields if field != SCORE_FIELD)
+        slots = self._slots(static_fields)
+        positions = list(positions)
+        missing = [position for position in positions if slots[position] is None]
+        encoded: Dict[int, str] = {}
+        if missing:
+            # Column stores decode a whole batch of records at once.
+            rows = getattr(self._records, "rows", None)
+            records = rows(missing) if rows is not None else [self._records[position] for position in missing]
+            for position, record in zip(missing, records):
+                encoded[position] = _object_body(record, static_fields)
+                if cache:
+                    slots[position] = encoded[position]
+        return [slots[position] if slots[position] is not None else encoded[position] for position in positions]
+
+    def items(
+        self,
+        positions: Sequence[int],
+        fields: Projection = None,
+        scores: Optional[Sequence[float]] = None,
+        cache: bool = True,
+    ) -> List[str]:
+        bodies = self.fragments(positions, fields, cache)
+        if scores is None or (fields is not None and SCORE_FIELD not in fields):
+            return ["{" + body + "}" for body in bodies]
+        items = []
+        for body, score in zip(bodies, scores):
+            separator = "," if body else ""
+            items.append("{" + body + separator + '"score":' + encode_value(float(score)) + "}")
+        return items
+
+    def render(self, positions: Sequence[int], fields: Projection = None, scores: Optional[Sequence[float]] = None) -> str:
+        return "[" + ",".join(self.items(positions, fields, scores)) + "]"
+
+    @property
+    def projection_count(self) -> int:
+        return len(self._projections)
+
+
+def project(item: Dict[str, Any], fields: Projection) -> Dict[str, Any]:
+    if fields is None:
+        return item
+    projected = {field: item[field] for field in fields if field in item}
+    if "_debug" in item:
+        projected["_debug"] = item["_debug"]
+    return projected
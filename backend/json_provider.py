@@ -0,0 +1,59 @@
+import json
+from typing import Any, Dict, Optional
+
+from flask.json.provider import DefaultJSONProvider
+
+try:  # optional: orjson is several times faster than the stdlib encoder
+    import orjson
+except ImportError:  # pragma: no cover - exercised only without orjson installed
+    orjson = None
+
+# Flask JSON provider that encodes with orjson when it is installed and the
+# stdlib otherwise. Types orjson cannot handle (dates, Decimal, UUID, dataclasses
+# outside its native set) go through Flask's usual default hook.
+
+# Dates pass through to Flask's default hook so both encoders emit HTTP dates.
+ORJSON_OPTIONS = (
+    (orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME) if orjson is not None else 0
+)
+
+
+# Process-wide switch (JSON_ENCODER=stdlib) shared by the provider and pre-encoded fragments.
+ENCODER: Dict[str, bool] = {"use_fast": True}
+
+
+def fast_json_available() -> bool:
+    return orjson is not None
+
+
+def set_fast_json(enabled: bool) -> None:
+    ENCODER["use_fast"] = enabled
+
+
+def dumps_compact(obj: Any, sort_keys: bool = False, use_fast: Optional[bool] = None) -> str:
+    if use_fast is None:
+        use_fast = ENCODER["use_fast"]
+    if use_fast and orjson is not None:
+        options = ORJSON_OPTIONS | (orjson.OPT_SORT_KEYS if sort_keys else 0)
+        return orjson.dumps(obj, default=DefaultJSONProvider.default, option=options).decode("utf-8")
+    return json.dumps(obj, separators=(",", ":"), sort_keys=sort_keys, default=DefaultJSONProvider.default)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    @property
+    def use_fast(self) -> bool:
+        return ENCODER["use_fast"]
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        # response() asks for compact separators; indentation or custom encoder
+        # arguments stay on the stdlib path.
+        if kwargs.get("separators") == (",", ":"):
+            kwargs.pop("separators")
+        if not self.use_fast or orjson is None or kwargs:
+            return super().dumps(obj, **kwargs)
+        return dumps_compact(obj, sort_keys=self.sort_keys, use_fast=True)
+
+    def loads(self, s: Any, **kwargs: Any) -> Any:
+        if not self.use_fast or orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
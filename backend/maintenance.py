@@ -0,0 +1,9 @@
+# maintenance.py
+from app import analyze_catalog, app, ensure_indexes
+
+# Run after bulk loads or on a schedule: re-applies the indexes and triggers, then
+# refreshes planner statistics and prunes the catalog change log.
+with app.app_context():
+    ensure_indexes(force=True)
+    stats = analyze_catalog()
+    print(f"🧹 Analyzed {stats['rows']} dresses; pruned {stats['pruned_changes']} change-log entries.")
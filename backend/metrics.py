@@ -0,0 +1,142 @@
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Streaming latency histograms. Samples land in logarithmic buckets (8 per
+# doubling, ~9% relative error), so recording is O(1) and a quantile walks a
+# fixed number of buckets no matter how many requests have been seen.
+
+QUANTILES: Tuple[float, ...] = (0.5, 0.95, 0.99)
+REQUEST_STAGES: Tuple[str, ...] = ("parse", "weights", "fetch", "filter", "score", "sort", "facets", "serialize", "total")
+
+
+class LogHistogram:
+    def __init__(self, min_value: float = 0.001, max_value: float = 600000.0, buckets_per_doubling: int = 8) -> None:
+        self.min_value = min_value
+        self._scale = buckets_per_doubling / math.log(2.0)
+        self._bucket_count = int(math.ceil(math.log(max_value / min_value) * self._scale)) + 2
+        self.counts: List[int] = [0] * self._bucket_count
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def _index(self, value: float) -> int:
+        if value <= self.min_value:
+            return 0
+        return min(self._bucket_count - 1, int(math.log(value / self.min_value) * self._scale) + 1)
+
+    def _upper_bound(self, index: int) -> float:
+        if index == 0:
+            return self.min_value
+        return self.min_value * math.exp(index / self._scale)
+
+    def record(self, value: float) -> None:
+        value = max(0.0, value)
+        self.counts[self._index(value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q: float) -> Optional[float]:
+        if not self.count:
+            return None
+        rank = max(1, math.ceil(q * self.count))
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank:
+                return min(self._upper_bound(index), self.max)
+        return self.max
+
+
+class StageMetrics:
+    def __init__(self, stages: Sequence[str] = REQUEST_STAGES) -> None:
+        self._stages = tuple(stages)
+        self._histograms: Dict[str, LogHistogram] = {stage: LogHistogram() for stage in self._stages}
+        self._lock = threading.Lock()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms = {stage: LogHistogram() for stage in self._stages}
+
+    def record(self, stage: str, duration_ms: float) -> None:
+        self.record_request({stage: duration_ms})
+
+    def record_request(self, durations: Dict[str, float]) -> None:
+        with self._lock:
+            for stage, duration_ms in durations.items():
+                histogram = self._histograms.get(stage)
+                if histogram is None:
+                    histogram = self._histograms[stage] = LogHistogram()
+                histogram.record(duration_ms)
+
+    def quantile(self, stage: str, q: float) -> Optional[float]:
+        with self._lock:
+            histogram = self._histograms.get(stage)
+            return histogram.quantile(q) if histogram is not None else None
+
+    def snapshot(self, quantiles: Sequence[float] = QUANTILES) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            summary: Dict[str, Dict[str, float]] = {}
+            for stage, histogram in self._histograms.items():
+                stats: Dict[str, float] = {"count": float(histogram.count), "sum_ms": histogram.total}
+                for q in quantiles:
+                    value = histogram.quantile(q)
+                    if value is not None:
+                        stats[f"p{int(q * 100)}_ms"] = value
+                summary[stage] = stats
+            return summary
+
+
+class StageTimer:
+    # Per-request stopwatch; repeated stages accumulate.
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.durations: Dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, (time.perf_counter() - start) * 1000.0)
+
+    def add(self, name: str, duration_ms: float) -> None:
+        self.durations[name] = self.durations.get(name, 0.0) + duration_ms
+
+    def finish(self) -> Dict[str, float]:
+        self.durations["total"] = (time.perf_counter() - self.started) * 1000.0
+        return self.durations
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value))
+
+
+def prometheus_text(
+    stage_summary: Dict[str, Dict[str, float]],
+    counters: Dict[str, Tuple[str, float]],
+    metric_name: str = "best_dressed_request_stage_latency_ms",
+) -> str:
+    lines = [
+        f"# HELP {metric_name} Per-stage latency of /api/dresses requests in milliseconds.",
+        f"# TYPE {metric_name} summary",
+    ]
+    for stage, stats in stage_summary.items():
+        for q in QUANTILES:
+            value = stats.get(f"p{int(q * 100)}_ms")
+            if value is not None:
+                lines.append(f'{metric_name}{{stage="{stage}",quantile="{q}"}} {_format_value(value)}')
+        lines.append(f'{metric_name}_sum{{stage="{stage}"}} {_format_value(stats["sum_ms"])}')
+        lines.append(f'{metric_name}_count{{stage="{stage}"}} {int(stats["count"])}')
+
+    for name, (help_text, value) in counters.items():
+        metric_type = "counter" if name.endswith("_total") else "gauge"
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {metric_type}")
+        lines.append(f"{name} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,9 @@
+# migrate_arrays.py
+from app import DressValue, WeddingDress, app, db, ensure_indexes
+from migrations import upgrade_array_storage
+
+with app.app_context():
+    with db.engine.begin() as connection:
+        stats = upgrade_array_storage(connection, WeddingDress.__table__, DressValue.__table__)
+    ensure_indexes(force=True)
+    print(f"🧵 Converted {stats['converted_rows']} dresses to JSON arrays; {stats['values']} dress_values rows indexed.")
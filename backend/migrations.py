@@ -0,0 +1,125 @@
+import json
+import pickle
+from typing import Any, Dict, List, Tuple
+
+import sqlalchemy as sa
+
+# Array sections used to live in PickleType blobs. They are now JSON text, mirrored
+# into a normalized dress_values (dress_id, section, value) side table that SQLite
+# keeps in sync through json_each triggers, so membership filters and scoring
+# joins can use an index instead of unpickling every row in Python.
+
+ARRAY_COLUMNS: Tuple[str, ...] = ("tags", "weddingvenue", "embellishments", "features")
+DRESSES_TABLE = "wedding_dresses"
+VALUES_TABLE = "dress_values"
+CHANGES_TABLE = "catalog_changes"
+
+
+def _new_row_selects() -> str:
+    # Same normalization as app._normalize_value for plain strings: trimmed and lower-cased.
+    return " UNION ALL ".join(
+        f"SELECT NEW.id, '{column}', lower(trim(item.value)) FROM json_each(NEW.{column}) AS item "
+        "WHERE item.value IS NOT NULL AND trim(item.value) <> ''"
+        for column in ARRAY_COLUMNS
+    )
+
+
+def dress_value_trigger_statements() -> Tuple[str, ...]:
+    values_insert = f"INSERT INTO {VALUES_TABLE} (dress_id, section, value) {_new_row_selects()};"
+    array_columns = ", ".join(ARRAY_COLUMNS)
+    return (
+        f"CREATE TRIGGER IF NOT EXISTS trg_{DRESSES_TABLE}_values_insert AFTER INSERT ON {DRESSES_TABLE} "
+        f"BEGIN {values_insert} END",
+        f"CREATE TRIGGER IF NOT EXISTS trg_{DRESSES_TABLE}_values_update AFTER UPDATE OF {array_columns} "
+        f"ON {DRESSES_TABLE} BEGIN DELETE FROM {VALUES_TABLE} WHERE dress_id = OLD.id; {values_insert} END",
+        f"CREATE TRIGGER IF NOT EXISTS trg_{DRESSES_TABLE}_values_delete AFTER DELETE ON {DRESSES_TABLE} "
+        f"BEGIN DELETE FROM {VALUES_TABLE} WHERE dress_id = OLD.id; END",
+    )
+
+
+def catalog_change_trigger_statements() -> Tuple[str, ...]:
+    # Every write to the dresses table appends to the change log, whichever process
+    # or tool makes it, so catalog snapshots can catch up by re-reading those rows.
+    def log(dress_id: str, op: str) -> str:
+        return f"INSERT INTO {CHANGES_TABLE} (dress_id, op) VALUES ({dress_id}, '{op}');"
+
+    return (
+        f"CREATE TRIGGER IF NOT EXISTS trg_{DRESSES_TABLE}_changes_insert AFTER INSERT ON {DRESSES_TABLE} "
+        f"BEGIN {log('NEW.id', 'insert')} END",
+        f"CREATE TRIGGER IF NOT EXISTS trg_{DRESSES_TABLE}_changes_update AFTER UPDATE ON {DRESSES_TABLE} "
+        f"BEGIN {log('NEW.id', 'update')} "
+        f"INSERT INTO {CHANGES_TABLE} (dress_id, op) SELECT OLD.id, 'delete' WHERE OLD.id <> NEW.id; END",
+        f"CREATE TRIGGER IF NOT EXISTS trg_{DRESSES_TABLE}_changes_delete AFTER DELETE ON {DRESSES_TABLE} "
+        f"BEGIN {log('OLD.id', 'delete')} END",
+    )
+
+
+def _decode_array(raw: Any) -> Any:
+    if raw is None:
+        return None
+    if isinstance(raw, (bytes, bytearray, memoryview)):
+        # Only ever run against our own database file; these blobs were written by PickleType.
+        return pickle.loads(bytes(raw))
+    if isinstance(raw, str):
+        return json.loads(raw)
+    return raw
+
+
+def _needs_rebuild(connection: sa.engine.Connection) -> bool:
+    columns = {row[1]: (row[2] or "").upper() for row in connection.execute(sa.text(f"PRAGMA table_info({DRESSES_TABLE})"))}
+    return any(columns.get(column) != "JSON" for column in ARRAY_COLUMNS)
+
+
+def _rebuild_dresses_table(connection: sa.engine.Connection, dresses_table: sa.Table) -> int:
+    legacy_name = f"{DRESSES_TABLE}_pickled"
+    connection.execute(sa.text(f"DROP TABLE IF EXISTS {legacy_name}"))
+    connection.execute(sa.text(f"ALTER TABLE {DRESSES_TABLE} RENAME TO {legacy_name}"))
+
+    rows: List[Dict[str, Any]] = []
+    for row in connection.execute(sa.text(f"SELECT * FROM {legacy_name} ORDER BY id")).mappings():
+        record = dict(row)
+        for column in ARRAY_COLUMNS:
+            record[column] = _decode_array(record.get(column))
+        rows.append(record)
+
+    dresses_table.create(connection)
+    if rows:
+        connection.execute(dresses_table.insert(), rows)
+    # The old indexes followed the renamed table and go with it; ensure_indexes recreates them.
+    connection.execute(sa.text(f"DROP TABLE {legacy_name}"))
+    return len(rows)
+
+
+def rebuild_dress_values(connection: sa.engine.Connection) -> int:
+    connection.execute(sa.text(f"DELETE FROM {VALUES_TABLE}"))
+    for column in ARRAY_COLUMNS:
+        connection.execute(
+            sa.text(
+                f"INSERT INTO {VALUES_TABLE} (dress_id, section, value) "
+                f"SELECT dress.id, '{column}', lower(trim(item.value)) "
+                f"FROM {DRESSES_TABLE} AS dress, json_each(dress.{column}) AS item "
+                "WHERE item.value IS NOT NULL AND trim(item.value) <> ''"
+            )
+        )
+    return int(connection.execute(sa.text(f"SELECT COUNT(*) FROM {VALUES_TABLE}")).scalar() or 0)
+
+
+def upgrade_array_storage(
+    connection: sa.engine.Connection, dresses_table: sa.Table, values_table: sa.Table
+) -> Dict[str, int]:
+    if connection.dialect.name != "sqlite":
+        return {"converted_rows": 0, "values": 0}
+
+    converted = 0
+    if not sa.inspect(connection).has_table(DRESSES_TABLE):
+        dresses_table.create(connection)
+    elif _needs_rebuild(connection):
+        # dress_values references wedding_dresses; SQLite would repoint it at the renamed table.
+        values_table.drop(connection, checkfirst=True)
+        converted = _rebuild_dresses_table(connection, dresses_table)
+
+    values_table.create(connection, checkfirst=True)
+    for statement in dress_value_trigger_statements():
+        connection.execute(sa.text(statement))
+    values = rebuild_dress_values(connection)
+    return {"converted_rows": converted, "values": values}
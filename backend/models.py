@@ -20,11 +20,11 @@ class WeddingDress(db.Model):
     backstyle = db.Column(db.String(50))
     price = db.Column(db.Float)
     size_range = db.Column(db.String(20))
-    tags = db.Column(db.PickleType)  # 👈 this was likely ARRAY before
-    weddingvenue = db.Column(db.PickleType)
+    tags = db.Column(db.JSON)  # 👈 this was likely ARRAY before
+    weddingvenue = db.Column(db.JSON)
     season = db.Column(db.String(20))
-    embellishments = db.Column(db.PickleType)
-    features = db.Column(db.PickleType)
+    embellishments = db.Column(db.JSON)
+    features = db.Column(db.JSON)
     has_pockets = db.Column(db.Boolean)
     corset_back = db.Column(db.Boolean)
 
@@ -0,0 +1,218 @@
+import atexit
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from scoring_engine import GATHER, SPARSE_SUM, EncodedCatalog, RankedResult, ScoringPlan, round_scores, top_k_indices
+
+# Optional multi-core scoring for large catalogs. The encoded columns and sort keys
+# of a snapshot are copied once into a shared memory block; a persistent process
+# pool scores contiguous row shards of it. Each request gets its own block holding
+# the output score vector and the candidate positions, so workers write scores in
+# place and send back only their shard's top-k positions, which the parent merges.
+# Shard scoring runs the same per-row operations as ScoringPlan.score, so the
+# results are bit-identical to the serial path.
+
+# (dtype, byte offset, length) of each array inside a shared block.
+Layout = Dict[str, Tuple[str, int, int]]
+# Picklable plan step: (kind, section key, section weight, lookup table or None).
+ShardStep = Tuple[int, str, float, Optional[np.ndarray]]
+
+_ALIGN = 64
+
+
+def _view(block: shared_memory.SharedMemory, layout: Layout, key: str) -> np.ndarray:
+    dtype, offset, length = layout[key]
+    return np.ndarray((length,), dtype=np.dtype(dtype), buffer=block.buf, offset=offset)
+
+
+def _pack(
+    arrays: Dict[str, np.ndarray], reserve: Optional[Dict[str, Tuple[str, int]]] = None
+) -> Tuple[shared_memory.SharedMemory, Layout]:
+    # `reserve` adds uninitialized (dtype, length) slots for workers to fill.
+    layout: Layout = {}
+    cursor = 0
+    slots = [(key, array.dtype.str, int(array.shape[0])) for key, array in arrays.items()]
+    slots += [(key, dtype, length) for key, (dtype, length) in (reserve or {}).items()]
+    for key, dtype, length in slots:
+        layout[key] = (dtype, cursor, length)
+        cursor += -(-np.dtype(dtype).itemsize * length // _ALIGN) * _ALIGN
+    block = shared_memory.SharedMemory(create=True, size=max(cursor, 1))
+    for key, array in arrays.items():
+        _view(block, layout, key)[:] = array
+    return block, layout
+
+
+class SharedCatalog:
+    # One snapshot's scoring columns in shared memory, owned by the parent process.
+    def __init__(
+        self, encoded: EncodedCatalog, prices: np.ndarray, name_ranks: np.ndarray, ids: np.ndarray
+    ) -> None:
+        arrays: Dict[str, np.ndarray] = {"prices": prices, "name_ranks": name_ranks, "ids": ids}
+        for key, section in encoded.sections.items():
+            arrays[f"{key}.present"] = section.present
+            if section.is_array:
+                arrays[f"{key}.rows"] = section.rows
+                arrays[f"{key}.cols"] = section.cols
+            else:
+                arrays[f"{key}.codes"] = section.codes
+        # Holding the encoded catalog keeps its id() unique while this block exists.
+        self.encoded = encoded
+        self.size = encoded.size
+        self.block, layout = _pack(arrays)
+        self.descriptor = (self.block.name, layout)
+
+    def close(self) -> None:
+        self.block.close()
+        self.block.unlink()
+
+
+# Worker-side attachments, by block name. Only the most recent catalogs are kept.
+_ATTACHED: Dict[str, Tuple[shared_memory.SharedMemory, Dict[str, np.ndarray]]] = {}
+
+
+def _catalog_arrays(descriptor: Tuple[str, Layout]) -> Dict[str, np.ndarray]:
+    name, layout = descriptor
+    attached = _ATTACHED.get(name)
+    if attached is None:
+        while len(_ATTACHED) >= 2:
+            stale, _ = _ATTACHED.pop(next(iter(_ATTACHED)))
+            stale.close()
+        # Workers share the parent's resource tracker, so attaching adds no second owner.
+        block = shared_memory.SharedMemory(name=name)
+        attached = _ATTACHED[name] = (block, {key: _view(block, layout, key) for key in layout})
+    return attached[1]
+
+
+def _score_rows(arrays: Dict[str, np.ndarray], steps: List[ShardStep], lo: int, hi: int) -> np.ndarray:
+    size = hi - lo
+    totals = np.zeros(size, dtype=np.float64)
+    for kind, key, section_weight, table in steps:
+        if kind == GATHER:
+            totals += section_weight * table[arrays[f"{key}.codes"][lo:hi]]
+        elif kind == SPARSE_SUM:
+            rows = arrays[f"{key}.rows"]
+            start, stop = np.searchsorted(rows, (lo, hi))
+            cols = arrays[f"{key}.cols"][start:stop]
+            totals += section_weight * np.bincount(rows[start:stop] - lo, weights=table[cols], minlength=size)
+        else:
+            totals += np.where(arrays[f"{key}.present"][lo:hi], section_weight, 0.0)
+    return totals
+
+
+def _score_into(
+    block: shared_memory.SharedMemory,
+    layout: Layout,
+    arrays: Dict[str, np.ndarray],
+    steps: List[ShardStep],
+    lo: int,
+    hi: int,
+    k: int,
+) -> np.ndarray:
+    totals = _score_rows(arrays, steps, lo, hi)
+    _view(block, layout, "scores")[lo:hi] = totals
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    candidates = _view(block, layout, "candidates")
+    start, stop = np.searchsorted(candidates, (lo, hi))
+    local = np.array(candidates[start:stop])
+    order = top_k_indices(
+        round_scores(totals[local - lo]), arrays["prices"][local], arrays["name_ranks"][local], arrays["ids"][local], k
+    )
+    return local[order]
+
+
+def score_shard(
+    descriptor: Tuple[str, Layout], request: Tuple[str, Layout], steps: List[ShardStep], lo: int, hi: int, k: int
+) -> np.ndarray:
+    # Runs in a pool worker: scores rows [lo, hi) into the request block and returns
+    # the catalog positions of the shard's top-k candidates.
+    arrays = _catalog_arrays(descriptor)
+    block = shared_memory.SharedMemory(name=request[0])
+    try:
+        return _score_into(block, request[1], arrays, steps, lo, hi, k)
+    finally:
+        block.close()
+
+
+class ParallelScorer:
+    def __init__(self, workers: int, min_size: int = 200_000, start_method: str = "spawn") -> None:
+        self.workers = workers
+        self.min_size = min_size
+        self._context = multiprocessing.get_context(start_method)
+        self._pool: Optional[ProcessPoolExecutor] = None
+        # Keyed by the identity of the snapshot's encoded catalog, oldest first.
+        self._catalogs: Dict[int, SharedCatalog] = {}
+        self._lock = threading.Lock()
+        self.requests = 0
+        atexit.register(self.close)
+
+    def engages(self, size: int) -> bool:
+        return self.workers > 1 and size >= self.min_size
+
+    def _executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(self.workers, mp_context=self._context)
+            return self._pool
+
+    def _shared(self, snapshot: Any) -> SharedCatalog:
+        with self._lock:
+            shared = self._catalogs.get(id(snapshot.encoded))
+            if shared is None:
+                shared = SharedCatalog(snapshot.encoded, snapshot.prices, snapshot.name_ranks, snapshot.ids)
+                self._catalogs[id(snapshot.encoded)] = shared
+                # Keep the previous snapshot for requests still in flight against it.
+                while len(self._catalogs) > 2:
+                    self._catalogs.pop(next(iter(self._catalogs))).close()
+            return shared
+
+    def rank(self, snapshot: Any, candidates: np.ndarray, plan: ScoringPlan, k: int = 0) -> RankedResult:
+        shared = self._shared(snapshot)
+        steps: List[ShardStep] = [
+            (kind, memo_key[0], section_weight, table)
+            for kind, memo_key, section_weight, _, table, _ in plan.steps(snapshot.encoded)
+        ]
+        size = snapshot.size
+        candidates = np.ascontiguousarray(candidates, dtype=np.int64)
+        block, layout = _pack({"candidates": candidates}, reserve={"scores": ("<f8", size)})
+        try:
+            bounds = np.linspace(0, size, self.workers + 1).astype(np.int64)
+            executor = self._executor()
+            futures = [
+                executor.submit(score_shard, shared.descriptor, (block.name, layout), steps, int(lo), int(hi), k)
+                for lo, hi in zip(bounds[:-1], bounds[1:])
+                if hi > lo
+            ]
+            tops = [future.result() for future in futures]
+            candidate_scores = round_scores(_view(block, layout, "scores")[candidates])
+        finally:
+            block.close()
+            block.unlink()
+        self.requests += 1
+
+        ranked = RankedResult(
+            candidates,
+            candidate_scores,
+            snapshot.prices[candidates],
+            snapshot.name_ranks[candidates],
+            snapshot.ids[candidates],
+            catalog_version=snapshot.version,
+        )
+        if k > 0 and tops:
+            # The global top-k is contained in the union of the shards' local top-k.
+            ranked.seed_top(np.searchsorted(candidates, np.concatenate(tops)), k)
+        return ranked
+
+    def close(self) -> None:
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=True, cancel_futures=True)
+                self._pool = None
+            for shared in self._catalogs.values():
+                shared.close()
+            self._catalogs.clear()
@@ -0,0 +1,65 @@
+from typing import Any, Dict, Iterable, Tuple
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# PostgreSQL backend for the seed.sql schema: public.dresses with native text[]
+# array columns and GIN indexes. Array membership filters compile to `&&`
+# (overlap) or `@>` (containment) against the raw column so the planner can use
+# the GIN index; the in-memory catalog supplies the stored spellings of each
+# normalized value, since GIN matches elements exactly.
+
+TEXT_ARRAY = postgresql.ARRAY(sa.Text)
+
+INDEX_STATEMENTS: Tuple[str, ...] = (
+    "CREATE INDEX IF NOT EXISTS idx_dresses_silhouette ON public.dresses (silhouette)",
+    "CREATE INDEX IF NOT EXISTS idx_dresses_neckline ON public.dresses (neckline)",
+    "CREATE INDEX IF NOT EXISTS idx_dresses_length ON public.dresses (length)",
+    "CREATE INDEX IF NOT EXISTS idx_dresses_collection ON public.dresses (collection)",
+    "CREATE INDEX IF NOT EXISTS idx_dresses_fabric ON public.dresses (fabric)",
+    "CREATE INDEX IF NOT EXISTS idx_dresses_color ON public.dresses (color)",
+    "CREATE INDEX IF NOT EXISTS idx_dresses_backstyle ON public.dresses (backstyle)",
+    "CREATE INDEX IF NOT EXISTS idx_dresses_season ON public.dresses (season)",
+    "CREATE INDEX IF NOT EXISTS idx_dresses_shipin48 ON public.dresses (shipin48hrs)",
+    "CREATE INDEX IF NOT EXISTS idx_dresses_pockets ON public.dresses (has_pockets)",
+    "CREATE INDEX IF NOT EXISTS idx_dresses_corset ON public.dresses (corset_back)",
+    "CREATE INDEX IF NOT EXISTS idx_dresses_price ON public.dresses (price)",
+    "CREATE INDEX IF NOT EXISTS idx_dresses_tags_gin ON public.dresses USING gin (tags)",
+    "CREATE INDEX IF NOT EXISTS idx_dresses_venue_gin ON public.dresses USING gin (weddingvenue)",
+    "CREATE INDEX IF NOT EXISTS idx_dresses_embellishments_gin ON public.dresses USING gin (embellishments)",
+    "CREATE INDEX IF NOT EXISTS idx_dresses_features_gin ON public.dresses USING gin (features)",
+)
+
+
+def normalize_database_url(uri: str) -> str:
+    # Hosted providers still hand out postgres://, which SQLAlchemy 2 rejects.
+    if uri.startswith("postgres://"):
+        return "postgresql://" + uri[len("postgres://") :]
+    return uri
+
+
+def is_postgres(uri: str) -> bool:
+    return sa.engine.make_url(uri).get_backend_name() == "postgresql"
+
+
+def engine_options(pool_size: int, max_overflow: int, pool_timeout: float, pool_recycle: int) -> Dict[str, Any]:
+    # Sized per worker process: pool_size + max_overflow times the worker count must
+    # stay under the server's max_connections. LIFO reuse lets surplus idle
+    # connections age out, and pre_ping drops connections the server has closed.
+    return {
+        "pool_size": pool_size,
+        "max_overflow": max_overflow,
+        "pool_timeout": pool_timeout,
+        "pool_recycle": pool_recycle,
+        "pool_pre_ping": True,
+        "pool_use_lifo": True,
+    }
+
+
+def array_filter(column: Any, spellings: Iterable[str]) -> sa.ColumnElement:
+    values = sorted(set(spellings))
+    array_column = sa.type_coerce(column, TEXT_ARRAY)
+    literal = sa.cast(postgresql.array(values), TEXT_ARRAY)
+    if len(values) == 1:
+        return array_column.contains(literal)
+    return array_column.overlap(literal)
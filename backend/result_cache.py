@@ -0,0 +1,120 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Generic, Optional, Tuple, TypeVar
+
+# Bounded LRU + TTL cache for ranked results. Entries are tagged with the catalog
+# version they were computed from and are dropped as soon as a newer version shows up.
+# Besides the entry count, an optional byte budget bounds the values' `nbytes`: a
+# ranking over a million candidates holds tens of megabytes.
+
+T = TypeVar("T")
+
+
+def canonical_key(*parts: Any) -> str:
+    encoded = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class ResultCache(Generic[T]):
+    def __init__(self, max_entries: int = 256, ttl_seconds: float = 300.0, max_bytes: Optional[int] = None) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes or None
+        # key -> (expires at, catalog version, value, bytes charged)
+        self._entries: "OrderedDict[str, Tuple[float, Optional[int], T, int]]" = OrderedDict()
+        self._version: Optional[int] = None
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self.stale_puts = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def _is_stale(self, version: Optional[int]) -> bool:
+        # Callers still holding an older snapshot must not wipe the newer generation.
+        return version is not None and self._version is not None and version < self._version
+
+    def _sync_version(self, version: Optional[int]) -> None:
+        if version is not None and version != self._version:
+            if self._entries:
+                self.invalidations += len(self._entries)
+                self._entries.clear()
+                self._bytes = 0
+            self._version = version
+
+    def _drop(self, key: str) -> None:
+        self._bytes -= self._entries.pop(key)[3]
+
+    def get(self, key: str, version: Optional[int] = None) -> Optional[T]:
+        if not self.enabled:
+            return None
+        with self._lock:
+            if self._is_stale(version):
+                self.misses += 1
+                return None
+            self._sync_version(version)
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, _, value, _ = entry
+            if expires_at <= time.monotonic():
+                self._drop(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: str, value: T, version: Optional[int] = None) -> None:
+        if not self.enabled:
+            return
+        size = int(getattr(value, "nbytes", 0))
+        with self._lock:
+            if self._is_stale(version):
+                self.stale_puts += 1
+                return
+            self._sync_version(version)
+            if key in self._entries:
+                self._drop(key)
+            if self.max_bytes is not None and size > self.max_bytes:
+                return
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, version, value, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or (self.max_bytes is not None and self._bytes > self.max_bytes):
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+                "stale_puts": self.stale_puts,
+                "catalog_version": self._version,
+            }
@@ -0,0 +1,456 @@
+import threading
+from array import array
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Columnar encoding of the catalog: every SECTION_META section becomes integer
+# codes into a per-section vocabulary so a whole request scores with a few
+# vectorized operations instead of a Python loop per dress.
+
+MISSING_CODE = -1
+# Scores are ranked and reported rounded to this many decimals, like _score_record.
+SCORE_DIGITS = 6
+# Upper bound on float64 cells a SectionMemo may hold (256 MB).
+MEMO_MAX_CELLS = 1 << 25
+
+# (score, price, name rank, id) of a ranked dress; the name rank may be fractional
+# when it comes from a cursor whose name is no longer in the catalog.
+RankKey = Tuple[float, float, float, int]
+
+
+class EncodedSection:
+    def __init__(self, key: str, section_type: str) -> None:
+        self.key = key
+        self.section_type = section_type
+        self.vocab: Dict[str, int] = {}
+        self.values: List[str] = []
+        # scalar / boolean / price_bucket: one code per dress, MISSING_CODE when no token
+        self.codes: Optional[np.ndarray] = None
+        # array: sparse multi-hot matrix stored as (row, code) pairs in token order
+        self.rows: Optional[np.ndarray] = None
+        self.cols: Optional[np.ndarray] = None
+        self.present: Optional[np.ndarray] = None
+
+    @property
+    def is_array(self) -> bool:
+        return self.section_type == "array"
+
+    def code_for(self, value: str) -> int:
+        code = self.vocab.get(value)
+        if code is None:
+            code = len(self.values)
+            self.vocab[value] = code
+            self.values.append(value)
+        return code
+
+    def lookup(self, value_weights: Dict[str, Any]) -> np.ndarray:
+        # One trailing zero slot so MISSING_CODE (-1) indexes a zero weight.
+        table = np.zeros(len(self.values) + 1, dtype=np.float64)
+        for value, raw_weight in value_weights.items():
+            code = self.vocab.get(value)
+            if code is None:
+                continue
+            weight = float(raw_weight)
+            if weight > 0:
+                table[code] = weight
+        return table
+
+
+class EncodedCatalog:
+    def __init__(self, size: int, sections: Dict[str, EncodedSection]) -> None:
+        self.size = size
+        self.sections = sections
+        self._row_starts: Dict[str, np.ndarray] = {}
+
+    @property
+    def nbytes(self) -> int:
+        total = 0
+        for section in self.sections.values():
+            arrays = (section.present, section.rows, section.cols) if section.is_array else (section.present, section.codes)
+            total += sum(int(array.nbytes) for array in arrays)
+        return total
+
+    def row_tokens(self, position: int) -> Dict[str, List[str]]:
+        # The section tokens one row was encoded from.
+        tokens: Dict[str, List[str]] = {}
+        for key, section in self.sections.items():
+            if section.is_array:
+                starts = self._row_starts.get(key)
+                if starts is None:
+                    starts = self._row_starts[key] = np.searchsorted(section.rows, np.arange(self.size + 1))
+                codes = section.cols[starts[position] : starts[position + 1]].tolist()
+                tokens[key] = [section.values[code] for code in codes]
+            else:
+                code = int(section.codes[position])
+                tokens[key] = [] if code == MISSING_CODE else [section.values[code]]
+        return tokens
+
+
+class CatalogEncoder:
+    # Builds an EncodedCatalog one row at a time, so rows can stream from the database.
+    def __init__(self, section_types: Dict[str, str]) -> None:
+        self.size = 0
+        self._sections = {key: EncodedSection(key, section_type) for key, section_type in section_types.items()}
+        self._rows = {key: array("q") for key, section in self._sections.items() if section.is_array}
+        self._cols = {key: array("q") for key in self._rows}
+        self._codes = {key: array("q") for key, section in self._sections.items() if not section.is_array}
+
+    def add(self, tokens: Dict[str, List[str]]) -> None:
+        index = self.size
+        for key, section in self._sections.items():
+            values = tokens.get(key)
+            if section.is_array:
+                if values:
+                    rows, cols = self._rows[key], self._cols[key]
+                    for token in values:
+                        rows.append(index)
+                        cols.append(section.code_for(token))
+            else:
+                self._codes[key].append(section.code_for(values[0]) if values else MISSING_CODE)
+        self.size += 1
+
+    def finish(self) -> EncodedCatalog:
+        for key, section in self._sections.items():
+            if section.is_array:
+                section.rows = np.array(self._rows[key], dtype=np.int64)
+                section.cols = np.array(self._cols[key], dtype=np.int64)
+                present = np.zeros(self.size, dtype=bool)
+                present[section.rows] = True
+                section.present = present
+            else:
+                section.codes = np.array(self._codes[key], dtype=np.int64)
+                section.present = section.codes != MISSING_CODE
+        return EncodedCatalog(self.size, self._sections)
+
+
+def update_encoded(
+    encoded: EncodedCatalog, old_to_new: np.ndarray, size: int, changed: Dict[int, Dict[str, List[str]]]
+) -> EncodedCatalog:
+    # A new encoding after a few rows changed: kept rows move to old_to_new[row]
+    # (-1 for deleted rows) and the rows in `changed` (new positions) are re-encoded.
+    # Vocabularies only grow, so existing codes and scoring tables stay valid.
+    positions = np.asarray(sorted(changed), dtype=np.int64)
+    changed_mask = np.zeros(size, dtype=bool)
+    changed_mask[positions] = True
+    kept = old_to_new >= 0
+    sections: Dict[str, EncodedSection] = {}
+
+    for key, old in encoded.sections.items():
+        section = EncodedSection(key, old.section_type)
+        section.vocab = dict(old.vocab)
+        section.values = list(old.values)
+        if section.is_array:
+            moved = old_to_new[old.rows]
+            stay = moved >= 0
+            stay[stay] = ~changed_mask[moved[stay]]
+            added_rows: List[int] = []
+            added_cols: List[int] = []
+            for position in positions.tolist():
+                for token in changed[position].get(key) or ():
+                    added_rows.append(position)
+                    added_cols.append(section.code_for(token))
+            rows = moved[stay]
+            # Splice the re-encoded rows in after any kept entries of lower rows, in token order.
+            slots = np.searchsorted(rows, added_rows, side="right")
+            section.rows = np.insert(rows, slots, np.asarray(added_rows, dtype=np.int64))
+            section.cols = np.insert(old.cols[stay], slots, np.asarray(added_cols, dtype=np.int64))
+            present = np.zeros(size, dtype=bool)
+            present[section.rows] = True
+            section.present = present
+        else:
+            codes = np.full(size, MISSING_CODE, dtype=np.int64)
+            codes[old_to_new[kept]] = old.codes[kept]
+            for position in positions.tolist():
+                values = changed[position].get(key)
+                codes[position] = section.code_for(values[0]) if values else MISSING_CODE
+            section.codes = codes
+            section.present = codes != MISSING_CODE
+        sections[key] = section
+
+    return EncodedCatalog(size, sections)
+
+
+class SectionMemo:
+    # Per-section score vectors shared by the profiles of one batch. Profiles that
+    # weight a section identically reuse its vector instead of re-gathering it.
+    def __init__(self, size: int, max_cells: int = MEMO_MAX_CELLS) -> None:
+        self.capacity = max_cells // max(1, size)
+        self.entries: Dict[Tuple[Any, ...], np.ndarray] = {}
+        self.hits = 0
+
+    def get(self, key: Tuple[Any, ...]) -> Optional[np.ndarray]:
+        vector = self.entries.get(key)
+        if vector is not None:
+            self.hits += 1
+        return vector
+
+    def put(self, key: Tuple[Any, ...], vector: np.ndarray) -> None:
+        if len(self.entries) < self.capacity:
+            self.entries[key] = vector
+
+
+# Step kinds of a compiled plan, dispatched once at compile time.
+PRESENCE, GATHER, SPARSE_SUM = 0, 1, 2
+
+WeightsKey = Tuple[Tuple[str, float, Tuple[Tuple[str, float], ...]], ...]
+
+
+def weights_key(weights: Dict[str, Dict[str, Any]]) -> WeightsKey:
+    # Canonical, hashable form of resolved weights. Section order is kept because it
+    # fixes the order scores are summed in.
+    return tuple(
+        (
+            section,
+            float(spec.get("section", 0.0)),
+            tuple(sorted((value, float(weight)) for value, weight in (spec.get("values") or {}).items())),
+        )
+        for section, spec in weights.items()
+    )
+
+
+class ScoringPlan:
+    # Resolved priority weights compiled into per-section steps over one encoded
+    # catalog: section weight as a float, value weights as a dense lookup table
+    # indexed by value code, and the section type already dispatched. Plans are
+    # cached per payload, so repeat payloads skip resolution and compilation and
+    # score() runs only the vectorized kernels.
+    def __init__(self, weights: Dict[str, Dict[str, Any]], source: Optional[str] = None) -> None:
+        self.weights = weights
+        self.source = source
+        self.key = weights_key(weights)
+        self._compiled: Optional[Tuple[EncodedCatalog, List[Tuple[Any, ...]]]] = None
+
+    def steps(self, encoded: EncodedCatalog) -> List[Tuple[Any, ...]]:
+        # Recompiled only when a new catalog snapshot (new vocabulary) shows up.
+        compiled = self._compiled
+        if compiled is not None and compiled[0] is encoded:
+            return compiled[1]
+        steps: List[Tuple[Any, ...]] = []
+        for (section_key, section_weight, values), spec in zip(self.key, self.weights.values()):
+            section = encoded.sections.get(section_key)
+            if section is None:
+                continue
+            value_weights = spec.get("values") or {}
+            if section_weight <= 0 and not value_weights:
+                continue
+            memo_key = (section_key, section_weight, values)
+            if not value_weights:
+                steps.append((PRESENCE, memo_key, section_weight, section.present, None, None))
+            elif section.is_array:
+                steps.append((SPARSE_SUM, memo_key, section_weight, section.rows, section.lookup(value_weights), section.cols))
+            else:
+                steps.append((GATHER, memo_key, section_weight, section.codes, section.lookup(value_weights), None))
+        self._compiled = (encoded, steps)
+        return steps
+
+    def score(self, encoded: EncodedCatalog, memo: Optional["SectionMemo"] = None) -> np.ndarray:
+        # Mirrors app._score_dress: sections are accumulated in weights order and
+        # array sections sum their positive value weights in token order, so the
+        # floating point results match the per-dress implementation exactly.
+        size = encoded.size
+        totals = np.zeros(size, dtype=np.float64)
+        for kind, memo_key, section_weight, index, table, cols in self.steps(encoded):
+            vector = memo.get(memo_key) if memo is not None else None
+            if vector is None:
+                if kind == GATHER:
+                    vector = section_weight * table[index]
+                elif kind == SPARSE_SUM:
+                    vector = section_weight * np.bincount(index, weights=table[cols], minlength=size)
+                else:
+                    vector = np.where(index, section_weight, 0.0)
+                if memo is not None:
+                    memo.put(memo_key, vector)
+            totals += vector
+        return totals
+
+
+def round_scores(scores: np.ndarray) -> np.ndarray:
+    # Python's round(score, SCORE_DIGITS) for every element, which rounds the exact
+    # decimal value half-to-even. np.round scales first, and the rounding error of
+    # that product can land a value just off a .5 tie exactly on it (or the reverse),
+    # so ties are settled with the product's exact error term (Dekker's two-product).
+    scores = np.asarray(scores, dtype=np.float64)
+    scale = 10.0**SCORE_DIGITS
+    scaled = scores * scale
+    nearest = np.rint(scaled)
+    with np.errstate(invalid="ignore"):
+        ties = np.flatnonzero((np.abs(scaled - nearest) == 0.5) & (np.abs(scaled) < 2.0**52))
+    if ties.size:
+        values, products = scores[ties], scaled[ties]
+        split = 134217729.0 * values
+        high = split - (split - values)
+        error = (high * scale - products) + (values - high) * scale
+        # The exact product sits above or below the tie, or on it (rint already rounds half-even).
+        nearest[ties] = np.where(error > 0, products + 0.5, np.where(error < 0, products - 0.5, nearest[ties]))
+    # Rounding never flips a sign; copysign keeps -0.0 where a tie resolved to zero.
+    rounded = np.copysign(nearest / scale, scores)
+    # Beyond 2**52 the product has no fractional part to round; NaN and inf pass through.
+    huge = ~(np.abs(scaled) < 2.0**52)
+    rounded[huge] = scores[huge]
+    return rounded
+
+
+def rank_indices(scores: np.ndarray, prices: np.ndarray, name_ranks: np.ndarray, ids: np.ndarray) -> np.ndarray:
+    # Same ordering as the original sort key (-score, price, name), with id as a
+    # final deterministic tie-break.
+    return np.lexsort((ids, name_ranks, prices, -scores))
+
+
+def top_k_indices(
+    scores: np.ndarray, prices: np.ndarray, name_ranks: np.ndarray, ids: np.ndarray, k: int
+) -> np.ndarray:
+    # First k positions of rank_indices without sorting the whole candidate set:
+    # partition on each sort key in turn, then sort only the k survivors.
+    size = scores.shape[0]
+    if k >= size:
+        return rank_indices(scores, prices, name_ranks, ids)
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+
+    keys = (-scores, prices, name_ranks, ids)
+    selected = _smallest_k(keys, np.arange(size, dtype=np.int64), k)
+    order = np.lexsort(tuple(key[selected] for key in reversed(keys)))
+    return selected[order]
+
+
+def _smallest_k(keys: Sequence[np.ndarray], candidates: np.ndarray, k: int) -> np.ndarray:
+    if k <= 0:
+        return candidates[:0]
+    if candidates.shape[0] <= k:
+        return candidates
+
+    primary = keys[0][candidates]
+    if len(keys) == 1:
+        return candidates[np.argpartition(primary, k - 1)[:k]]
+
+    kth = np.partition(primary, k - 1)[k - 1]
+    below = candidates[primary < kth]
+    tied = candidates[primary == kth]
+    return np.concatenate((below, _smallest_k(keys[1:], tied, k - below.shape[0])))
+
+
+def name_ranks_for(names: Sequence[str]) -> np.ndarray:
+    # Dense ranks so equal names tie and fall through to the id tie-break.
+    ranks = np.empty(len(names), dtype=np.int64)
+    rank = -1
+    previous: Optional[str] = None
+    for index in sorted(range(len(names)), key=lambda item: names[item]):
+        if rank < 0 or names[index] != previous:
+            rank += 1
+            previous = names[index]
+        ranks[index] = rank
+    return ranks
+
+
+class RankedResult:
+    # Ranking of one filtered candidate set. The sorted prefix grows on demand
+    # (doubling), so shallow pages stay O(n log k) and repeat requests for any
+    # page are served from the already-ranked prefix.
+    def __init__(
+        self,
+        candidates: np.ndarray,
+        scores: np.ndarray,
+        prices: np.ndarray,
+        name_ranks: np.ndarray,
+        ids: np.ndarray,
+        catalog_version: Optional[int] = None,
+    ) -> None:
+        self.candidates = candidates
+        self.scores = scores
+        self._prices = prices
+        self._name_ranks = name_ranks
+        self._ids = ids
+        self.catalog_version = catalog_version
+        self._order = np.empty(0, dtype=np.int64)
+        self._stats: Optional[Dict[str, float]] = None
+        # Facet counts over the candidates, filled in by the first request that asks.
+        self.facets: Optional[Dict[str, Dict[str, int]]] = None
+        self._lock = threading.Lock()
+
+    @property
+    def total(self) -> int:
+        return int(self.candidates.shape[0])
+
+    @property
+    def ranked_depth(self) -> int:
+        return int(self._order.shape[0])
+
+    def _ranked_order(self, k: int) -> np.ndarray:
+        # Candidate-relative order of the first k ranked candidates.
+        k = max(0, min(k, self.total))
+        order = self._order
+        if k > order.shape[0]:
+            with self._lock:
+                order = self._order
+                if k > order.shape[0]:
+                    depth = min(self.total, max(k, 2 * order.shape[0]))
+                    order = top_k_indices(self.scores, self._prices, self._name_ranks, self._ids, depth)
+                    self._order = order
+        return order[:k]
+
+    def seed_top(self, subset: np.ndarray, k: int) -> None:
+        # Candidate-relative indices known to contain the first k ranked candidates
+        # (e.g. merged per-shard top-k); ranking them seeds the sorted prefix.
+        order = rank_indices(self.scores[subset], self._prices[subset], self._name_ranks[subset], self._ids[subset])
+        with self._lock:
+            if k > self._order.shape[0]:
+                self._order = subset[order][:k]
+
+    def top(self, k: int) -> np.ndarray:
+        # Catalog positions of the first k ranked candidates.
+        return self.candidates[self._ranked_order(k)]
+
+    def page(self, offset: int, limit: int) -> np.ndarray:
+        return self.top(offset + limit)[offset:]
+
+    def page_after(self, key: RankKey, limit: int) -> Tuple[np.ndarray, int]:
+        # Keyset page: the next `limit` catalog positions strictly after `key`, plus
+        # how many candidates rank at or before it (the equivalent offset).
+        score, price, name_rank, dress_id = key
+        order = self._order
+        if order.size:
+            hits = np.flatnonzero(self._ids[order] == dress_id)
+            if hits.size:
+                candidate = order[hits[0]]
+                current = (self.scores[candidate], self._prices[candidate], self._name_ranks[candidate])
+                if current == (score, price, name_rank):
+                    start = int(hits[0]) + 1
+                    return self.page(start, limit), start
+
+        after = (self.scores < score) | (
+            (self.scores == score)
+            & (
+                (self._prices > price)
+                | (
+                    (self._prices == price)
+                    & ((self._name_ranks > name_rank) | ((self._name_ranks == name_rank) & (self._ids > dress_id)))
+                )
+            )
+        )
+        subset = np.flatnonzero(after)
+        order = top_k_indices(
+            self.scores[subset], self._prices[subset], self._name_ranks[subset], self._ids[subset], limit
+        )
+        return self.candidates[subset[order]], self.total - int(subset.shape[0])
+
+    def scores_of(self, positions: np.ndarray) -> np.ndarray:
+        # Scores for catalog positions returned by page()/page_after(); candidates are ascending.
+        return self.scores[np.searchsorted(self.candidates, positions)]
+
+    def score_stats(self) -> Optional[Dict[str, float]]:
+        if self._stats is None and self.scores.size:
+            self._stats = {
+                "count": float(self.scores.size),
+                "min": float(self.scores.min()),
+                "median": float(np.median(self.scores)),
+                "max": float(self.scores.max()),
+            }
+        return self._stats
+
+    @property
+    def nbytes(self) -> int:
+        # Every per-candidate array, counting the sorted prefix at its full size so the
+        # figure does not grow while a cached ranking is paged deeper.
+        arrays = (self.candidates, self.scores, self._prices, self._name_ranks, self._ids)
+        return int(sum(array.nbytes for array in arrays) + self.total * self._order.itemsize)
@@ -1,6 +1,5 @@
 # seed.py
-from app import app, db
-from models import WeddingDress
+from app import WeddingDress, app, db
 
 dresses = [
     WeddingDress(
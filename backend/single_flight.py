@@ -0,0 +1,70 @@
+import threading
+from typing import Callable, Dict, Generic, Hashable, Optional, Tuple, TypeVar
+
+# Single-flight coalescing: concurrent callers asking for the same key share one
+# computation. The first caller (the leader) runs it while the others block until
+# it lands, then take its value or re-raise its error. Nothing is kept once a
+# flight lands; later repeats are the result cache's business.
+
+T = TypeVar("T")
+
+
+class _Flight(Generic[T]):
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.value: Optional[T] = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight(Generic[T]):
+    def __init__(self, enabled: bool = True, wait_seconds: Optional[float] = 30.0) -> None:
+        self.enabled = enabled
+        # A follower that waits longer than this stops waiting and computes on its own.
+        self.wait_seconds = wait_seconds
+        self._flights: Dict[Hashable, _Flight[T]] = {}
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.coalesced = 0
+        self.wait_timeouts = 0
+
+    def run(self, key: Hashable, compute: Callable[[], T]) -> Tuple[T, bool]:
+        # Returns the value and whether it came from another caller's flight.
+        if not self.enabled:
+            return compute(), False
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                self.leaders += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            if flight.done.wait(self.wait_seconds):
+                if flight.error is not None:
+                    raise flight.error
+                return flight.value, True
+            with self._lock:
+                self.wait_timeouts += 1
+            return compute(), False
+
+        try:
+            flight.value = compute()
+            return flight.value, False
+        except BaseException as error:
+            flight.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "in_flight": len(self._flights),
+                "leaders": self.leaders,
+                "coalesced": self.coalesced,
+                "wait_timeouts": self.wait_timeouts,
+            }
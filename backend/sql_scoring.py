@@ -0,0 +1,163 @@
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import sqlalchemy as sa
+
+# Compiles resolved priority weights into a single ranked SQL statement so only
+# one page of rows leaves the database. Mirrors app._score_dress:
+#   scalar       CASE lower(trim(col)) WHEN value THEN weight ... END
+#   array        SUM of matching value weights over the dress's array values
+#   boolean      CASE WHEN col THEN w_true ELSE w_false END (NULL counts as false)
+#   price_bucket CASE over the same bucket boundaries as app.price_bucket
+# each multiplied by the section weight. Array values come from the dress_values
+# side table on SQLite and from unnest() over text[] columns on PostgreSQL.
+
+PriceBuckets = Sequence[Tuple[float, str]]
+
+
+class SqlScorer:
+    def __init__(
+        self,
+        table: sa.Table,
+        section_types: Dict[str, str],
+        price_buckets: PriceBuckets,
+        top_price_bucket: str,
+        values_table: Optional[sa.Table] = None,
+    ) -> None:
+        self.table = table
+        self.section_types = section_types
+        self.price_buckets = tuple(price_buckets)
+        self.top_price_bucket = top_price_bucket
+        self.values_table = values_table
+
+    def _column(self, section_key: str) -> sa.ColumnElement:
+        return self.table.c[section_key]
+
+    @staticmethod
+    def _positive(value_weights: Dict[str, Any]) -> Dict[str, float]:
+        resolved: Dict[str, float] = {}
+        for value, raw_weight in value_weights.items():
+            weight = float(raw_weight)
+            if weight > 0:
+                resolved[value] = weight
+        return resolved
+
+    @staticmethod
+    def _weight(value: float) -> sa.ColumnElement:
+        return sa.literal(value, sa.Float)
+
+    def _value_case(self, expression: sa.ColumnElement, weights: Dict[str, float]) -> sa.ColumnElement:
+        return sa.case(
+            *[(expression == value, self._weight(weight)) for value, weight in weights.items()],
+            else_=self._weight(0.0),
+        )
+
+    def _array_items(self, section_key: str, dialect_name: str) -> Tuple[sa.FromClause, sa.ColumnElement, List[Any]]:
+        if dialect_name == "postgresql":
+            items = sa.func.unnest(self._column(section_key)).table_valued("value").render_derived(name="item")
+            raw = items.c.value
+            return items, sa.func.lower(sa.func.trim(raw)), [sa.func.trim(raw) != ""]
+        if self.values_table is None:
+            raise ValueError(f"array section {section_key!r} needs a values table on {dialect_name}")
+        values = self.values_table
+        return values, values.c.value, [values.c.dress_id == self.table.c.id, values.c.section == section_key]
+
+    def _section_presence(self, section_key: str, section_type: str, dialect_name: str) -> sa.ColumnElement:
+        column = self._column(section_key) if section_type != "array" else None
+        if section_type == "scalar":
+            return sa.and_(column.isnot(None), sa.func.trim(column) != "")
+        if section_type == "price_bucket":
+            return column.isnot(None)
+        if section_type == "boolean":
+            return sa.true()
+        source, _, criteria = self._array_items(section_key, dialect_name)
+        return sa.exists(sa.select(sa.literal(1)).select_from(source).where(*criteria))
+
+    def _section_value(
+        self, section_key: str, section_type: str, weights: Dict[str, float], dialect_name: str
+    ) -> sa.ColumnElement:
+        if section_type == "array":
+            source, normalized, criteria = self._array_items(section_key, dialect_name)
+            total = sa.func.coalesce(sa.func.sum(self._value_case(normalized, weights)), self._weight(0.0))
+            return sa.select(total).select_from(source).where(*criteria).scalar_subquery()
+
+        column = self._column(section_key)
+        if section_type == "scalar":
+            return self._value_case(sa.func.lower(sa.func.trim(column)), weights)
+        if section_type == "boolean":
+            return sa.case(
+                (column.is_(True), self._weight(weights.get("true", 0.0))),
+                else_=self._weight(weights.get("false", 0.0)),
+            )
+
+        whens = [(column.is_(None), self._weight(0.0))]
+        for upper_bound, bucket in self.price_buckets:
+            whens.append((column < upper_bound, self._weight(weights.get(bucket, 0.0))))
+        return sa.case(*whens, else_=self._weight(weights.get(self.top_price_bucket, 0.0)))
+
+    def score_expression(self, weights: Dict[str, Dict[str, Any]], dialect_name: str) -> sa.ColumnElement:
+        terms: List[sa.ColumnElement] = []
+        for section_key, spec in weights.items():
+            section_type = self.section_types.get(section_key)
+            if not section_type:
+                continue
+            section_weight = float(spec.get("section", 0.0))
+            value_weights = spec.get("values") or {}
+            if section_weight <= 0 and not value_weights:
+                continue
+
+            if not value_weights:
+                presence = self._section_presence(section_key, section_type, dialect_name)
+                terms.append(sa.case((presence, self._weight(section_weight)), else_=self._weight(0.0)))
+                continue
+
+            positive = self._positive(value_weights)
+            if not positive:
+                continue
+            terms.append(self._weight(section_weight) * self._section_value(section_key, section_type, positive, dialect_name))
+
+        total: sa.ColumnElement = self._weight(0.0)
+        for term in terms:
+            total = total + term
+        if dialect_name == "postgresql":
+            return sa.cast(sa.func.round(sa.cast(total, sa.Numeric), 6), sa.Float)
+        return sa.func.round(total, 6)
+
+    def ranked_select(
+        self,
+        entity: Any,
+        weights: Dict[str, Dict[str, Any]],
+        conditions: Sequence[Any],
+        limit: int,
+        offset: int,
+        dialect_name: str,
+        after: Optional[Tuple[float, float, str, int]] = None,
+    ) -> sa.Select:
+        score = self.score_expression(weights, dialect_name)
+        score_column = score.label("score")
+        price = sa.func.coalesce(self.table.c.price, 0)
+        statement = sa.select(
+            entity,
+            score_column,
+            sa.func.count().over().label("total_count"),
+            sa.func.min(score).over().label("min_score"),
+            sa.func.max(score).over().label("max_score"),
+        )
+        if conditions:
+            statement = statement.where(sa.or_(*conditions))
+        if after is not None:
+            # Keyset continuation: rows strictly after (score, price, name, id) in ranking order.
+            after_score, after_price, after_name, after_id = after
+            name, dress_id = self.table.c.name, self.table.c.id
+            statement = statement.where(
+                sa.or_(
+                    score < after_score,
+                    sa.and_(score == after_score, price > after_price),
+                    sa.and_(score == after_score, price == after_price, name > after_name),
+                    sa.and_(score == after_score, price == after_price, name == after_name, dress_id > after_id),
+                )
+            )
+        return (
+            statement.order_by(sa.desc(score_column), price, self.table.c.name, self.table.c.id)
+            .limit(limit)
+            .offset(offset)
+        )
@@ -0,0 +1,82 @@
+from typing import Any, Dict, List, Optional
+
+import sqlalchemy as sa
+
+# SQLite engine profile. Every pooled connection gets the same pragmas on connect:
+# WAL so catalog writers (seed.py, update_images.py, migrations) never block
+# readers, memory-mapped I/O and a larger page cache so hot catalog pages stay
+# warm, and in-memory temp storage for the ORDER BY / GROUP BY spills of the SQL
+# scoring backend. The read engine opens the same file with mode=ro and
+# query_only, pooled for multi-threaded WSGI workers.
+
+DEFAULT_PROFILE: Dict[str, Any] = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "mmap_size": 256 * 1024 * 1024,
+    "cache_size_kb": 64 * 1024,
+    "temp_store": "MEMORY",
+    "busy_timeout_ms": 5000,
+}
+
+
+def sqlite_file_path(uri: str) -> Optional[str]:
+    # Only file-backed SQLite databases are tuned; in-memory and other dialects pass through.
+    url = sa.engine.make_url(uri)
+    if url.get_backend_name() != "sqlite" or not url.database or url.database == ":memory:":
+        return None
+    return url.database
+
+
+def pragma_statements(profile: Dict[str, Any], read_only: bool = False) -> List[str]:
+    statements = [
+        f"PRAGMA busy_timeout = {int(profile['busy_timeout_ms'])}",
+        f"PRAGMA mmap_size = {int(profile['mmap_size'])}",
+        # Negative cache_size is in KiB rather than pages.
+        f"PRAGMA cache_size = {-int(profile['cache_size_kb'])}",
+        f"PRAGMA temp_store = {profile['temp_store']}",
+    ]
+    if read_only:
+        statements.append("PRAGMA query_only = ON")
+    else:
+        # journal_mode is persistent in the file, so only writers (re)assert it; an
+        # empty mode leaves whatever the file already uses.
+        if profile["journal_mode"]:
+            statements.append(f"PRAGMA journal_mode = {profile['journal_mode']}")
+        statements.append(f"PRAGMA synchronous = {profile['synchronous']}")
+    return statements
+
+
+def apply_pragmas(engine: sa.engine.Engine, statements: List[str]) -> None:
+    def _on_connect(dbapi_connection: Any, _record: Any) -> None:
+        cursor = dbapi_connection.cursor()
+        try:
+            for statement in statements:
+                cursor.execute(statement)
+        finally:
+            cursor.close()
+
+    sa.event.listen(engine, "connect", _on_connect)
+
+
+def engine_options(pool_size: int, max_overflow: int, pool_timeout: float) -> Dict[str, Any]:
+    return {
+        "pool_size": pool_size,
+        "max_overflow": max_overflow,
+        "pool_timeout": pool_timeout,
+        "connect_args": {"check_same_thread": False},
+    }
+
+
+def create_read_engine(
+    uri: str, profile: Dict[str, Any], pool_size: int, max_overflow: int, pool_timeout: float
+) -> Optional[sa.engine.Engine]:
+    path = sqlite_file_path(uri)
+    if path is None:
+        return None
+    engine = sa.create_engine(
+        f"sqlite:///file:{path}?mode=ro&uri=true",
+        poolclass=sa.pool.QueuePool,
+        **engine_options(pool_size, max_overflow, pool_timeout),
+    )
+    apply_pragmas(engine, pragma_statements(profile, read_only=True))
+    return engine
@@ -0,0 +1,126 @@
+from typing import Any, Dict, Iterator, List, Sequence
+
+import numpy as np
+import sqlalchemy as sa
+
+# Deterministic synthetic WeddingDress rows for benchmarking. Facet values follow
+# a Zipf-like popularity curve over vocabularies seeded from seed.py, so a few
+# colors / silhouettes dominate the way they do in a real catalog, and the
+# boolean flags stay consistent with the features and backstyle they describe.
+
+ZIPF_EXPONENT = 1.1
+
+SCALAR_VOCABULARY: Dict[str, Sequence[str]] = {
+    "silhouette": ("A-line", "Ballgown", "Fit-and-Flare", "Mermaid", "Sheath", "Trumpet", "Column", "Empire"),
+    "neckline": (
+        "V-neck", "Sweetheart", "Off-the-Shoulder", "Straight Across", "High Neck",
+        "Halter", "Scoop", "Square", "Plunging V", "Illusion",
+    ),
+    "strapsleevelayout": ("Straps", "Strapless", "Cap Sleeves", "Bell", "Shoulder", "Long Sleeves", "One Shoulder"),
+    "length": ("Floor Length", "Sweep Train", "Chapel Train", "Cathedral Train", "Knee Length", "Tea Length"),
+    "collection": (
+        "Golden Hour", "Modern Muse", "Botanical Romance", "Midnight Bloom", "Crystal Dream", "Rose Reverie",
+        "Seaside Glow", "Twilight Muse", "Moonlight Collection", "Velvet Hour", "Heirloom", "Coastal Air",
+    ),
+    "fabric": ("Lace", "Tulle", "Satin", "Chiffon", "Organza", "Crepe", "Mikado", "Charmeuse"),
+    "color": ("Ivory", "White", "Champagne", "Blush", "Nude", "Black", "Light Gold", "Dusty Rose", "Silver"),
+    "backstyle": (
+        "Zipper", "Corset Back", "Zip-up back", "Illusion Back", "Low Back", "Keyhole Back", "Lace-Up",
+        "Zipper + Buttons", "Open Back",
+    ),
+    "season": ("spring", "summer", "fall", "winter"),
+    "size_range": ("0-12", "0-14", "0-20", "2-10", "2-14", "2-18", "4-18", "4-22", "6-16", "0-30"),
+}
+
+ARRAY_VOCABULARY: Dict[str, Sequence[str]] = {
+    "tags": (
+        "romantic", "elegant", "classic", "modern", "boho", "minimal", "vintage", "glamorous", "whimsical",
+        "dramatic", "princess", "dreamy", "sleek", "floral", "soft", "refined", "airy", "bold", "beach",
+        "lace", "curve-hugging", "light", "simple", "twilight",
+    ),
+    "weddingvenue": (
+        "garden", "beach", "ballroom", "chapel", "vineyard", "rooftop", "courthouse", "cathedral", "hotel",
+        "terrace", "mountain", "outdoor", "indoor", "loft", "cruise", "evening",
+    ),
+    "embellishments": (
+        "beading", "lace", "pearls", "sequins", "embroidery", "crystals", "floral appliqué", "none",
+        "lace overlay", "glitter tulle", "subtle beading", "floral embroidery", "shimmer organza",
+    ),
+    "features": (
+        "pockets", "convertible", "corset back", "built-in bra", "adjustable straps", "removable train",
+        "lightweight", "illusion neckline", "4-way stretch", "easy bustle", "full skirt", "fitted bodice",
+        "anti-wrinkle fabric", "comfortable lining", "eco-friendly fabric", "Stay-in-place straps",
+    ),
+}
+
+ARRAY_LENGTHS = (1, 2, 3, 4)
+ARRAY_LENGTH_WEIGHTS = (0.15, 0.35, 0.35, 0.15)
+PRICE_MEDIAN = 1600.0
+NULL_PRICE_RATE = 0.01
+SHIP48_RATE = 0.35
+
+
+def zipf_probabilities(size: int, exponent: float = ZIPF_EXPONENT) -> np.ndarray:
+    weights = 1.0 / np.arange(1, size + 1, dtype=np.float64) ** exponent
+    return weights / weights.sum()
+
+
+def _sample_scalar(rng: np.random.Generator, vocabulary: Sequence[str], count: int) -> List[str]:
+    codes = rng.choice(len(vocabulary), size=count, p=zipf_probabilities(len(vocabulary)))
+    return [vocabulary[code] for code in codes.tolist()]
+
+
+def _sample_array(rng: np.random.Generator, vocabulary: Sequence[str], count: int) -> List[List[str]]:
+    lengths = rng.choice(ARRAY_LENGTHS, size=count, p=ARRAY_LENGTH_WEIGHTS)
+    draws = rng.choice(len(vocabulary), size=(count, max(ARRAY_LENGTHS)), p=zipf_probabilities(len(vocabulary)))
+    rows: List[List[str]] = []
+    for length, codes in zip(lengths.tolist(), draws.tolist()):
+        # Duplicate draws collapse, so popular values shorten the list slightly.
+        rows.append([vocabulary[code] for code in dict.fromkeys(codes[:length])])
+    return rows
+
+
+def _sample_prices(rng: np.random.Generator, count: int) -> List[Any]:
+    prices = np.clip(np.round(rng.lognormal(np.log(PRICE_MEDIAN), 0.45, count) / 50.0) * 50.0, 300.0, 9000.0)
+    missing = rng.random(count) < NULL_PRICE_RATE
+    return [None if is_missing else price for price, is_missing in zip(prices.tolist(), missing.tolist())]
+
+
+def synthetic_rows(count: int, seed: int = 0, start_id: int = 1) -> List[Dict[str, Any]]:
+    rng = np.random.default_rng([seed, start_id])
+    columns: Dict[str, List[Any]] = {}
+    for key, vocabulary in SCALAR_VOCABULARY.items():
+        columns[key] = _sample_scalar(rng, vocabulary, count)
+    for key, vocabulary in ARRAY_VOCABULARY.items():
+        columns[key] = _sample_array(rng, vocabulary, count)
+    columns["price"] = _sample_prices(rng, count)
+    ship48 = (rng.random(count) < SHIP48_RATE).tolist()
+
+    rows: List[Dict[str, Any]] = []
+    for offset in range(count):
+        dress_id = start_id + offset
+        row = {key: values[offset] for key, values in columns.items()}
+        row["id"] = dress_id
+        row["name"] = f"{row['collection']} {row['silhouette']} {dress_id}"
+        row["image_path"] = f"{dress_id % 10 + 1}.png"
+        row["shipin48hrs"] = ship48[offset]
+        row["has_pockets"] = "pockets" in row["features"]
+        row["corset_back"] = row["backstyle"] == "Corset Back" or "corset back" in row["features"]
+        rows.append(row)
+    return rows
+
+
+def iter_synthetic_chunks(count: int, seed: int = 0, chunk_size: int = 10000) -> Iterator[List[Dict[str, Any]]]:
+    for start in range(0, count, chunk_size):
+        yield synthetic_rows(min(chunk_size, count - start), seed=seed, start_id=start + 1)
+
+
+def populate(connection: sa.Connection, table: sa.Table, count: int, seed: int = 0, chunk_size: int = 10000) -> int:
+    if connection.dialect.name == "sqlite":
+        # Bulk-load settings for a throwaway benchmark database only.
+        connection.exec_driver_sql("PRAGMA synchronous=OFF")
+    inserted = 0
+    for chunk in iter_synthetic_chunks(count, seed=seed, chunk_size=chunk_size):
+        connection.execute(table.insert(), chunk)
+        inserted += len(chunk)
+    return inserted
@@ -1,5 +1,8 @@
+import atexit
 import os
+import shutil
 import sys
+import tempfile
 from pathlib import Path
 
 import pytest
@@ -7,12 +10,37 @@ import pytest
 os.environ.setdefault("ENABLE_DYNAMIC_SCORING", "true")
 
 backend_root = Path(__file__).resolve().parents[1]
+
+# Tests write to the database, so SQLite runs use a scratch copy of the demo file.
+if not os.getenv("DATABASE_URL"):
+    scratch_dir = tempfile.mkdtemp(prefix="best-dressed-tests-")
+    atexit.register(shutil.rmtree, scratch_dir, ignore_errors=True)
+    scratch_db = shutil.copy(backend_root / "instance" / "dresses.db", scratch_dir)
+    os.environ["DATABASE_URL"] = f"sqlite:///{scratch_db}"
+
 if str(backend_root) not in sys.path:
     sys.path.insert(0, str(backend_root))
 
 from app import app as flask_app, db  # noqa: E402  (import after env setup)
 
 
+# The suite runs against whatever DATABASE_URL selects (SQLite by default, PostgreSQL
+# seeded from seed.sql / seed.py); SQLite-specific tests are skipped elsewhere.
+def pytest_configure(config):
+    config.addinivalue_line("markers", "sqlite_only: needs the SQLite backend (dress_values triggers, pragmas)")
+
+
+def pytest_collection_modifyitems(config, items):
+    with flask_app.app_context():
+        dialect_name = db.engine.dialect.name
+    if dialect_name == "sqlite":
+        return
+    skip = pytest.mark.skip(reason=f"SQLite-only test; DATABASE_URL selects {dialect_name}")
+    for item in items:
+        if "sqlite_only" in item.keywords:
+            item.add_marker(skip)
+
+
 @pytest.fixture()
 def app():
     flask_app.config.update(
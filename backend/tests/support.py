@@ -0,0 +1,47 @@
+from types import SimpleNamespace
+
+from app import _section_tokens
+from scoring_engine import CatalogEncoder
+
+# Shared test data and helpers, imported by the test modules that need them.
+
+PARITY_PAYLOADS = [
+    {
+        "priority": {
+            "sections": ["Color", "Fabric", "tags", "price"],
+            "values": {
+                "color": ["Ivory", "White"],
+                "fabric": ["Satin", "Lace"],
+                "tags": ["romantic", "classic", "elegant"],
+                "price": ["1000-1500"],
+            },
+        }
+    },
+    {
+        "priority": {
+            "sections": ["features", "has_pockets", "weddingvenue", "season"],
+            "values": {"features": ["pockets", "corset back"], "has_pockets": ["true"], "weddingvenue": ["garden"]},
+        }
+    },
+    {
+        "weights": {
+            "embellishments": {"section": 3, "values": {"beading": 2, "lace": -1, "pearls": 0}},
+            "silhouette": {"section": 7},
+            "corset_back": {"section": 0, "values": {"false": 1}},
+            "neckline": {"section": 1.5, "values": {"v-neck": 0.25, "sweetheart": 4}},
+        }
+    },
+]
+
+
+# Section tokens of a plain row dict, read the way the catalog reads a dress.
+def row_tokens(row):
+    return _section_tokens(SimpleNamespace(**row))
+
+
+# An encoded catalog straight from token rows, for tests that bypass the database.
+def encode_tokens(token_rows, section_types):
+    encoder = CatalogEncoder(section_types)
+    for tokens in token_rows:
+        encoder.add(tokens)
+    return encoder.finish()
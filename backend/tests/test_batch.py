@@ -0,0 +1,56 @@
+import numpy as np
+
+import app as app_module
+from app import CATALOG, RESULT_CACHE, _resolve_priority_weights
+from scoring_engine import ScoringPlan, SectionMemo
+from support import PARITY_PAYLOADS
+
+BATCH = [
+    dict(PARITY_PAYLOADS[0], page={"limit": 3}),
+    dict(PARITY_PAYLOADS[1], filters={"color": ["Ivory", "White"]}, page={"limit": 2, "offset": 1}),
+    dict(PARITY_PAYLOADS[2], filters={"color": ["White", "Ivory"]}, fields=["id", "score"]),
+    dict(PARITY_PAYLOADS[0], debug=True, page={"limit": 2}),
+]
+
+
+# Every batch entry matches what /api/dresses returns for the same request.
+def test_batch_matches_single_requests(client):
+    RESULT_CACHE.clear()
+    response = client.post("/api/dresses/batch", json={"requests": BATCH})
+    data = response.get_json()
+
+    assert response.status_code == 200
+    assert data["count"] == len(BATCH)
+    assert data["catalog_version"] == CATALOG.get().version
+    for entry, result in zip(BATCH, data["results"]):
+        single = client.post("/api/dresses", json=entry).get_json()
+        assert result["items"] == single["items"]
+        assert result["pageInfo"] == single["pageInfo"]
+    assert set(data["results"][3]["debug"]) == {"weights_source", "weights", "filters"}
+
+
+# A bare list is accepted, and a bad cursor only fails its own entry.
+def test_batch_entry_errors_are_isolated(client):
+    data = client.post("/api/dresses/batch", json=[BATCH[0], {"page": {"cursor": "nope"}}]).get_json()
+
+    assert len(data["results"][0]["items"]) == 3
+    assert data["results"][1] == {"error": "invalid cursor"}
+
+
+# Malformed and oversized batches are rejected up front.
+def test_batch_validation(client, monkeypatch):
+    assert client.post("/api/dresses/batch", json={"requests": "nope"}).status_code == 400
+    monkeypatch.setattr(app_module, "BATCH_MAX_REQUESTS", 1)
+    assert client.post("/api/dresses/batch", json=BATCH[:2]).status_code == 400
+
+
+# Section vectors shared through the memo give bit-identical scores.
+def test_section_memo_reuses_identical_sections():
+    encoded = CATALOG.get().encoded
+    profiles = [_resolve_priority_weights(payload)[0] for payload in PARITY_PAYLOADS + PARITY_PAYLOADS]
+    memo = SectionMemo(encoded.size)
+
+    for weights in profiles:
+        assert np.array_equal(ScoringPlan(weights).score(encoded, memo), ScoringPlan(weights).score(encoded))
+    assert memo.hits == len(memo.entries)
+    assert SectionMemo(encoded.size, max_cells=encoded.size).capacity == 1
@@ -0,0 +1,50 @@
+import json
+import subprocess
+import sys
+from collections import Counter
+from pathlib import Path
+
+from benchmark import benchmark_payloads
+from synthetic_catalog import SCALAR_VOCABULARY, synthetic_rows
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+
+
+# Generated catalogs are reproducible, skewed toward popular values and internally consistent.
+def test_synthetic_rows_are_deterministic_and_skewed():
+    rows = synthetic_rows(2000, seed=5)
+    assert rows == synthetic_rows(2000, seed=5)
+    assert [row["id"] for row in rows[:3]] == [1, 2, 3]
+
+    colors = Counter(row["color"] for row in rows)
+    assert colors.most_common(1)[0][0] == SCALAR_VOCABULARY["color"][0]
+    assert colors.most_common()[-1][1] < colors.most_common(1)[0][1] / 3
+    assert all(row["has_pockets"] == ("pockets" in row["features"]) for row in rows)
+    assert all(1 <= len(row["tags"]) <= 4 and len(set(row["tags"])) == len(row["tags"]) for row in rows)
+
+
+# The request mix is fixed for a seed and covers every payload kind.
+def test_benchmark_payload_mix_is_reproducible():
+    payloads = benchmark_payloads(60, seed=1)
+    assert payloads == benchmark_payloads(60, seed=1)
+    assert {payload["kind"] for payload in payloads} == {"priority", "filters", "priority+filters", "weights", "deep-page", "cursor"}
+
+
+# A tiny end-to-end run emits the JSON report without touching instance/dresses.db.
+def test_benchmark_cli_reports_json(tmp_path):
+    output = tmp_path / "report.json"
+    subprocess.run(
+        [sys.executable, "benchmark.py", "--sizes", "300", "--requests", "12", "--warmup", "2",
+         "--database", str(tmp_path / "bench.db"), "--output", str(output)],
+        cwd=BACKEND_ROOT,
+        check=True,
+        capture_output=True,
+    )
+    report = json.loads(output.read_text())
+    result = report["results"][0]
+
+    assert result["catalog_size"] == 300
+    assert result["errors"] == 0
+    assert result["throughput_rps"] > 0
+    assert result["stages_ms"]["total"]["count"] == result["requests"]
+    assert "p99_ms" in result["stages_ms"]["score"]
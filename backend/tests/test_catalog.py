@@ -0,0 +1,44 @@
+from sqlalchemy import or_
+
+from app import CATALOG, WeddingDress, _build_filter_conditions
+
+
+# Snapshot filtering must select the same dresses as the SQL OR-of-conditions filter.
+def test_snapshot_filters_match_sql_filters(client, session):
+    filters = {"color": ["Ivory"], "silhouette": ["Sheath"], "shipin48hrs": "true", "price": ["1000-1500", "3000+"]}
+
+    expected = {
+        dress.id for dress in session.query(WeddingDress).filter(or_(*_build_filter_conditions(filters))).all()
+    }
+    response = client.post("/api/dresses", json={"filters": filters, "page": {"limit": 48}})
+    assert response.status_code == 200
+
+    data = response.get_json()
+    assert {item["id"] for item in data["items"]} == expected
+    assert data["total_count"] == len(expected)
+
+
+# A changed row count / max id is picked up on the next refresh check without a restart.
+def test_catalog_reloads_when_table_changes(session):
+    before = CATALOG.reload()
+    previous_interval = CATALOG.refresh_interval
+    CATALOG.refresh_interval = 0
+    try:
+        session.add(WeddingDress(name="Probe Dress", price=999.0, tags=["probe"]))
+        session.flush()
+        refreshed = CATALOG.get()
+        assert refreshed.version > before.version
+        assert refreshed.size == before.size + 1
+        assert CATALOG.get() is refreshed
+    finally:
+        session.rollback()
+        CATALOG.refresh_interval = previous_interval
+        CATALOG.reload()
+
+
+# The explicit reload endpoint swaps in a new snapshot version.
+def test_reload_endpoint_bumps_version(client):
+    before = CATALOG.get().version
+    response = client.post("/api/catalog/reload")
+    assert response.status_code == 200
+    assert response.get_json()["version"] > before
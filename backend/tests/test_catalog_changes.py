@@ -0,0 +1,114 @@
+import numpy as np
+import pytest
+import sqlalchemy as sa
+
+from app import CATALOG, RECORD_FIELDS, SECTION_TYPES, CatalogChange, WeddingDress, _scoring_plan, db
+from catalog import CatalogSnapshot
+from scoring_engine import RankedResult, round_scores
+from support import PARITY_PAYLOADS, row_tokens
+from synthetic_catalog import synthetic_rows
+
+
+def _snapshot(rows, version=1):
+    tokens = [row_tokens(row) for row in rows]
+    return CatalogSnapshot(version, (len(rows),), rows, tokens, SECTION_TYPES, RECORD_FIELDS)
+
+
+def _changed(row):
+    return row, row_tokens(row)
+
+
+def _top(snapshot, payload, k=40):
+    scores = round_scores(_scoring_plan(payload).score(snapshot.encoded))
+    ranked = RankedResult(np.arange(snapshot.size), scores, snapshot.prices, snapshot.name_ranks, snapshot.ids)
+    return snapshot.ids[ranked.top(k)].tolist(), scores
+
+
+SCENARIOS = {
+    "update": lambda rows, fresh: ({rows[5]["id"]: dict(fresh[0], id=rows[5]["id"])}, []),
+    "append": lambda rows, fresh: ({rows[-1]["id"] + 10: dict(fresh[1], id=rows[-1]["id"] + 10)}, []),
+    "insert_and_delete": lambda rows, fresh: (
+        {rows[3]["id"] + 1: dict(fresh[2], id=rows[3]["id"] + 1), rows[40]["id"]: dict(fresh[3], id=rows[40]["id"])},
+        [rows[0]["id"], rows[17]["id"]],
+    ),
+}
+
+
+# A snapshot derived from a delta filters, scores and ranks exactly like a full rebuild of the same rows.
+@pytest.mark.parametrize("scenario", sorted(SCENARIOS))
+def test_with_changes_matches_full_rebuild(scenario):
+    rows = [dict(row, id=2 * index + 1) for index, row in enumerate(synthetic_rows(400, seed=3))]
+    upserts, deletes = SCENARIOS[scenario](rows, synthetic_rows(4, seed=99))
+    base = _snapshot(rows)
+
+    changes = {dress_id: _changed(row) for dress_id, row in upserts.items()}
+    changes.update(dict.fromkeys(deletes))
+    derived = base.with_changes(2, (0,), changes)
+
+    final = {row["id"]: row for row in rows}
+    final.update(upserts)
+    for dress_id in deletes:
+        del final[dress_id]
+    rebuilt = _snapshot([final[dress_id] for dress_id in sorted(final)], version=2)
+
+    assert derived.ids.tolist() == rebuilt.ids.tolist()
+    assert list(derived.records) == list(rebuilt.records)
+    assert np.array_equal(derived.raw_prices, rebuilt.raw_prices, equal_nan=True)
+    for key, posting in derived.filter_index.postings.items():
+        expected = rebuilt.filter_index.posting(*key)
+        positions = posting.all_positions(derived.size).tolist()
+        assert positions == (expected.all_positions(rebuilt.size).tolist() if expected else [])
+    for low, high in ((None, 900.0), (1000.0, 1500.0), (2000.0, None)):
+        assert np.array_equal(
+            derived.filter_candidates({}, [(low, high)]), rebuilt.filter_candidates({}, [(low, high)])
+        )
+    for payload in PARITY_PAYLOADS:
+        derived_top, derived_scores = _top(derived, payload)
+        rebuilt_top, rebuilt_scores = _top(rebuilt, payload)
+        assert np.array_equal(derived_scores, rebuilt_scores)
+        assert derived_top == rebuilt_top
+
+
+# A committed edit reaches this process's snapshot through the change log, without a full reload.
+def test_committed_edit_applies_as_delta(session):
+    before = CATALOG.reload()
+    dress = session.query(WeddingDress).order_by(WeddingDress.id).first()
+    original = dress.color
+    builds = CATALOG.counters["full_builds"]
+    try:
+        dress.color = "Delta Green"
+        session.commit()
+        snapshot = CATALOG.get()
+        assert snapshot.version == before.version + 1
+        assert snapshot.records[snapshot.index_by_id[dress.id]]["color"] == "Delta Green"
+        assert snapshot.filter_candidates({"color": ["delta green"]}, []).tolist() == [snapshot.index_by_id[dress.id]]
+        assert CATALOG.counters["full_builds"] == builds
+    finally:
+        dress.color = original
+        session.commit()
+        CATALOG.reload()
+
+
+# Writes from another connection are logged by triggers and picked up on the next probe.
+@pytest.mark.sqlite_only
+def test_raw_sql_writes_are_logged(session):
+    before = CATALOG.reload()
+    table = WeddingDress.__table__
+    previous_interval = CATALOG.refresh_interval
+    CATALOG.refresh_interval = 0
+    head = before.fingerprint[2]
+    try:
+        with db.engine.begin() as connection:
+            dress_id = connection.execute(sa.insert(table).values(name="Logged Dress", price=1234.0)).inserted_primary_key[0]
+        session.commit()
+        logged = session.query(CatalogChange.dress_id, CatalogChange.op).filter(CatalogChange.seq > head).all()
+        assert [tuple(row) for row in logged] == [(dress_id, "insert")]
+        snapshot = CATALOG.get()
+        assert snapshot.size == before.size + 1
+        assert snapshot.records[snapshot.index_by_id[dress_id]]["name"] == "Logged Dress"
+    finally:
+        with db.engine.begin() as connection:
+            connection.execute(sa.delete(table).where(table.c.name == "Logged Dress"))
+        session.commit()
+        CATALOG.refresh_interval = previous_interval
+        CATALOG.reload()
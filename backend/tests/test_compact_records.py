@@ -0,0 +1,58 @@
+import tracemalloc
+
+import numpy as np
+
+import app as app_module
+from app import CATALOG, RECORD_FIELDS, SECTION_TYPES, WeddingDress
+from catalog import CatalogSnapshot
+from compact_records import CompactRecords
+from support import row_tokens
+from synthetic_catalog import synthetic_rows
+
+
+# Snapshot records decode back to exactly what the ORM serializes, key order included.
+def test_records_round_trip_serialize(session):
+    snapshot = CATALOG.reload()
+    expected = [dress.serialize() for dress in session.query(WeddingDress).order_by(WeddingDress.id)]
+
+    assert list(snapshot.records) == expected
+    assert [list(record) for record in snapshot.records] == [list(record) for record in expected]
+    assert snapshot.records[-1] == expected[-1]
+    assert snapshot.records.rows([2, 0]) == [expected[2], expected[0]]
+    assert [snapshot.tokens[index] for index in range(snapshot.size)] == [
+        app_module._section_tokens(dress) for dress in session.query(WeddingDress).order_by(WeddingDress.id)
+    ]
+
+
+# NULLs stay distinct from empty lists, False and 0.0 through packing and splicing.
+def test_nulls_survive_packing_and_splicing():
+    rows = [
+        {"id": 1, "name": "A", "price": None, "shipin48hrs": None, "tags": None, "color": None},
+        {"id": 2, "name": "B", "price": 0.0, "shipin48hrs": False, "tags": [], "color": "Ivory"},
+        {"id": 3, "name": "C", "price": 10.5, "shipin48hrs": True, "tags": ["boho", "lace"], "color": "Ivory"},
+    ]
+    store = CompactRecords.from_records(RECORD_FIELDS, rows)
+    decoded = list(store)
+    for row, record in zip(rows, decoded):
+        assert {key: record[key] for key in row} == row
+
+    changed = {1: {"id": 3, "name": "C2", "price": None, "tags": ["beach"], "color": "Blush"}}
+    spliced = store.spliced(np.asarray([0, -1, 1]), 2, changed)
+    spliced_rows = spliced.rows([0, 1])
+    assert spliced_rows[0] == decoded[0]
+    assert {key: spliced_rows[1][key] for key in changed[1]} == changed[1]
+    assert store.rows([2]) == decoded[2:]
+    assert spliced.distinct("color") == ["Ivory", "Blush"]
+
+
+# A packed snapshot costs a fraction of the per-dress dicts and token lists it replaces.
+def test_snapshot_bytes_per_dress():
+    tracemalloc.start()
+    rows = [dict(row, id=index + 1) for index, row in enumerate(synthetic_rows(5000, seed=5))]
+    tokens = [row_tokens(row) for row in rows]
+    dict_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    snapshot = CatalogSnapshot(1, (len(rows),), rows, tokens, SECTION_TYPES, RECORD_FIELDS)
+    assert snapshot.nbytes * 4 < dict_bytes
+    assert list(snapshot.records) == rows
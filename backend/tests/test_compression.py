@@ -0,0 +1,66 @@
+import datetime
+import gzip
+import json
+from decimal import Decimal
+
+import numpy as np
+from werkzeug.datastructures import Accept
+from werkzeug.http import parse_accept_header
+
+from compression import negotiate_encoding
+from json_fragments import encode_value
+from json_provider import ENCODER, dumps_compact
+from support import PARITY_PAYLOADS
+
+
+def _accept(header):
+    return parse_accept_header(header, Accept)
+
+
+# Large JSON responses are gzip-encoded on request and decode to the same document.
+def test_dresses_response_is_gzipped(client):
+    payload = dict(PARITY_PAYLOADS[0], page={"limit": 48}, debug=True)
+    plain = client.post("/api/dresses", json=payload)
+    packed = client.post("/api/dresses", json=payload, headers={"Accept-Encoding": "gzip, deflate"})
+
+    assert "Content-Encoding" not in plain.headers
+    assert packed.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in packed.headers["Vary"]
+    assert int(packed.headers["Content-Length"]) < len(plain.get_data())
+    unpacked = json.loads(gzip.decompress(packed.get_data()))
+    assert unpacked["items"] == plain.get_json()["items"]
+
+
+# Bodies under the size threshold and refused encodings are sent as-is.
+def test_small_or_refused_responses_are_not_compressed(client):
+    small = client.get("/api/cache/stats", headers={"Accept-Encoding": "gzip"})
+    refused = client.post("/api/dresses", json={"page": {"limit": 48}}, headers={"Accept-Encoding": "gzip;q=0"})
+
+    assert "Content-Encoding" not in small.headers
+    assert "Content-Encoding" not in refused.headers
+
+
+# Client q-values pick the encoding; ties keep the server's preference order.
+def test_negotiate_encoding():
+    assert negotiate_encoding(_accept("gzip;q=0.5, br"), ("br", "gzip")) == "br"
+    assert negotiate_encoding(_accept("gzip, br;q=0.1"), ("br", "gzip")) == "gzip"
+    assert negotiate_encoding(_accept("*"), ("br", "gzip")) == "br"
+    assert negotiate_encoding(_accept("identity"), ("br", "gzip")) is None
+
+
+# The fast encoder handles the same values as Flask's stdlib provider.
+def test_fast_json_matches_stdlib():
+    value = {"b": [1, 2.5, None, True], "a": "Ünïcode", "when": datetime.date(2024, 5, 1), "price": Decimal("10.5"), "score": np.float64(1.25)}
+
+    fast = json.loads(dumps_compact(value, sort_keys=True))
+    slow = json.loads(dumps_compact(value, sort_keys=True, use_fast=False))
+    assert fast == slow
+    assert list(fast) == sorted(fast)
+
+
+# JSON_ENCODER=stdlib also reaches pre-encoded fragments, not just the Flask provider.
+def test_stdlib_switch_covers_fragments(monkeypatch):
+    monkeypatch.setitem(ENCODER, "use_fast", True)
+    assert encode_value("é") == '"é"'
+    monkeypatch.setitem(ENCODER, "use_fast", False)
+    assert encode_value("é") == json.dumps("é")
@@ -0,0 +1,79 @@
+import pytest
+
+import app as app_module
+from app import CATALOG, RESULT_CACHE, WeddingDress
+from support import PARITY_PAYLOADS
+
+PAYLOAD = PARITY_PAYLOADS[0]
+
+
+def _walk(client, limit):
+    items, infos = [], []
+    page = {"limit": limit}
+    while True:
+        data = client.post("/api/dresses", json=dict(PAYLOAD, page=page)).get_json()
+        items.extend(item["id"] for item in data["items"])
+        infos.append(data["pageInfo"])
+        if not data["pageInfo"]["hasNextPage"]:
+            return items, infos
+        page = {"limit": limit, "cursor": data["pageInfo"]["nextCursor"]}
+
+
+# Following nextCursor visits the same ranking as one big page, with exact offsets.
+@pytest.mark.parametrize("backend", ["memory", "sql"])
+def test_cursor_walk_matches_full_ranking(client, monkeypatch, backend):
+    monkeypatch.setattr(app_module, "SCORING_BACKEND", backend)
+    full = client.post("/api/dresses", json=dict(PAYLOAD, page={"limit": 48})).get_json()
+
+    items, infos = _walk(client, 3)
+
+    assert items == [item["id"] for item in full["items"]]
+    assert [info["offset"] for info in infos] == list(range(0, full["total_count"], 3))
+    assert all(info["total"] == full["total_count"] for info in infos)
+    assert infos[-1]["nextCursor"] is None
+
+
+# A cursor keeps working after the cached ranking is gone (keyset comparison path).
+def test_cursor_survives_cache_and_catalog_reload(client):
+    first = client.post("/api/dresses", json=dict(PAYLOAD, page={"limit": 4})).get_json()
+    expected = client.post("/api/dresses", json=dict(PAYLOAD, page={"limit": 4, "offset": 4})).get_json()
+
+    RESULT_CACHE.clear()
+    CATALOG.reload()
+    cursor_page = {"limit": 4, "cursor": first["pageInfo"]["nextCursor"]}
+    resumed = client.post("/api/dresses", json=dict(PAYLOAD, page=cursor_page)).get_json()
+
+    assert [item["id"] for item in resumed["items"]] == [item["id"] for item in expected["items"]]
+    assert resumed["pageInfo"]["offset"] == 4
+
+
+def _no_ranking(*args, **kwargs):
+    raise AssertionError("ranked a page for an expired cursor")
+
+
+# A cursor from before a catalog edit is refused, before any scoring, instead of paging through the new ranking.
+def test_cursor_from_changed_catalog_expires(client, session, monkeypatch):
+    CATALOG.reload()
+    cursor = client.post("/api/dresses", json=dict(PAYLOAD, page={"limit": 4})).get_json()["pageInfo"]["nextCursor"]
+    dress = session.query(WeddingDress).order_by(WeddingDress.id).first()
+    original = dress.price
+    try:
+        dress.price = (original or 0) + 1
+        session.commit()
+        monkeypatch.setattr(app_module, "_rank_candidates", _no_ranking)
+        response = client.post("/api/dresses", json=dict(PAYLOAD, page={"limit": 4, "cursor": cursor}))
+        batch = client.post("/api/dresses/batch", json=[dict(PAYLOAD, page={"limit": 4, "cursor": cursor})]).get_json()
+    finally:
+        dress.price = original
+        session.commit()
+        CATALOG.reload()
+
+    assert response.status_code == 410
+    assert response.get_json()["error"].startswith("cursor expired")
+    assert batch["results"][0]["error"].startswith("cursor expired")
+
+
+# Garbage cursors are rejected instead of silently restarting from the first page.
+def test_invalid_cursor_is_rejected(client):
+    response = client.post("/api/dresses", json=dict(PAYLOAD, page={"cursor": "not-a-cursor"}))
+    assert response.status_code == 400
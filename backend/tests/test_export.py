@@ -0,0 +1,56 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+from app import CATALOG, RESULT_CACHE
+from support import PARITY_PAYLOADS
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+
+
+def _lines(response):
+    return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+
+# The export streams the same ranking /api/dresses pages through, one item per line.
+def test_export_matches_paged_ranking(client):
+    payload = dict(PARITY_PAYLOADS[1], filters={"color": ["Ivory", "White", "Blush"]})
+    response = client.post("/api/dresses/export", json=payload)
+    paged = client.post("/api/dresses", json=dict(payload, page={"limit": 48})).get_json()
+
+    assert response.is_streamed
+    assert response.mimetype == "application/x-ndjson"
+    assert int(response.headers["X-Total-Count"]) == paged["total_count"]
+    assert _lines(response) == paged["items"]
+
+
+# Debug lines carry the scoring breakdown, and projections apply per line.
+def test_export_debug_and_fields(client):
+    traced = _lines(client.post("/api/dresses/export", json=dict(PARITY_PAYLOADS[0], debug=True)))
+    projected = _lines(client.get("/api/dresses/export?fields=id,score&color=Ivory"))
+
+    assert any("_debug" in item for item in traced)
+    assert projected and all(set(item) == {"id", "score"} for item in projected)
+
+
+# Exports encode fragments without filling the per-version fragment cache.
+def test_export_does_not_fill_fragment_cache(client):
+    RESULT_CACHE.clear()
+    client.get("/api/dresses/export?fields=id,collection")
+    slots = CATALOG.get().fragments._slots(("id", "collection"))
+    assert all(slot is None for slot in slots)
+
+
+# The CLI writes the same NDJSON to a file.
+def test_export_cli(client, tmp_path):
+    output = tmp_path / "ranked.ndjson"
+    body = json.dumps(PARITY_PAYLOADS[0])
+    subprocess.run(
+        [sys.executable, "export_ranked.py", "--payload", body, "--fields", "id,score", "--output", str(output)],
+        cwd=BACKEND_ROOT,
+        check=True,
+        capture_output=True,
+    )
+    expected = _lines(client.post("/api/dresses/export", json=dict(PARITY_PAYLOADS[0], fields=["id", "score"])))
+    assert [json.loads(line) for line in output.read_text().splitlines()] == expected
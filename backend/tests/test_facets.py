@@ -0,0 +1,58 @@
+from collections import Counter
+
+import numpy as np
+import pytest
+
+import app as app_module
+from app import SECTION_META, SECTION_TYPES, WeddingDress, _section_tokens
+from facets import FacetCounter
+from support import encode_tokens
+
+FILTERS = {"color": ["Ivory", "White", "Blush"]}
+
+
+def _expected(session, colors):
+    counts = {key: Counter() for key in SECTION_META}
+    for dress in session.query(WeddingDress).all():
+        tokens = _section_tokens(dress)
+        if colors and not set(tokens["color"]) & colors:
+            continue
+        for key, values in tokens.items():
+            counts[key].update(set(values))
+    return {key: dict(counter) for key, counter in counts.items()}
+
+
+# Facets cover every section, including price buckets, over the filtered candidates.
+@pytest.mark.parametrize("backend", ["memory", "sql"])
+def test_facets_match_brute_force(client, session, monkeypatch, backend):
+    monkeypatch.setattr(app_module, "SCORING_BACKEND", backend)
+    data = client.post("/api/dresses", json={"filters": FILTERS, "facets": True, "page": {"limit": 2}}).get_json()
+
+    assert set(data["facets"]) == set(SECTION_META)
+    assert data["facets"] == _expected(session, {"ivory", "white", "blush"})
+    assert sum(data["facets"]["color"].values()) == data["total_count"]
+    assert set(data["facets"]["price"]) <= {"0-500", "500-1000", "1000-1500", "1500-2000", "2000+"}
+
+
+# Unfiltered GETs count the whole catalog; facets stay off unless asked for.
+def test_unfiltered_facets(client, session):
+    data = client.get("/api/dresses?facets=true&limit=1").get_json()
+    plain = client.get("/api/dresses?limit=1").get_json()
+
+    assert data["facets"] == _expected(session, None)
+    assert "facets" not in plain
+
+
+# Duplicate array tokens count once per dress; values are ordered by count, then name.
+def test_facet_counter_dedupes_and_orders():
+    rows = [
+        {"tags": ["lace", "lace", "boho"], "color": ["ivory"]},
+        {"tags": ["boho"], "color": ["white"]},
+        {"tags": [], "color": []},
+    ]
+    counter = FacetCounter(encode_tokens(rows, {"tags": "array", "color": "scalar"}))
+
+    assert counter.counts() == {"tags": {"boho": 2, "lace": 1}, "color": {"ivory": 1, "white": 1}}
+    assert counter.counts(np.array([1, 2])) == {"tags": {"boho": 1}, "color": {"white": 1}}
+    assert counter.counts(np.array([2])) == {"tags": {}, "color": {}}
+    assert list(SECTION_TYPES) == list(SECTION_META)
@@ -0,0 +1,102 @@
+import numpy as np
+import pytest
+
+import app as app_module
+from filter_index import FilterIndex
+from support import encode_tokens
+
+SECTION_TYPES = {"color": "scalar", "tags": "array", "has_pockets": "boolean"}
+
+
+def _synthetic_catalog(size: int):
+    rng = np.random.default_rng(11)
+    colors = ["ivory", "white", "blush", "black"]
+    tags = ["lace", "boho", "modern", "classic"] + [f"rare-{index}" for index in range(40)]
+    token_rows = []
+    for _ in range(size):
+        row_tags = list(rng.choice(tags, size=int(rng.integers(0, 4))))
+        token_rows.append(
+            {
+                "color": [colors[int(rng.integers(0, len(colors)))]] if rng.random() > 0.1 else [],
+                "tags": row_tags,
+                "has_pockets": ["true" if rng.random() > 0.5 else "false"],
+            }
+        )
+    prices = rng.choice([np.nan, 450.0, 500.0, 999.0, 1000.0, 1500.0, 2600.0], size)
+    return token_rows, prices
+
+
+# Bitset/array unions must agree with a brute-force OR over every dress.
+def test_index_candidates_match_brute_force():
+    token_rows, prices = _synthetic_catalog(500)
+    index = FilterIndex(encode_tokens(token_rows, SECTION_TYPES), prices)
+
+    terms = {"color": ["black"], "tags": ["rare-3", "classic", "missing"], "has_pockets": ["true"]}
+    price_ranges = [(500.0, 1000.0), (2000.0, None)]
+
+    expected = [
+        position
+        for position, tokens in enumerate(token_rows)
+        if "black" in tokens["color"]
+        or {"rare-3", "classic"} & set(tokens["tags"])
+        or tokens["has_pockets"] == ["true"]
+        or (500.0 <= prices[position] <= 1000.0)
+        or prices[position] >= 2000.0
+    ]
+    assert index.candidates(terms, price_ranges).tolist() == expected
+    assert index.candidates({}, []) is None
+    assert index.candidates({"tags": ["rare-7"]}, []).tolist() == [
+        position for position, tokens in enumerate(token_rows) if "rare-7" in tokens["tags"]
+    ]
+
+
+# Array filters match whole normalized values, never substrings of the stored blob.
+def test_array_filters_match_whole_values(client, session):
+    data = client.post("/api/dresses", json={"filters": {"tags": ["Lace"]}}).get_json()
+    expected = {
+        dress.id
+        for dress in session.query(app_module.WeddingDress).all()
+        if "lace" in [tag.lower() for tag in dress.tags or []]
+    }
+    assert {item["id"] for item in data["items"]} == expected
+
+    partial = client.post("/api/dresses", json={"filters": {"tags": ["lac"]}}).get_json()
+    assert partial["total_count"] == 0
+
+
+# The legacy GET path filters through the same index.
+def test_legacy_get_uses_index(client, monkeypatch):
+    monkeypatch.setattr(app_module, "ENABLE_DYNAMIC_SCORING", False)
+    response = client.get("/api/dresses?color=Ivory&features=pockets")
+    assert response.status_code == 200
+
+    items = response.get_json()
+    assert items
+    assert all(item["color"] == "Ivory" or "pockets" in item["features"] for item in items)
+
+
+# A false filter matches stored False only, like SQL's IS false, after deltas and reloads alike.
+@pytest.mark.parametrize("backend", ["memory", "sql"])
+def test_false_filter_skips_null_booleans(client, session, monkeypatch, backend):
+    monkeypatch.setattr(app_module, "SCORING_BACKEND", backend)
+    WeddingDress = app_module.WeddingDress
+    dresses = session.query(WeddingDress).order_by(WeddingDress.id).all()
+    originals = [dress.has_pockets for dress in dresses[:2]]
+    try:
+        dresses[0].has_pockets = None
+        dresses[1].has_pockets = False
+        session.commit()
+        expected = {dress.id for dress in dresses if dress.has_pockets is False}
+        body = {"filters": {"has_pockets": [False]}, "page": {"limit": 48}}
+        via_delta = {item["id"] for item in client.post("/api/dresses", json=body).get_json()["items"]}
+        app_module.CATALOG.reload()
+        via_reload = {item["id"] for item in client.post("/api/dresses", json=body).get_json()["items"]}
+    finally:
+        for dress, original in zip(dresses, originals):
+            dress.has_pockets = original
+        session.commit()
+        app_module.CATALOG.reload()
+
+    assert dresses[0].id not in expected and dresses[1].id in expected
+    assert via_delta == expected
+    assert via_reload == expected
@@ -0,0 +1,88 @@
+import copy
+
+import pytest
+
+import app as app_module
+from app import CATALOG, WeddingDress
+
+QUERY = "/api/dresses?color=Ivory&color=White&limit=3"
+
+
+def _fail(*args, **kwargs):
+    raise AssertionError("ranking ran for a 304")
+
+
+# Repeat GETs revalidate with If-None-Match and get a 304 without any scoring.
+@pytest.mark.parametrize("dynamic", [True, False])
+def test_conditional_get_returns_304(client, monkeypatch, dynamic):
+    monkeypatch.setattr(app_module, "ENABLE_DYNAMIC_SCORING", dynamic)
+    first = client.get(QUERY)
+    etag = first.headers["ETag"]
+
+    assert first.status_code == 200
+    assert first.headers["Cache-Control"].startswith("public, max-age=")
+
+    monkeypatch.setattr(app_module, "_rank_in_memory", _fail)
+    monkeypatch.setattr(app_module, "_legacy_get_dresses", _fail)
+    repeat = client.get(QUERY, headers={"If-None-Match": etag})
+    assert repeat.status_code == 304
+    assert repeat.get_data() == b""
+    assert repeat.headers["ETag"] == etag
+
+
+# The tag tracks the canonical query and the catalog contents, not reloads.
+def test_etag_changes_with_query_and_catalog(client, session):
+    etag = client.get(QUERY).headers["ETag"]
+
+    assert client.get("/api/dresses?color=White&color=Ivory&limit=3").headers["ETag"] == etag
+    assert client.get("/api/dresses?color=Ivory&limit=3").headers["ETag"] != etag
+
+    CATALOG.reload()
+    assert client.get(QUERY, headers={"If-None-Match": etag}).status_code == 304
+
+    dress = session.query(WeddingDress).order_by(WeddingDress.id).first()
+    original = dress.price
+    try:
+        dress.price = (original or 0) + 1
+        session.commit()
+        refreshed = client.get(QUERY, headers={"If-None-Match": etag})
+    finally:
+        dress.price = original
+        session.commit()
+        CATALOG.reload()
+    assert refreshed.status_code == 200
+    assert refreshed.headers["ETag"] != etag
+
+
+# Workers whose reload counters agree but whose catalogs differ never share a tag.
+def test_etag_ignores_process_local_version(client, monkeypatch):
+    snapshot = CATALOG.reload()
+    etag = client.get(QUERY).headers["ETag"]
+    other = copy.copy(snapshot)
+    other.fingerprint = tuple(snapshot.fingerprint) + ("elsewhere",)
+    monkeypatch.setattr(CATALOG, "get", lambda: other)
+
+    assert other.version == snapshot.version
+    assert client.get(QUERY, headers={"If-None-Match": etag}).headers["ETag"] != etag
+
+
+# Compressed bodies get their own strong tag, which still revalidates.
+def test_compressed_etag_revalidates(client):
+    headers = {"Accept-Encoding": "gzip"}
+    packed = client.get("/api/dresses?limit=48", headers=headers)
+    etag = packed.headers["ETag"]
+
+    assert packed.headers["Content-Encoding"] == "gzip"
+    assert etag.endswith('-gzip"')
+    revalidated = client.get("/api/dresses?limit=48", headers=dict(headers, **{"If-None-Match": etag}))
+    assert revalidated.status_code == 304
+    assert revalidated.headers["ETag"] == etag
+
+
+# POSTs and debug GETs are never tagged as cacheable.
+def test_post_and_debug_are_not_cacheable(client):
+    posted = client.post("/api/dresses", json={"page": {"limit": 3}})
+    traced = client.get("/api/dresses?debug=true&limit=3")
+
+    assert "ETag" not in posted.headers and "Cache-Control" not in posted.headers
+    assert "ETag" not in traced.headers
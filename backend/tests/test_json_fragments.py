@@ -0,0 +1,67 @@
+import json
+
+import app as app_module
+from app import CATALOG
+from json_fragments import FragmentCache
+from support import PARITY_PAYLOADS
+
+GRID_FIELDS = ["id", "name", "image_path", "price", "score"]
+
+
+# Items spliced from cached fragments equal the per-dress scored dicts of the debug path.
+def test_fragment_items_match_scored_items(client):
+    for payload in PARITY_PAYLOADS:
+        plain = client.post("/api/dresses", json=dict(payload, page={"limit": 48})).get_json()
+        traced = client.post("/api/dresses", json=dict(payload, page={"limit": 48}, debug=True)).get_json()
+
+        for item in traced["items"]:
+            item.pop("_debug", None)
+        assert plain["items"] == traced["items"]
+        assert plain["pageInfo"] == traced["pageInfo"]
+
+
+# A sparse fieldset trims every item to the requested keys, from the body or the query string.
+def test_fields_projection(client):
+    full = client.post("/api/dresses", json=dict(PARITY_PAYLOADS[0])).get_data()
+    grid = client.post("/api/dresses", json=dict(PARITY_PAYLOADS[0], fields=GRID_FIELDS))
+    queried = client.get("/api/dresses?fields=id,name,bogus&limit=3").get_json()
+
+    assert all(set(item) == set(GRID_FIELDS) for item in grid.get_json()["items"])
+    assert len(grid.get_data()) < len(full) / 2
+    assert all(set(item) == {"id", "name"} for item in queried["items"])
+    assert len(queried["items"]) == 3
+
+
+# A score-only projection caches empty fragments, and repeats are served from them.
+def test_repeated_score_only_projection(client):
+    body = dict(PARITY_PAYLOADS[0], fields=["score"], page={"limit": 5})
+    first = client.post("/api/dresses", json=body)
+    repeat = client.post("/api/dresses", json=body)
+
+    assert first.status_code == repeat.status_code == 200
+    assert repeat.get_json()["items"] == first.get_json()["items"]
+    assert all(set(item) == {"score"} for item in first.get_json()["items"])
+
+
+# The legacy GET path serves the same projection from fragments.
+def test_legacy_path_uses_fragments(client, monkeypatch):
+    monkeypatch.setattr(app_module, "ENABLE_DYNAMIC_SCORING", False)
+    items = client.get("/api/dresses?color=Ivory&fields=id,color").get_json()
+
+    assert items and all(set(item) == {"id", "color"} and item["color"] == "Ivory" for item in items)
+
+
+# Fragments are encoded once per record and projection, then reused.
+def test_fragment_cache_reuses_encodings():
+    records = [{"id": 1, "name": "Ünïcode", "price": None}, {"id": 2, "name": "B", "price": 10.0}]
+    cache = FragmentCache(records, max_projections=2)
+
+    rendered = cache.render([1, 0], ("name", "score"), [2.5, 1.0])
+    assert json.loads(rendered) == [{"name": "B", "score": 2.5}, {"name": "Ünïcode", "score": 1.0}]
+    assert cache.fragments([1], ("name",))[0] is cache.fragments([1], ("name", "score"))[0]
+    assert json.loads(cache.render([0], ("score",), [3.0])) == [{"score": 3.0}]
+
+    cache.render([0], ("id",))
+    cache.render([0], None)
+    assert cache.projection_count == 2
+    assert CATALOG.get().fragments is CATALOG.get().fragments
@@ -0,0 +1,48 @@
+import sqlalchemy as sa
+
+import app as app_module
+from app import SCHEMA_VERSION, CatalogChange, SchemaState, WeddingDress, _analysis_due, analyze_catalog, db, ensure_indexes
+
+
+def _statements(run):
+    seen = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        seen.append(statement)
+
+    sa.event.listen(db.engine, "before_cursor_execute", record)
+    try:
+        result = run()
+    finally:
+        sa.event.remove(db.engine, "before_cursor_execute", record)
+    return result, seen
+
+
+# A database already at SCHEMA_VERSION costs one lookup at startup: no DDL, no ANALYZE.
+def test_startup_skips_current_schema(app):
+    ensure_indexes(force=True)
+    ran, statements = _statements(ensure_indexes)
+    assert ran is False
+    assert not [statement for statement in statements if "CREATE" in statement or "ANALYZE" in statement]
+    stored = db.session.query(SchemaState.value).filter(SchemaState.key == "schema_version").scalar()
+    assert stored == SCHEMA_VERSION
+
+
+# The maintenance pass records the analyzed row count, which the drift check compares against,
+# and prunes the change log to its retention.
+def test_analyze_records_row_count(app, monkeypatch):
+    monkeypatch.setattr(app_module, "CATALOG_CHANGE_LOG_RETENTION", 0)
+    stats = analyze_catalog()
+    rows = db.session.query(sa.func.count(WeddingDress.id)).scalar()
+    assert stats["rows"] == rows
+    analyzed = db.session.query(SchemaState.value).filter(SchemaState.key == "analyzed_rows").scalar()
+    assert analyzed == str(rows)
+    assert db.session.query(CatalogChange.seq).count() == 0
+
+
+# ANALYZE is due once the row count drifts past ANALYZE_DRIFT, or when it never ran.
+def test_analysis_due_on_row_count_drift():
+    assert _analysis_due(10, None)
+    assert not _analysis_due(1100, "1000")
+    assert _analysis_due(1300, "1000")
+    assert _analysis_due(700, "1000")
@@ -0,0 +1,66 @@
+import random
+
+from app import LATENCY_TRACKER
+from metrics import LogHistogram, StageMetrics, StageTimer, prometheus_text
+
+
+# Streaming quantiles stay within one bucket (~9%) of the exact sorted value.
+def test_histogram_quantiles_track_exact_values():
+    rng = random.Random(7)
+    samples = [rng.lognormvariate(1.0, 1.2) for _ in range(20000)]
+    histogram = LogHistogram()
+    for value in samples:
+        histogram.record(value)
+
+    ordered = sorted(samples)
+    for q in (0.5, 0.95, 0.99):
+        exact = ordered[int(q * len(ordered)) - 1]
+        assert abs(histogram.quantile(q) - exact) / exact < 0.1
+    assert histogram.count == len(samples)
+    assert LogHistogram().quantile(0.5) is None
+
+
+# Repeated stages accumulate and finish() adds the wall-clock total.
+def test_stage_timer_accumulates():
+    timer = StageTimer()
+    timer.add("fetch", 1.5)
+    timer.add("fetch", 2.0)
+    durations = timer.finish()
+
+    assert durations["fetch"] == 3.5
+    assert durations["total"] >= 0
+
+    metrics = StageMetrics(stages=("fetch",))
+    metrics.record_request(durations)
+    assert metrics.snapshot()["fetch"]["count"] == 1
+    assert metrics.quantile("total", 0.5) is not None
+
+
+# Summaries and counters render in the Prometheus text exposition format.
+def test_prometheus_text_format():
+    body = prometheus_text(
+        {"score": {"count": 2.0, "sum_ms": 3.0, "p50_ms": 1.0, "p95_ms": 2.0, "p99_ms": 2.0}},
+        {"hits_total": ("Hits.", 4), "entries": ("Entries.", 1)},
+        metric_name="latency_ms",
+    )
+    lines = body.splitlines()
+
+    assert "# TYPE latency_ms summary" in lines
+    assert 'latency_ms{stage="score",quantile="0.95"} 2.0' in lines
+    assert 'latency_ms_count{stage="score"} 2' in lines
+    assert "# TYPE hits_total counter" in lines
+    assert "# TYPE entries gauge" in lines
+
+
+# Every /api/dresses request feeds the per-stage histograms exposed at /api/metrics.
+def test_metrics_endpoint_reports_request_stages(client):
+    before = LATENCY_TRACKER.snapshot()["total"]["count"]
+    data = client.post("/api/dresses", json={"debug": True, "page": {"limit": 2}}).get_json()
+    response = client.get("/api/metrics")
+    body = response.get_data(as_text=True)
+
+    assert response.mimetype == "text/plain"
+    assert LATENCY_TRACKER.snapshot()["total"]["count"] == before + 1
+    assert {"parse", "weights", "fetch", "sort", "serialize"} <= set(data["debug"]["timings_ms"])
+    assert 'best_dressed_request_stage_latency_ms_count{stage="score"}' in body
+    assert "best_dressed_result_cache_hits_total" in body
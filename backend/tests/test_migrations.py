@@ -0,0 +1,66 @@
+import pickle
+
+import pytest
+import sqlalchemy as sa
+from sqlalchemy import or_
+
+from app import DressValue, WeddingDress, _build_filter_conditions
+from migrations import upgrade_array_storage
+
+pytestmark = pytest.mark.sqlite_only
+
+
+def _values_for(session, dress_id):
+    rows = session.query(DressValue.section, DressValue.value).filter(DressValue.dress_id == dress_id).all()
+    return sorted(rows)
+
+
+# A legacy PickleType table is rebuilt in place with JSON arrays and a populated side table.
+def test_upgrade_converts_pickled_arrays(tmp_path):
+    engine = sa.create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    with engine.begin() as connection:
+        connection.execute(
+            sa.text(
+                "CREATE TABLE wedding_dresses (id INTEGER PRIMARY KEY, name VARCHAR(100) NOT NULL, price FLOAT, "
+                "tags BLOB, weddingvenue BLOB, embellishments BLOB, features BLOB, has_pockets BOOLEAN)"
+            )
+        )
+        connection.execute(
+            sa.text(
+                "INSERT INTO wedding_dresses (id, name, price, tags, weddingvenue, embellishments, features, has_pockets) "
+                "VALUES (7, 'Legacy', 1200, :tags, :venue, NULL, :features, 1)"
+            ),
+            {"tags": pickle.dumps(["Boho", " Lace "]), "venue": pickle.dumps(["garden"]), "features": pickle.dumps([])},
+        )
+
+    with engine.begin() as connection:
+        stats = upgrade_array_storage(connection, WeddingDress.__table__, DressValue.__table__)
+    with engine.begin() as connection:
+        again = upgrade_array_storage(connection, WeddingDress.__table__, DressValue.__table__)
+
+    assert stats == {"converted_rows": 1, "values": 3}
+    assert again == {"converted_rows": 0, "values": 3}
+    with engine.connect() as connection:
+        row = connection.execute(sa.select(WeddingDress.__table__).where(WeddingDress.__table__.c.id == 7)).one()
+        assert row.tags == ["Boho", " Lace "]
+        assert row.has_pockets is True
+        values = connection.execute(sa.text("SELECT section, value FROM dress_values ORDER BY section, value")).all()
+        assert [tuple(value) for value in values] == [("tags", "boho"), ("tags", "lace"), ("weddingvenue", "garden")]
+
+
+# Triggers keep dress_values in sync with inserts and array updates from any writer.
+def test_triggers_maintain_dress_values(session):
+    try:
+        dress = WeddingDress(name="Trigger Dress", tags=["Modern", "sleek"], features=["pockets"])
+        session.add(dress)
+        session.flush()
+        assert _values_for(session, dress.id) == [("features", "pockets"), ("tags", "modern"), ("tags", "sleek")]
+
+        dress.tags = ["Vintage"]
+        session.flush()
+        assert _values_for(session, dress.id) == [("features", "pockets"), ("tags", "vintage")]
+
+        matches = session.query(WeddingDress.id).filter(or_(*_build_filter_conditions({"tags": ["VINTAGE"]}))).all()
+        assert dress.id in {row.id for row in matches}
+    finally:
+        session.rollback()
@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+import app as app_module
+from app import RECORD_FIELDS, RESULT_CACHE, SECTION_TYPES, _scoring_plan
+from catalog import CatalogSnapshot
+from parallel_scoring import ParallelScorer
+from scoring_engine import RankedResult, round_scores
+from support import PARITY_PAYLOADS, row_tokens
+from synthetic_catalog import synthetic_rows
+
+
+@pytest.fixture(scope="module")
+def scorer():
+    scorer = ParallelScorer(workers=3, min_size=0)
+    yield scorer
+    scorer.close()
+
+
+@pytest.fixture(scope="module")
+def snapshot():
+    rows = [dict(row, id=index + 1) for index, row in enumerate(synthetic_rows(3000, seed=7))]
+    tokens = [row_tokens(row) for row in rows]
+    return CatalogSnapshot(1, (len(rows), len(rows)), rows, tokens, SECTION_TYPES, RECORD_FIELDS)
+
+
+# Shard scores and the merged per-shard top-k match the serial ranking exactly, deeper pages included.
+@pytest.mark.parametrize("payload", PARITY_PAYLOADS)
+def test_sharded_ranking_matches_serial(scorer, snapshot, payload):
+    plan = _scoring_plan(payload)
+    candidates = np.flatnonzero(snapshot.encoded.sections["color"].codes % 3 != 0)
+    ranked = scorer.rank(snapshot, candidates, plan, k=25)
+
+    serial_scores = round_scores(plan.score(snapshot.encoded)[candidates])
+    serial = RankedResult(
+        candidates, serial_scores, snapshot.prices[candidates], snapshot.name_ranks[candidates], snapshot.ids[candidates]
+    )
+    assert np.array_equal(ranked.scores, serial_scores)
+    assert ranked.ranked_depth == 25
+    assert np.array_equal(ranked.top(25), serial.top(25))
+    assert np.array_equal(ranked.page(200, 50), serial.page(200, 50))
+
+
+# The API serves identical pages whether the pool or the serial scorer ranks.
+def test_api_uses_pool_above_threshold(client, scorer, monkeypatch):
+    payload = dict(PARITY_PAYLOADS[0], page={"limit": 4, "offset": 2})
+    RESULT_CACHE.clear()
+    serial = client.post("/api/dresses", json=payload).get_json()
+
+    monkeypatch.setattr(app_module, "SCORING_POOL", scorer)
+    before = scorer.requests
+    RESULT_CACHE.clear()
+    pooled = client.post("/api/dresses", json=payload).get_json()
+    RESULT_CACHE.clear()
+
+    assert scorer.requests == before + 1
+    assert pooled["items"] == serial["items"]
+    assert pooled["pageInfo"] == serial["pageInfo"]
@@ -0,0 +1,126 @@
+import threading
+import time
+
+import pytest
+
+import app as app_module
+from app import RANKING_FLIGHTS, RESULT_CACHE
+from single_flight import SingleFlight
+
+PAYLOAD = {
+    "filters": {"color": ["Ivory", "White", "Blush"]},
+    "priority": {"sections": ["fabric", "tags"], "values": {"fabric": ["Lace"], "tags": ["romantic"]}},
+}
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.001)
+
+
+def _run_threads(count, target):
+    threads = [threading.Thread(target=target, args=(index,)) for index in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads
+
+
+# Callers arriving while a flight is up share its value; the next caller starts a new flight.
+def test_concurrent_callers_share_one_computation():
+    flights: SingleFlight[object] = SingleFlight()
+    release = threading.Event()
+    calls = []
+    results = {}
+
+    def compute():
+        calls.append(1)
+        release.wait(5)
+        return object()
+
+    threads = _run_threads(5, lambda index: results.__setitem__(index, flights.run("key", compute)))
+    _wait_for(lambda: flights.stats()["coalesced"] == 4)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    values = {id(value) for value, _ in results.values()}
+    assert len(calls) == 1 and len(values) == 1
+    assert sorted(shared for _, shared in results.values()) == [False, True, True, True, True]
+    assert flights.stats() == {"in_flight": 0, "leaders": 1, "coalesced": 4, "wait_timeouts": 0}
+    assert flights.run("key", object)[1] is False
+
+
+# Followers re-raise the leader's error; a stuck leader only delays followers up to wait_seconds.
+@pytest.mark.parametrize("wait_seconds", [None, 0.05])
+def test_errors_propagate_and_waits_time_out(wait_seconds):
+    flights: SingleFlight[int] = SingleFlight(wait_seconds=wait_seconds)
+    release = threading.Event()
+    errors = []
+
+    def failing():
+        release.wait(5)
+        raise ValueError("boom")
+
+    def call(index):
+        try:
+            flights.run("bad", failing if index == 0 else lambda: 7)
+        except ValueError as error:
+            errors.append(error)
+
+    leader = _run_threads(1, call)
+    _wait_for(lambda: flights.stats()["in_flight"] == 1)
+    follower = _run_threads(2, lambda index: index and call(index))[1]
+    if wait_seconds is not None:
+        follower.join(5)
+    _wait_for(lambda: flights.stats()["coalesced"] == 1)
+    release.set()
+    for thread in leader + [follower]:
+        thread.join(5)
+
+    assert flights.stats()["in_flight"] == 0
+    if wait_seconds is None:
+        assert len(errors) == 2 and errors[0] is errors[1]
+    else:
+        assert len(errors) == 1 and flights.stats()["wait_timeouts"] == 1
+
+
+# Identical concurrent API requests rank once and still get their own pages.
+def test_api_coalesces_identical_requests(app, monkeypatch):
+    RESULT_CACHE.clear()
+    serial = {
+        offset: app.test_client().post("/api/dresses", json=dict(PAYLOAD, page={"limit": 3, "offset": offset})).get_json()
+        for offset in (0, 3)
+    }
+    RESULT_CACHE.clear()
+    before = RANKING_FLIGHTS.stats()
+    rank_candidates = app_module._rank_candidates
+    release = threading.Event()
+
+    def blocking_rank(*args, **kwargs):
+        release.wait(5)
+        return rank_candidates(*args, **kwargs)
+
+    monkeypatch.setattr(app_module, "_rank_candidates", blocking_rank)
+    pages = [0, 3, 0, 3]
+    responses = {}
+
+    def request(index):
+        body = dict(PAYLOAD, page={"limit": 3, "offset": pages[index]})
+        responses[index] = app.test_client().post("/api/dresses", json=body).get_json()
+
+    threads = _run_threads(len(pages), request)
+    _wait_for(lambda: RANKING_FLIGHTS.stats()["coalesced"] == before["coalesced"] + len(pages) - 1)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+    RESULT_CACHE.clear()
+
+    after = RANKING_FLIGHTS.stats()
+    assert after["leaders"] == before["leaders"] + 1
+    for index, page in enumerate(pages):
+        assert responses[index]["items"] == serial[page]["items"]
+        assert responses[index]["pageInfo"] == serial[page]["pageInfo"]
+    metrics = app.test_client().get("/api/metrics").get_data(as_text=True)
+    assert f"best_dressed_coalesced_requests_total {float(after['coalesced'])!r}" in metrics
@@ -0,0 +1,100 @@
+import numpy as np
+
+from app import RESULT_CACHE
+from result_cache import ResultCache, canonical_key
+from scoring_engine import RankedResult, rank_indices
+
+PAYLOAD = {
+    "filters": {"color": ["Ivory", "White", "Blush"]},
+    "priority": {"sections": ["fabric", "tags"], "values": {"fabric": ["Lace"], "tags": ["romantic"]}},
+}
+
+
+# LRU order, TTL expiry and catalog-version invalidation all drop entries.
+def test_cache_evicts_expires_and_invalidates(monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr("result_cache.time.monotonic", lambda: clock[0])
+    cache: ResultCache[str] = ResultCache(max_entries=2, ttl_seconds=10)
+
+    cache.put("a", "A", version=1)
+    cache.put("b", "B", version=1)
+    assert cache.get("a", version=1) == "A"
+    cache.put("c", "C", version=1)
+    assert cache.get("b", version=1) is None
+    assert cache.stats()["evictions"] == 1
+
+    clock[0] += 11
+    assert cache.get("a", version=1) is None
+    assert cache.stats()["expirations"] == 1
+
+    cache.put("d", "D", version=1)
+    assert cache.get("d", version=2) is None
+    assert cache.stats()["invalidations"] >= 1
+
+
+# The byte budget evicts least recently used rankings by nbytes, and skips oversized ones.
+def test_cache_evicts_by_bytes():
+    def ranked(size):
+        values = np.arange(size, dtype=np.float64)
+        return RankedResult(np.arange(size), values, values, np.arange(size), np.arange(size))
+
+    assert ranked(100).nbytes == 100 * 6 * 8
+    cache: ResultCache[RankedResult] = ResultCache(max_entries=10, max_bytes=ranked(100).nbytes * 2)
+    cache.put("a", ranked(100), version=1)
+    cache.put("b", ranked(100), version=1)
+    assert cache.get("a", version=1) is not None
+    cache.put("c", ranked(100), version=1)
+    assert cache.get("b", version=1) is None
+    assert cache.stats()["bytes"] == ranked(100).nbytes * 2
+    cache.put("huge", ranked(1000), version=1)
+    assert cache.get("huge", version=1) is None
+    assert cache.stats()["entries"] == 2 and cache.stats()["evictions"] == 1
+
+
+# A late put or get from an older catalog version leaves the newer generation alone.
+def test_stale_versions_do_not_invalidate():
+    cache: ResultCache[str] = ResultCache(max_entries=4)
+    cache.put("a", "A2", version=2)
+    cache.put("a", "A1", version=1)
+    assert cache.get("a", version=1) is None
+    assert cache.get("a", version=2) == "A2"
+    assert cache.stats()["stale_puts"] == 1 and cache.stats()["invalidations"] == 0
+
+
+# Deep pages served from a cached ranking match the full sort.
+def test_ranked_result_pages_match_full_sort():
+    rng = np.random.default_rng(3)
+    size = 300
+    scores = rng.integers(0, 5, size).astype(np.float64)
+    prices = rng.choice([100.0, 200.0], size)
+    name_ranks = rng.integers(0, 10, size)
+    ids = np.arange(size)
+    ranked = RankedResult(np.arange(size), scores, prices, name_ranks, ids)
+
+    expected = rank_indices(scores, prices, name_ranks, ids)
+    assert ranked.page(0, 10).tolist() == expected[:10].tolist()
+    assert ranked.page(120, 40).tolist() == expected[120:160].tolist()
+    assert ranked.page(290, 48).tolist() == expected[290:].tolist()
+    assert ranked.ranked_depth >= 160
+
+
+# Repeat payloads (any page, any filter order) are answered from the cache.
+def test_api_repeat_requests_hit_cache(client):
+    RESULT_CACHE.clear()
+    before = RESULT_CACHE.stats()
+
+    first = client.post("/api/dresses", json=dict(PAYLOAD, page={"limit": 2})).get_json()
+    reordered = dict(PAYLOAD, filters={"color": ["Blush", "Ivory", "White"]}, page={"limit": 2, "offset": 2})
+    second = client.post("/api/dresses", json=reordered).get_json()
+
+    after = client.get("/api/cache/stats").get_json()["results"]
+    assert after["misses"] == before["misses"] + 1
+    assert after["hits"] == before["hits"] + 1
+    assert second["total_count"] == first["total_count"]
+    assert not {item["id"] for item in first["items"]} & {item["id"] for item in second["items"]}
+
+
+# Canonical keys ignore dict ordering but not values.
+def test_canonical_key_is_order_independent():
+    assert canonical_key({"a": 1, "b": [1, 2]}) == canonical_key({"b": [1, 2], "a": 1})
+    assert canonical_key({"a": 1}) != canonical_key({"a": 2})
@@ -0,0 +1,113 @@
+import numpy as np
+import pytest
+
+from app import CATALOG, WeddingDress, _resolve_priority_weights, _score_dress, _scoring_plan
+from scoring_engine import GATHER, PRESENCE, SPARSE_SUM, ScoringPlan, rank_indices, round_scores, top_k_indices
+from support import PARITY_PAYLOADS
+
+# Ensures the vectorized engine reproduces _score_dress for every dress and payload shape.
+@pytest.mark.parametrize("payload", PARITY_PAYLOADS)
+def test_vectorized_scores_match_per_dress_scoring(session, payload):
+    weights, _ = _resolve_priority_weights(payload)
+    dresses = session.query(WeddingDress).order_by(WeddingDress.id).all()
+
+    scores = ScoringPlan(weights).score(CATALOG.reload().encoded)
+
+    for dress, score in zip(dresses, round_scores(scores).tolist()):
+        assert score == _score_dress(dress, weights)["score"]
+
+
+# Equal payloads share one cached plan, compiled once per encoded catalog with types pre-dispatched.
+def test_scoring_plans_are_cached_and_compiled_once(session):
+    payload = PARITY_PAYLOADS[2]
+    plan = _scoring_plan(payload)
+    assert _scoring_plan({"weights": dict(reversed(list(payload["weights"].items())))}) is not plan
+    assert _scoring_plan({"weights": dict(payload["weights"])}) is plan
+
+    encoded = CATALOG.reload().encoded
+    steps = plan.steps(encoded)
+    assert plan.steps(encoded) is steps
+    # corset_back has section weight 0 but value weights, so it still scores.
+    assert [step[0] for step in steps] == [SPARSE_SUM, PRESENCE, GATHER, GATHER]
+    assert np.array_equal(plan.score(encoded), ScoringPlan(plan.weights).score(encoded))
+
+    reencoded = CATALOG.reload().encoded
+    assert plan.steps(reencoded) is not steps
+
+
+# Confirms the API ranking matches the original full sort on (-score, price, name).
+def test_api_order_matches_reference_sort(client, session):
+    payload = dict(PARITY_PAYLOADS[0], page={"limit": 48})
+    weights, _ = _resolve_priority_weights(payload)
+    reference = [_score_dress(dress, weights) for dress in session.query(WeddingDress).order_by(WeddingDress.id)]
+    reference.sort(key=lambda item: (-item["score"], item.get("price") or 0, item.get("name") or "", item["id"]))
+
+    response = client.post("/api/dresses", json=payload)
+    assert response.status_code == 200
+    data = response.get_json()
+
+    assert [item["id"] for item in data["items"]] == [item["id"] for item in reference]
+    assert data["total_count"] == len(reference)
+
+
+# Scores round exactly like Python's round(score, 6), including values np.round gets wrong.
+def test_round_scores_matches_python_round():
+    rng = np.random.default_rng(11)
+    exponents = rng.integers(0, 6, (20000, 2))
+    scores = np.concatenate(
+        [
+            (5.0 ** exponents[:, 0] * 0.65 ** exponents[:, 1]) * rng.choice([-1.0, 1.0], 20000),
+            (np.arange(-2000, 2000) + 0.5) / 1e6,
+            [2.5000005, 16949.9536625, -5e-07, 0.0, 1e300, np.inf],
+        ]
+    )
+    expected = [round(score, 6) for score in scores.tolist()]
+    assert np.array_equal(round_scores(scores), expected)
+    assert np.signbit(round_scores(scores)).tolist() == np.signbit(expected).tolist()
+
+
+# Plain and debug API responses report the same score as _score_dress, in its order.
+@pytest.mark.parametrize(
+    "payload",
+    PARITY_PAYLOADS + [{"weights": {"color": {"section": 1, "values": {"ivory": 2.5000005, "white": 2.5}}}}],
+)
+def test_api_scores_match_reference_with_and_without_debug(client, session, payload):
+    weights, _ = _resolve_priority_weights(payload)
+    reference = {dress.id: _score_dress(dress, weights)["score"] for dress in session.query(WeddingDress)}
+    body = dict(payload, page={"limit": 48})
+
+    plain = client.post("/api/dresses", json=body).get_json()["items"]
+    traced = client.post("/api/dresses", json=dict(body, debug=True)).get_json()["items"]
+
+    assert {item["id"]: item["score"] for item in plain} == reference
+    assert [(item["id"], item["score"]) for item in traced] == [(item["id"], item["score"]) for item in plain]
+
+
+# Top-k selection must return exactly the head of the full sort, including heavy ties.
+@pytest.mark.parametrize("k", [0, 1, 7, 48, 500, 2000])
+def test_top_k_matches_full_sort(k):
+    rng = np.random.default_rng(7)
+    size = 1000
+    scores = rng.integers(0, 4, size).astype(np.float64)
+    prices = rng.choice([500.0, 1000.0, 1500.0], size)
+    name_ranks = rng.integers(0, 20, size)
+    ids = rng.permutation(size)
+
+    expected = rank_indices(scores, prices, name_ranks, ids)[:k]
+    assert top_k_indices(scores, prices, name_ranks, ids, k).tolist() == expected.tolist()
+
+
+# Walking pages with limit/offset yields the full ranking with exact pageInfo totals.
+def test_paged_results_concatenate_to_full_ranking(client):
+    payload = PARITY_PAYLOADS[0]
+    full = client.post("/api/dresses", json=dict(payload, page={"limit": 48})).get_json()
+
+    collected = []
+    for offset in range(0, full["total_count"], 3):
+        data = client.post("/api/dresses", json=dict(payload, page={"limit": 3, "offset": offset})).get_json()
+        assert data["pageInfo"]["total"] == full["total_count"]
+        assert data["pageInfo"]["hasPrevPage"] == (offset > 0)
+        assert data["pageInfo"]["hasNextPage"] == (offset + data["pageInfo"]["returned"] < full["total_count"])
+        collected.extend(item["id"] for item in data["items"])
+
+    assert collected == [item["id"] for item in full["items"]]
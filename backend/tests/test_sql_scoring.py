@@ -0,0 +1,65 @@
+import pytest
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+import app as app_module
+from app import SQL_SCORER, WeddingDress, _resolve_priority_weights, _score_dress
+from support import PARITY_PAYLOADS
+
+
+def _reference_ranking(session, weights):
+    scored = [_score_dress(dress, weights) for dress in session.query(WeddingDress).all()]
+    scored.sort(key=lambda item: (-item["score"], item.get("price") or 0, item.get("name") or "", item["id"]))
+    return scored
+
+
+# The single SQL statement must rank and score exactly like _score_dress.
+@pytest.mark.parametrize("payload", PARITY_PAYLOADS)
+def test_sql_scores_match_python_scores(session, payload):
+    weights, _ = _resolve_priority_weights(payload)
+    statement = SQL_SCORER.ranked_select(WeddingDress, weights, [], 48, 0, session.get_bind().dialect.name)
+    rows = session.execute(statement).all()
+
+    reference = _reference_ranking(session, weights)
+    assert [row[0].id for row in rows] == [item["id"] for item in reference]
+    assert [row.score for row in rows] == pytest.approx([item["score"] for item in reference])
+    assert rows[0].total_count == len(reference)
+
+
+# The SQL backend serves the API with the same page contents as the in-memory backend.
+def test_sql_backend_serves_api(client, monkeypatch):
+    payload = dict(PARITY_PAYLOADS[1], filters={"color": ["Ivory", "White"]}, page={"limit": 3, "offset": 1})
+    memory = client.post("/api/dresses", json=payload).get_json()
+
+    monkeypatch.setattr(app_module, "SCORING_BACKEND", "sql")
+    pushed_down = client.post("/api/dresses", json=payload).get_json()
+
+    assert [item["id"] for item in pushed_down["items"]] == [item["id"] for item in memory["items"]]
+    for field in ("limit", "offset", "returned", "total", "hasNextPage", "hasPrevPage"):
+        assert pushed_down["pageInfo"][field] == memory["pageInfo"][field]
+
+
+# Both backends match filter values regardless of case and surrounding whitespace.
+@pytest.mark.parametrize("filters", [{"color": "ivory"}, {"color": [" IVORY ", "white"]}, {"tags": ["Lace"]}])
+def test_filter_parity_across_backends(client, monkeypatch, filters):
+    payload = {"filters": filters, "page": {"limit": 48}}
+    memory = client.post("/api/dresses", json=payload).get_json()
+    monkeypatch.setattr(app_module, "SCORING_BACKEND", "sql")
+    pushed_down = client.post("/api/dresses", json=payload).get_json()
+
+    assert memory["total_count"] > 0
+    assert [item["id"] for item in pushed_down["items"]] == [item["id"] for item in memory["items"]]
+    assert pushed_down["total_count"] == memory["total_count"]
+
+
+# On PostgreSQL array sections unnest the native text[] columns instead of joining dress_values.
+def test_postgres_compilation_uses_unnest():
+    weights, _ = _resolve_priority_weights(PARITY_PAYLOADS[0])
+    statement = SQL_SCORER.ranked_select(WeddingDress.__table__, weights, [], 24, 0, "postgresql")
+    sql = str(statement.compile(dialect=postgresql.dialect()))
+
+    assert f"unnest({WeddingDress.__table__.fullname}.tags)" in sql
+    assert "dress_values" not in sql
+    assert "round(CAST(" in sql
+    assert "LIMIT" in sql and "OFFSET" in sql
+    assert isinstance(statement, sa.Select)
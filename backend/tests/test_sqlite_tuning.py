@@ -0,0 +1,88 @@
+import threading
+
+import pytest
+import sqlalchemy as sa
+
+from app import READ_ENGINE, db
+from sqlite_tuning import DEFAULT_PROFILE, apply_pragmas, create_read_engine, pragma_statements, sqlite_file_path
+
+
+def _pragma(connection, name):
+    return connection.exec_driver_sql(f"PRAGMA {name}").scalar()
+
+
+# Only file-backed SQLite URIs get the tuning profile.
+def test_sqlite_file_path_detection():
+    assert sqlite_file_path("sqlite:////tmp/dresses.db") == "/tmp/dresses.db"
+    assert sqlite_file_path("sqlite://") is None
+    assert sqlite_file_path("sqlite:///:memory:") is None
+    assert sqlite_file_path("postgresql://user@localhost/dresses") is None
+
+
+# Writer connections come up in WAL with the configured cache, mmap and temp store.
+def test_writer_connections_apply_profile(tmp_path):
+    engine = sa.create_engine(f"sqlite:///{tmp_path / 'tuned.db'}")
+    apply_pragmas(engine, pragma_statements(DEFAULT_PROFILE))
+    with engine.connect() as connection:
+        assert _pragma(connection, "journal_mode") == "wal"
+        assert _pragma(connection, "synchronous") == 1  # NORMAL
+        assert _pragma(connection, "cache_size") == -DEFAULT_PROFILE["cache_size_kb"]
+        assert _pragma(connection, "temp_store") == 2  # MEMORY
+        assert _pragma(connection, "busy_timeout") == DEFAULT_PROFILE["busy_timeout_ms"]
+    engine.dispose()
+
+
+# An empty journal mode leaves the file's own mode alone (the checked-in demo database).
+def test_empty_journal_mode_keeps_file_mode(tmp_path):
+    engine = sa.create_engine(f"sqlite:///{tmp_path / 'demo.db'}")
+    apply_pragmas(engine, pragma_statements(dict(DEFAULT_PROFILE, journal_mode="")))
+    with engine.connect() as connection:
+        assert _pragma(connection, "journal_mode") == "delete"
+        assert _pragma(connection, "synchronous") == 1
+    engine.dispose()
+
+
+# The read pool refuses writes, and a writer's open transaction does not block it under WAL.
+def test_read_engine_is_query_only_and_not_blocked_by_writer(tmp_path):
+    path = tmp_path / "catalog.db"
+    writer = sa.create_engine(f"sqlite:///{path}")
+    apply_pragmas(writer, pragma_statements(DEFAULT_PROFILE))
+    with writer.begin() as connection:
+        connection.exec_driver_sql("CREATE TABLE dresses (id INTEGER PRIMARY KEY)")
+        connection.exec_driver_sql("INSERT INTO dresses (id) VALUES (1)")
+
+    reader = create_read_engine(f"sqlite:///{path}", DEFAULT_PROFILE, pool_size=4, max_overflow=0, pool_timeout=5)
+    with reader.connect() as connection:
+        assert _pragma(connection, "query_only") == 1
+        with pytest.raises(sa.exc.OperationalError):
+            connection.exec_driver_sql("INSERT INTO dresses (id) VALUES (2)")
+
+    with writer.connect() as write_connection:
+        write_connection.exec_driver_sql("BEGIN IMMEDIATE")
+        write_connection.exec_driver_sql("INSERT INTO dresses (id) VALUES (3)")
+        counts = []
+
+        def read():
+            with reader.connect() as connection:
+                counts.append(connection.exec_driver_sql("SELECT count(*) FROM dresses").scalar())
+
+        threads = [threading.Thread(target=read) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=5)
+        write_connection.rollback()
+    assert counts == [1] * 8
+    reader.dispose()
+    writer.dispose()
+
+
+# The app's own engines carry the profile: WAL on the writer, query_only on the read pool.
+def test_app_engines_are_tuned(app):
+    if READ_ENGINE is None:
+        pytest.skip("SQLite tuning disabled or non-SQLite DATABASE_URL")
+    with db.engine.connect() as connection:
+        assert _pragma(connection, "journal_mode") == "wal"
+    with READ_ENGINE.connect() as connection:
+        assert _pragma(connection, "query_only") == 1
+        assert connection.exec_driver_sql("SELECT count(*) FROM wedding_dresses").scalar() > 0
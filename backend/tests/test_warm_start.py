@@ -0,0 +1,83 @@
+import os
+import time
+
+import pytest
+
+import app as app_module
+from app import CATALOG, WARM_UP, after_fork, warm_start
+
+
+# After the preload hook runs, readiness reports the warmed snapshot.
+def test_ready_after_warm_start(client):
+    snapshot = warm_start(freeze=False)
+    response = client.get("/api/ready")
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data["ready"] is True
+    assert data["size"] == snapshot.size
+    assert snapshot._facet_counter is not None
+
+
+# A worker that skipped the preload reports 503 until its background warm-up finishes.
+def test_ready_warms_up_in_background(client, monkeypatch):
+    monkeypatch.setitem(WARM_UP, "state", "cold")
+    first = client.get("/api/ready")
+    assert first.status_code == 503
+    assert first.get_json()["state"] == "warming"
+    deadline = time.monotonic() + 10
+    while WARM_UP["state"] != "ready" and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert client.get("/api/ready").status_code == 200
+
+
+# A failed warm-up is reported by /api/ready and retried on the next probe.
+def test_failed_warm_up_is_reported_and_retried(client, monkeypatch):
+    calls = []
+    get = CATALOG.get
+
+    def flaky_get():
+        calls.append(1)
+        if len(calls) == 1:
+            raise RuntimeError("database unavailable")
+        return get()
+
+    monkeypatch.setattr(CATALOG, "get", flaky_get)
+    with pytest.raises(RuntimeError):
+        warm_start(freeze=False)
+    assert WARM_UP["state"] == "failed"
+
+    failed = client.get("/api/ready")
+    assert failed.status_code == 503
+    assert failed.get_json() == {"ready": False, "state": "failed", "error": "RuntimeError: database unavailable"}
+    deadline = time.monotonic() + 10
+    while WARM_UP["state"] != "ready" and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert client.get("/api/ready").status_code == 200
+
+
+# Warm-up never leaves a drift ANALYZE thread running into the fork.
+def test_warm_start_skips_drift_analyze(monkeypatch):
+    started = []
+    monkeypatch.setattr(app_module, "_analysis_due", lambda rows, analyzed: True)
+    monkeypatch.setattr(app_module, "_background_analyze", lambda: started.append(1))
+    CATALOG.invalidate()
+    warm_start(freeze=False)
+    assert started == []
+    assert not app_module._ANALYZE_LOCK.locked()
+
+
+# A forked worker serves from the snapshot built before the fork, over its own connections.
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs fork()")
+def test_forked_worker_reuses_warm_snapshot(app):
+    snapshot = warm_start(freeze=False)
+    pid = os.fork()
+    if pid == 0:
+        code = 1
+        try:
+            after_fork()
+            response = app_module.app.test_client().post("/api/dresses", json={"page": {"limit": 3}})
+            code = 0 if response.status_code == 200 and CATALOG.current is snapshot else 2
+        finally:
+            os._exit(code)
+    _, status = os.waitpid(pid, 0)
+    assert os.waitstatus_to_exitcode(status) == 0
@@ -1,7 +1,6 @@
 # update_images.py
 import os
-from app import app, db
-from models import WeddingDress
+from app import WeddingDress, app, db
 
 IMAGE_FOLDER = 'static/images'
 